@@ -0,0 +1,8 @@
+"""
+Sintetik ma'lumotlar bilan benchmarklar: Excel import, kadastr qidiruvi
+va tuman sahifalash, shuningdek bot handlerlarining yuklama sinovi.
+Butunlay oflayn, vaqtinchalik SQLite bazada ishlaydi.
+
+    python -m benchmarks --qatorlar 10000 100000 --chiqish natija.json
+    python -m benchmarks.yuklama --updatelar 2000 --parallel 1 8 64
+"""
@@ -0,0 +1,223 @@
+"""
+Benchmarklarni ishga tushiradi va natijani JSON faylga yozadi.
+
+Har bir hajm uchun vaqtinchalik katalogda yangi SQLite baza (migratsiyalar
+bilan) va MEDIA_ROOT yaratiladi — ishchi db.sqlite3 ga tegilmaydi, tarmoq
+kerak emas. Natija fayllarini turli commit'lar orasida solishtirish mumkin.
+
+    python -m benchmarks --qatorlar 10000 100000 500000 --chiqish natija.json
+
+Ko'p varaqli import (--varaqlar) har bir --jarayonlar qiymati bilan alohida
+o'lchanadi; tezlanish birinchi qiymatga nisbatan hisoblanadi.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import tayyorlash
+
+tayyorlash.django_sozlash()
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from benchmarks import generator  # noqa: E402
+from benchmarks.olchov import RssKuzatuvchi, foizlar, olchash  # noqa: E402
+
+
+def _argumentlar():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--qatorlar', type=int, nargs='+', default=[10000],
+                        help="Sintetik fayl hajmlari (qator), masalan: 10000 100000 2000000")
+    parser.add_argument('--sorovlar', type=int, default=1000, help="Har bir qidiruv turi uchun so'rovlar soni")
+    parser.add_argument('--sahifalar', type=int, default=50, help="Ketma-ket o'qiladigan tuman sahifalari soni")
+    parser.add_argument('--varaqlar', type=int, default=10, help="Ko'p varaqli import o'lchovidagi varaqlar soni")
+    parser.add_argument('--jarayonlar', type=int, nargs='+', default=[1, 2, 4],
+                        help="Ko'p varaqli importni o'qiydigan jarayonlar soni (har biri alohida o'lchanadi)")
+    parser.add_argument('--urug', type=int, default=1, help="Tasodifiy generator urug'i")
+    parser.add_argument('--chiqish', default='benchmark-natija.json', help="JSON natija fayli")
+    parser.add_argument('--katalog', help="Vaqtinchalik fayllar katalogi (standart: tizim tmp)")
+    return parser.parse_args()
+
+
+def _import_olchash(upload_model, import_funksiya, tur, yol):
+    """Import funksiyasi tezligi va RSS; keyin versiya faollashtiriladi (vazifani_bajarish kabi)"""
+    from kadastr_app.models import ImportJob
+
+    upload = tayyorlash.yuklash(upload_model, yol)
+    maydon = 'excel_fayl' if tur == ImportJob.TUR_TOLOV else 'obyekt_fayl'
+    job = ImportJob.objects.create(tur=tur, holat=ImportJob.BAJARILMOQDA, **{maydon: upload})
+
+    with RssKuzatuvchi() as rss:
+        natija, soniya = olchash(import_funksiya, upload, job.pk)
+    upload_model.objects.filter(pk=upload.pk).update(faol_versiya=job.pk, yozuvlar_soni=natija.soni)
+    return {
+        'fayl_hajmi_mb': round(os.path.getsize(yol) / 1024 / 1024, 2),
+        'qatorlar': natija.soni,
+        'soniya': round(soniya, 3),
+        'qator_soniyasiga': round(natija.soni / soniya, 1) if soniya else 0,
+        **rss.hisobot(),
+    }
+
+
+def _kop_varaqli_import(yol, varaqlar, jarayonlar_royxati):
+    """
+    Bitta ko'p varaqli faylning importi turli jarayonlar soni bilan: devor vaqti,
+    tezlik va varaqlar bo'yicha qatorlar. Har o'lchovdan keyin qatorlar o'chiriladi.
+    """
+    from kadastr_app.excel_utils import excel_faylni_o_qi, varaq_oqimi
+    from kadastr_app.models import ExcelUpload, ImportJob, KadastrMalumat
+
+    upload = tayyorlash.yuklash(ExcelUpload, yol)
+    natija = {'varaqlar': varaqlar, 'fayl_hajmi_mb': round(os.path.getsize(yol) / 1024 / 1024, 2), 'jarayonlar': {}}
+    for jarayonlar in jarayonlar_royxati:
+        # Versiya faollashtirilmaydi — asosiy import natijalari o'zgarmaydi
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, holat=ImportJob.BAJARILMOQDA, excel_fayl=upload)
+        with varaq_oqimi(jarayonlar) as oqim:
+            import_natija, soniya = olchash(lambda: excel_faylni_o_qi(upload, job.pk, oqim=oqim))
+        natija['jarayonlar'][jarayonlar] = {
+            'qatorlar': import_natija.soni,
+            'soniya': round(soniya, 3),
+            'qator_soniyasiga': round(import_natija.soni / soniya, 1) if soniya else 0,
+            'varaqlar': {v['varaq']: v['qatorlar'] for v in import_natija.varaqlar},
+        }
+        KadastrMalumat.objects.filter(excel_fayl=upload).delete()
+        job.delete()
+    birinchi = natija['jarayonlar'][jarayonlar_royxati[0]]['soniya']
+    for olchov in natija['jarayonlar'].values():
+        olchov['tezlanish'] = round(birinchi / olchov['soniya'], 2) if olchov['soniya'] else None
+    return natija
+
+
+def _qidiruv_sorovlari(qatorlar, soni, rnd):
+    """Qidiruv turlari bo'yicha kiritiladigan matnlar"""
+    tanlov = [generator.kadastr_raqami(rnd.randrange(qatorlar)) for _ in range(soni)]
+    return {
+        'aniq': tanlov,
+        # Tuman/massiv darajasidagi prefiks — ko'p natija, chegara bilan kesiladi
+        'prefiks': [r[:8] for r in tanlov],
+        # Prefiks mos kelmaydi — FTS qism-satr qidiruviga tushadi
+        'qism_satr': [r[3:14] for r in tanlov],
+        'topilmadi': [f'99:{rnd.randrange(100):02d}:{rnd.randrange(10000):04d}' for _ in range(soni)],
+    }
+
+
+def _qidiruv_olchash(funksiya, indeks, sorovlar):
+    """Har bir rejim (xotira indeksi / baza) va so'rov turi uchun kechikish foizlari"""
+    _, qurish = olchash(indeks.qurish)
+    natija = {'indeks_qurish_s': round(qurish, 3)}
+    for rejim, xotira in (('xotira_indeksi', True), ('baza', False)):
+        with override_settings(KADASTR_XOTIRA_INDEKSI=xotira):
+            natija[rejim] = {}
+            for tur, matnlar in sorovlar.items():
+                funksiya(matnlar[0])  # birinchi murojaat (kesh/ulanish) hisobga olinmaydi
+                kechikishlar = [olchash(funksiya, matn)[1] for matn in matnlar]
+                natija[rejim][tur] = foizlar(kechikishlar)
+    return natija
+
+
+def _sahifalash_olchash(bot, sahifalar_soni, rnd):
+    """
+    Eng katta tumanda: 1-sahifa, kalit (keyset) bilan ketma-ket sahifalar
+    va kalit saqlanmagan (OFFSET) holatdagi chuqur sahifalar narxi.
+    """
+    tumanlar = bot._toshkent_tumanlar()
+    if not tumanlar:
+        return {}
+    tuman = max(tumanlar, key=lambda t: t['tolanmagan'])
+    jami_sahifa = -(-tuman['tolanmagan'] // bot.TUMAN_SAHIFA_HAJMI)
+    oxirgi = min(sahifalar_soni, jami_sahifa - 1)
+
+    bot._tuman_kursorlari.clear()
+    _, birinchi = olchash(bot._tuman_fuqarolari, tuman['tuman'], 0)
+    ketma_ket = [olchash(bot._tuman_fuqarolari, tuman['tuman'], s)[1] for s in range(1, oxirgi + 1)]
+
+    chuqur = sorted(rnd.sample(range(1, jami_sahifa), min(20, jami_sahifa - 1)))
+    offset = []
+    for s in chuqur:
+        bot._tuman_kursorlari.clear()
+        offset.append(olchash(bot._tuman_fuqarolari, tuman['tuman'], s)[1])
+
+    return {
+        'tuman': tuman['tuman'],
+        'tolanmagan': tuman['tolanmagan'],
+        'jami_sahifa': jami_sahifa,
+        'birinchi_sahifa_ms': round(birinchi * 1000, 3),
+        'keyset': foizlar(ketma_ket),
+        'offset': foizlar(offset),
+        'offset_eng_chuqur_ms': round(offset[-1] * 1000, 3) if offset else None,
+    }
+
+
+def _hajm_benchmarki(qatorlar, args, katalog):
+    from bot import bot
+    from kadastr_app.excel_utils import excel_faylni_o_qi, obyekt_excel_o_qi
+    from kadastr_app.indeks import obyekt_indeks, tolov_indeks
+    from kadastr_app.models import ExcelUpload, ImportJob, ObyektExcelUpload
+    from kadastr_app.xulosa import tuman_xulosasini_yangilash
+
+    tayyorlash.baza_tayyorlash(katalog)
+    fayllar = Path(settings.MEDIA_ROOT) / Path(katalog).name
+    fayllar.mkdir(parents=True)
+    tolov_yoli, obyekt_yoli = fayllar / f'tolov_{qatorlar}.xlsx', fayllar / f'obyekt_{qatorlar}.xlsx'
+
+    natija = {'qatorlar': qatorlar}
+    boshlanish = time.perf_counter()
+    generator.tolov_fayli(tolov_yoli, qatorlar, urug=args.urug)
+    generator.obyekt_fayli(obyekt_yoli, qatorlar, urug=args.urug + 1)
+    natija['generatsiya_s'] = round(time.perf_counter() - boshlanish, 3)
+
+    natija['import'] = {
+        'excel_faylni_o_qi': _import_olchash(ExcelUpload, excel_faylni_o_qi, ImportJob.TUR_TOLOV, tolov_yoli),
+        'obyekt_excel_o_qi': _import_olchash(ObyektExcelUpload, obyekt_excel_o_qi, ImportJob.TUR_OBYEKT, obyekt_yoli),
+    }
+    natija['tuman_xulosasi_s'] = round(olchash(tuman_xulosasini_yangilash)[1], 3)
+
+    if args.varaqlar > 1:
+        kop_yoli = fayllar / f'tolov_{qatorlar}_{args.varaqlar}varaq.xlsx'
+        generator.tolov_fayli(kop_yoli, qatorlar, urug=args.urug, varaqlar=args.varaqlar)
+        natija['kop_varaqli_import'] = _kop_varaqli_import(kop_yoli, args.varaqlar, args.jarayonlar)
+
+    rnd = random.Random(args.urug)
+    natija['qidiruv'] = {
+        '_qidirish': _qidiruv_olchash(bot._qidirish, tolov_indeks, _qidiruv_sorovlari(qatorlar, args.sorovlar, rnd)),
+        '_obyekt_qidirish': _qidiruv_olchash(
+            bot._obyekt_qidirish, obyekt_indeks, _qidiruv_sorovlari(qatorlar, args.sorovlar, rnd)
+        ),
+    }
+    natija['_tuman_fuqarolari'] = _sahifalash_olchash(bot, args.sahifalar, rnd)
+    connections.close_all()
+    return natija
+
+
+def main():
+    args = _argumentlar()
+    natija = {'muhit': tayyorlash.muhit(), 'sozlamalar': vars(args), 'natijalar': []}
+    ildiz = tempfile.mkdtemp(prefix='kadastr-benchmark-', dir=args.katalog)
+    # Fayl saqlash joyi birinchi murojaatda o'rnatiladi — shuning uchun bir marta
+    settings.MEDIA_ROOT = os.path.join(ildiz, 'media')
+    try:
+        for qatorlar in args.qatorlar:
+            katalog = os.path.join(ildiz, f'{qatorlar}')
+            os.mkdir(katalog)
+            print(f"⏳ {qatorlar} qator...", file=sys.stderr)
+            natija['natijalar'].append(_hajm_benchmarki(qatorlar, args, katalog))
+            shutil.rmtree(katalog)
+            shutil.rmtree(os.path.join(settings.MEDIA_ROOT, f'{qatorlar}'))
+    finally:
+        shutil.rmtree(ildiz, ignore_errors=True)
+
+    with open(args.chiqish, 'w', encoding='utf-8') as f:
+        json.dump(natija, f, ensure_ascii=False, indent=2)
+    print(f"✅ Natija yozildi: {args.chiqish}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
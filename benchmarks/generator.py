@@ -0,0 +1,94 @@
+"""
+Haqiqiyga o'xshash ExcelUpload / ObyektExcelUpload fayllarini yaratadi.
+
+Sarlavhalar USTUN_MAPPING / OBYEKT_USTUN_MAPPING'dan olinadi, tumanlar —
+Toshkent viloyati tumanlari. Bir xil `urug'` bilan bir xil fayl chiqadi.
+"""
+import random
+
+from openpyxl import Workbook
+
+from kadastr_app.excel_utils import (
+    OBYEKT_STANDART_INDEKSLAR, OBYEKT_USTUN_MAPPING, STANDART_INDEKSLAR, USTUN_MAPPING,
+)
+
+VILOYAT = 'Toshkent viloyati'
+VILOYAT_KODI = 11
+
+TUMANLAR = [
+    "Bekobod tumani", "Bo'ka tumani", "Bo'stonliq tumani", "Chinoz tumani", "Qibray tumani",
+    "Ohangaron tumani", "Oqqo'rg'on tumani", "Parkent tumani", "Piskent tumani",
+    "Quyichirchiq tumani", "O'rtachirchiq tumani", "Yangiyo'l tumani", "Yuqorichirchiq tumani",
+    "Zangiota tumani", "Toshkent tumani",
+]
+# Tumanlar hajmi bir xil emas — kattaroq tumanlarga ko'proq qator tushadi
+TUMAN_OGIRLIKLARI = [3, 2, 4, 3, 6, 3, 2, 4, 3, 2, 3, 5, 2, 7, 6]
+
+MFY_NOMLARI = [
+    "Navro'z", 'Mustaqillik', 'Obod', 'Bog\'bon', 'Yangi hayot', "Do'stlik", 'Guliston',
+    'Istiqlol', 'Tinchlik', 'Bunyodkor', 'Oqtepa', 'Chinor', 'Olmazor', 'Yashnobod',
+]
+KOCHA_NOMLARI = [
+    "Amir Temur ko'chasi", "Navoiy ko'chasi", "Bobur ko'chasi", "Barkamol avlod ko'chasi",
+    "Bog'ishamol ko'chasi", "Mirzo Ulug'bek ko'chasi", "Paxtakor ko'chasi", "Sharq ko'chasi",
+]
+FAMILIYALAR = ['Aliyev', 'Karimov', 'Rahimov', 'Toshmatov', 'Yusupov', "Qo'chqorov", 'Ergashev', 'Saidov']
+ISMLAR = ['Vali', 'Anvar', 'Dilshod', 'Nodira', 'Gulnora', 'Shoxrux', 'Malika', 'Jasur', 'Zarina']
+OTASINING = ["Akmal o'g'li", "Bahrom o'g'li", 'Karim qizi', "Rustam o'g'li", 'Olim qizi']
+
+TOLOV_HOLATLARI = [("To'lanmagan", 6), ("To'langan", 4)]
+OBYEKT_HOLATLARI = [('Muhokamada', 4), ('Tasdiqlangan', 3), ('Rad etilgan', 1), ('Qabul qilindi', 2)]
+
+
+def _sarlavha(mapping, standart):
+    """Har bir maydon o'z standart ustuniga, birinchi variant nomi bilan"""
+    sarlavha = ['№'] * (max(standart.values()) + 1)
+    for maydon, idx in standart.items():
+        nom = mapping[maydon][0]
+        sarlavha[idx] = nom.upper() if len(nom) <= 3 else nom[0].upper() + nom[1:]
+    return sarlavha
+
+
+def kadastr_raqami(i):
+    """i-qator uchun takrorlanmas kadastr raqami (VV:TT:MM:KK:BB:NNNN)"""
+    return '{:02d}:{:02d}:{:02d}:{:02d}:{:02d}:{:04d}'.format(
+        VILOYAT_KODI, 1 + i % len(TUMANLAR), (i // 15) % 60, (i // 900) % 10, (i // 9000) % 100, i % 10000
+    )
+
+
+def _tanlov(rnd, juftlar):
+    return rnd.choices([q for q, _ in juftlar], weights=[w for _, w in juftlar])[0]
+
+
+def tolov_fayli(yol, qatorlar, urug=1, varaqlar=1):
+    """To'lov ma'lumotlari fayli (ExcelUpload uchun); qatorlar `varaqlar` ta varaqqa teng bo'linadi"""
+    rnd = random.Random(urug)
+    wb = Workbook(write_only=True)
+    sahifalar = [wb.create_sheet(f'Varaq {n + 1}' if varaqlar > 1 else None) for n in range(varaqlar)]
+    for ws in sahifalar:
+        ws.append(_sarlavha(USTUN_MAPPING, STANDART_INDEKSLAR))
+    for i in range(qatorlar):
+        ws = sahifalar[i * varaqlar // qatorlar]
+        tuman = rnd.choices(TUMANLAR, weights=TUMAN_OGIRLIKLARI)[0]
+        fio = f"{rnd.choice(FAMILIYALAR)} {rnd.choice(ISMLAR)} {rnd.choice(OTASINING)}"
+        ws.append([
+            i + 1, VILOYAT, tuman, f"{rnd.choice(MFY_NOMLARI)} MFY",
+            f"{rnd.choice(KOCHA_NOMLARI)} {rnd.randint(1, 120)} uy",
+            kadastr_raqami(i), str(87100000000000 + i), str(rnd.randrange(50, 5000) * 1000),
+            fio, _tanlov(rnd, TOLOV_HOLATLARI),
+        ])
+    wb.save(yol)
+
+
+def obyekt_fayli(yol, qatorlar, urug=2):
+    """Obyekt holati fayli (ObyektExcelUpload uchun)"""
+    rnd = random.Random(urug)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(_sarlavha(OBYEKT_USTUN_MAPPING, OBYEKT_STANDART_INDEKSLAR))
+    for i in range(qatorlar):
+        ws.append([
+            kadastr_raqami(i), VILOYAT, rnd.choices(TUMANLAR, weights=TUMAN_OGIRLIKLARI)[0],
+            f"{rnd.choice(MFY_NOMLARI)} MFY", _tanlov(rnd, OBYEKT_HOLATLARI),
+        ])
+    wb.save(yol)
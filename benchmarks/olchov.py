@@ -0,0 +1,79 @@
+"""O'lchov yordamchilari: RSS kuzatuvchisi va kechikish foizlari."""
+import os
+import resource
+import threading
+import time
+
+_SAHIFA = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def joriy_rss():
+    """Jarayonning hozirgi RSS'i (bayt). /proc bo'lmasa — jarayon davomidagi eng yuqorisi"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _SAHIFA
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssKuzatuvchi:
+    """
+    `with` bloki davomida RSS'ni fon oqimida `oraliq` soniyada bir o'qib,
+    eng yuqori qiymatni saqlaydi (ru_maxrss butun jarayon uchun — har bir
+    o'lchovni alohida ko'rsatmaydi).
+    """
+
+    def __init__(self, oraliq=0.01):
+        self.oraliq = oraliq
+        self.boshlangich = 0
+        self.eng_yuqori = 0
+        self._toxta = threading.Event()
+
+    def _kuzatish(self):
+        while not self._toxta.wait(self.oraliq):
+            self.eng_yuqori = max(self.eng_yuqori, joriy_rss())
+
+    def __enter__(self):
+        self.boshlangich = self.eng_yuqori = joriy_rss()
+        self._oqim = threading.Thread(target=self._kuzatish, daemon=True)
+        self._oqim.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._toxta.set()
+        self._oqim.join()
+        self.eng_yuqori = max(self.eng_yuqori, joriy_rss())
+
+    def hisobot(self):
+        mb = 1024 * 1024
+        return {
+            'rss_boshlangich_mb': round(self.boshlangich / mb, 1),
+            'rss_eng_yuqori_mb': round(self.eng_yuqori / mb, 1),
+            'rss_osish_mb': round((self.eng_yuqori - self.boshlangich) / mb, 1),
+        }
+
+
+def foizlar(kechikishlar):
+    """Soniyalardagi kechikishlar ro'yxatidan ms'dagi p50/p90/p99/max"""
+    if not kechikishlar:
+        return {'soni': 0}
+    tartib = sorted(kechikishlar)
+
+    def foiz(p):
+        return round(tartib[min(len(tartib) - 1, int(p / 100 * len(tartib)))] * 1000, 3)
+
+    return {
+        'soni': len(tartib),
+        'ortacha_ms': round(sum(tartib) / len(tartib) * 1000, 3),
+        'p50_ms': foiz(50),
+        'p90_ms': foiz(90),
+        'p99_ms': foiz(99),
+        'max_ms': round(tartib[-1] * 1000, 3),
+    }
+
+
+def olchash(funksiya, *args):
+    """(natija, soniya)"""
+    boshlanish = time.perf_counter()
+    natija = funksiya(*args)
+    return natija, time.perf_counter() - boshlanish
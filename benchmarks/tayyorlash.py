@@ -0,0 +1,87 @@
+"""Benchmark va yuklama sinovi uchun umumiy muhit: Django, vaqtinchalik baza, sintetik ma'lumot."""
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+
+ILDIZ = Path(__file__).resolve().parent.parent
+
+
+def django_sozlash():
+    sys.path.insert(0, str(ILDIZ))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kadastr_bot.settings')
+    django.setup()
+
+
+def git(*args):
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=ILDIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def muhit():
+    """Natijalarni commit'lar orasida solishtirish uchun muhit ma'lumotlari"""
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'ozgarishlar_bor': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'vaqt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platforma': platform.platform(),
+        'protsessorlar': os.cpu_count(),
+    }
+
+
+def baza_tayyorlash(katalog):
+    """Ulanishlarni yangi (bo'sh) SQLite faylga o'tkazib, migratsiyalarni bajaradi"""
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+
+    connections.close_all()
+    fayl = Path(katalog) / 'benchmark.sqlite3'
+    settings.DATABASES['default']['NAME'] = fayl
+    if 'oqish' in settings.DATABASES:
+        settings.DATABASES['oqish']['NAME'] = fayl.as_uri() + '?mode=ro'
+    call_command('migrate', verbosity=0)
+
+
+def yuklash(upload_model, yol):
+    """MEDIA_ROOT ichidagi tayyor faylni upload sifatida ro'yxatga oladi"""
+    from django.conf import settings
+
+    upload = upload_model.objects.create(izoh='benchmark')
+    upload.fayl.name = os.path.relpath(yol, settings.MEDIA_ROOT)
+    upload.save(update_fields=['fayl'])
+    return upload
+
+
+def malumot_yaratish(katalog, qatorlar, urug=1):
+    """
+    Sintetik to'lov va obyekt fayllarini yaratib, oddiy import yo'li
+    (vazifani_bajarish) bilan faollashtiradi.
+    """
+    from benchmarks import generator
+    from kadastr_app.models import ExcelUpload, ImportJob, ObyektExcelUpload
+    from kadastr_app.vazifalar import vazifani_bajarish
+
+    for upload_model, tur, yaratish, nom in (
+        (ExcelUpload, ImportJob.TUR_TOLOV, generator.tolov_fayli, 'tolov'),
+        (ObyektExcelUpload, ImportJob.TUR_OBYEKT, generator.obyekt_fayli, 'obyekt'),
+    ):
+        yol = Path(katalog) / f'{nom}_{qatorlar}.xlsx'
+        yaratish(yol, qatorlar, urug=urug)
+        upload = yuklash(upload_model, yol)
+        maydon = 'excel_fayl' if tur == ImportJob.TUR_TOLOV else 'obyekt_fayl'
+        job = ImportJob.objects.create(tur=tur, holat=ImportJob.BAJARILMOQDA, **{maydon: upload})
+        if not vazifani_bajarish(job):
+            raise RuntimeError(f"{nom} fayli import qilinmadi")
@@ -0,0 +1,274 @@
+"""
+Oflayn yuklama sinovi: sintetik Telegram update'larini bot handlerlariga beradi.
+
+Application bot/bot.py dagi application_qurish() bilan quriladi (xuddi shu
+ConversationHandler, CallbackQueryHandler va matn handleri), Bot API esa
+soxta (bot/soxta_api.py) — chiquvchi chaqiruvlar faqat sanaladi. Ma'lumot
+vaqtinchalik SQLite bazaga sintetik fayllardan import qilinadi.
+
+Trafik foydalanuvchi seanslaridan iborat:
+  qidiruv — kadastr raqami yuboriladi (bir qismi topilmaydigan raqam);
+  tuman   — tumanlar ro'yxati, tuman tanlanadi va bir necha sahifa varaqlanadi;
+  obyekt  — "Obyekt holati" suhbati: tugma, raqam, bekor qilish.
+Seans ichidagi update'lar ketma-ket, `--parallel` ta seans bir vaqtda bajariladi.
+
+    python -m benchmarks.yuklama --qatorlar 20000 --updatelar 3000 --parallel 1 8 64 \\
+        --aralash qidiruv=70,tuman=20,obyekt=10 --chiqish yuklama.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from itertools import count
+
+from benchmarks import tayyorlash
+
+tayyorlash.django_sozlash()
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from benchmarks import generator  # noqa: E402
+from benchmarks.olchov import foizlar  # noqa: E402
+from kadastr_app.metrikalar import sorovlarni_sanash  # noqa: E402
+
+SANA = 1700000000
+
+
+def _argumentlar():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.yuklama', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--qatorlar', type=int, default=20000, help="Sintetik bazadagi qatorlar soni")
+    parser.add_argument('--updatelar', type=int, default=2000, help="Har bir parallellik uchun update'lar soni")
+    parser.add_argument('--parallel', type=int, nargs='+', default=[1, 8, 64],
+                        help="Bir vaqtda ishlaydigan seanslar (foydalanuvchilar) soni")
+    parser.add_argument('--aralash', default='qidiruv=70,tuman=20,obyekt=10',
+                        help="Seans turlarining ulushi: qidiruv=..,tuman=..,obyekt=..")
+    parser.add_argument('--topilmaydi', type=float, default=0.1, help="Topilmaydigan raqamlar ulushi")
+    parser.add_argument('--sahifalar', type=int, default=3, help="Tuman seansida varaqlanadigan sahifalar")
+    parser.add_argument('--api-kechikish', type=float, default=0.0,
+                        help="Soxta Bot API javobidan oldingi kutish (soniya)")
+    parser.add_argument('--urug', type=int, default=1, help="Tasodifiy generator urug'i")
+    parser.add_argument('--chiqish', default='yuklama-natija.json', help="JSON natija fayli")
+    parser.add_argument('--katalog', help="Vaqtinchalik fayllar katalogi (standart: tizim tmp)")
+    return parser.parse_args()
+
+
+def _aralash(matn):
+    ulushlar = {}
+    for qism in matn.split(','):
+        nom, _, qiymat = qism.partition('=')
+        if nom.strip() not in _SEANSLAR:
+            raise SystemExit(f"Noma'lum seans turi: {nom!r} ({', '.join(_SEANSLAR)})")
+        ulushlar[nom.strip()] = float(qiymat or 1)
+    return ulushlar
+
+
+# ─── Sintetik update'lar ──────────────────────────────────────────────────────
+
+class UpdateYaratuvchi:
+    """Telegram Update JSON'lari (update_id va message_id takrorlanmaydi)"""
+
+    def __init__(self):
+        self._id = count(1)
+
+    def _foydalanuvchi(self, user_id):
+        return {'id': user_id, 'is_bot': False, 'first_name': 'Sinov', 'username': f'sinov{user_id}'}
+
+    def _xabar_tanasi(self, user_id, matn):
+        return {
+            'message_id': next(self._id), 'date': SANA, 'text': matn,
+            'chat': {'id': user_id, 'type': 'private'}, 'from': self._foydalanuvchi(user_id),
+        }
+
+    def xabar(self, user_id, matn):
+        tana = self._xabar_tanasi(user_id, matn)
+        if matn.startswith('/'):
+            tana['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(matn.split()[0])}]
+        return {'update_id': next(self._id), 'message': tana}
+
+    def callback(self, user_id, data):
+        return {
+            'update_id': next(self._id),
+            'callback_query': {
+                'id': str(next(self._id)), 'from': self._foydalanuvchi(user_id), 'chat_instance': str(user_id),
+                'data': data, 'message': self._xabar_tanasi(user_id, "📋 To'lov jarayonidagi obyektlar"),
+            },
+        }
+
+
+def _raqam(rnd, args):
+    if rnd.random() < args.topilmaydi:
+        return f'99:{rnd.randrange(100):02d}:{rnd.randrange(100):02d}:{rnd.randrange(10000):04d}'
+    return generator.kadastr_raqami(rnd.randrange(args.qatorlar))
+
+
+def _qidiruv_seansi(bot, yaratuvchi, user_id, rnd, args):
+    return [('qidiruv', yaratuvchi.xabar(user_id, _raqam(rnd, args)))]
+
+
+def _tuman_seansi(bot, yaratuvchi, user_id, rnd, args):
+    tuman = rnd.choices(generator.TUMANLAR, weights=generator.TUMAN_OGIRLIKLARI)[0]
+    seans = [
+        ('tumanlar', yaratuvchi.xabar(user_id, bot.BTN_TOLOV_JARAYON)),
+        ('tuman_sahifa', yaratuvchi.callback(user_id, f'tuman:{tuman}')),
+    ]
+    for sahifa in range(1, args.sahifalar + 1):
+        seans.append(('tuman_sahifa', yaratuvchi.callback(user_id, f'tuman:{tuman}|{sahifa}')))
+    return seans
+
+
+def _obyekt_seansi(bot, yaratuvchi, user_id, rnd, args):
+    return [
+        ('obyekt_boshlash', yaratuvchi.xabar(user_id, bot.BTN_OBYEKT_HOLATI)),
+        ('obyekt_qidiruv', yaratuvchi.xabar(user_id, _raqam(rnd, args))),
+        ('obyekt_bekor', yaratuvchi.xabar(user_id, bot.BTN_BEKOR)),
+    ]
+
+
+_SEANSLAR = {
+    'qidiruv': _qidiruv_seansi,
+    'tuman': _tuman_seansi,
+    'obyekt': _obyekt_seansi,
+}
+
+
+def seanslar_yaratish(bot, args, ulushlar, birinchi_user):
+    """Jami `args.updatelar` tagacha update'dan iborat seanslar (har biri alohida foydalanuvchi)"""
+    rnd = random.Random(args.urug)
+    yaratuvchi = UpdateYaratuvchi()
+    turlar, ogirliklar = list(ulushlar), list(ulushlar.values())
+    seanslar = []
+    jami = 0
+    user_id = birinchi_user
+    while jami < args.updatelar:
+        tur = rnd.choices(turlar, weights=ogirliklar)[0]
+        seans = _SEANSLAR[tur](bot, yaratuvchi, user_id, rnd, args)
+        seanslar.append(seans)
+        jami += len(seans)
+        user_id += 1
+    return seanslar
+
+
+# ─── Ishga tushirish ──────────────────────────────────────────────────────────
+
+# hisobot() lug'atlaridagi o'sib boradigan hisoblagichlar
+_HISOBLAGICHLAR = {
+    'javob_keshi': ('topildi', 'topilmadi'),
+    'yagona_sorov': ('bajarildi', 'birlashtirildi'),
+    'sorov_cheklovi': ('ruxsat_berildi', 'rad_etildi'),
+}
+
+
+def _hisoblagichlar(bot):
+    return {nom: {k: getattr(bot, nom).hisobot()[k] for k in kalitlar} for nom, kalitlar in _HISOBLAGICHLAR.items()}
+
+
+def _farq(oldin, keyin):
+    """Shu o'lchov davomidagi o'sish"""
+    return {nom: {k: v - oldin[nom][k] for k, v in qiymatlar.items()} for nom, qiymatlar in keyin.items()}
+
+
+async def _bajarish(bot, seanslar, parallel):
+    from telegram import Update
+
+    app = bot.application_qurish('1:YUKLAMA', webhook=True)
+    xatolar = Counter()
+
+    async def xato_qayd(update, context):
+        xatolar[type(context.error).__name__] += 1
+
+    app.add_error_handler(xato_qayd)
+    await app.initialize()
+
+    navbat = asyncio.Queue()
+    for seans in seanslar:
+        navbat.put_nowait(seans)
+    kechikishlar = defaultdict(list)
+    db_sorovlari = []
+    db_vaqti = []
+
+    async def ishchi():
+        while not navbat.empty():
+            seans = navbat.get_nowait()
+            for tur, malumot in seans:
+                update = Update.de_json(malumot, app.bot)
+                with sorovlarni_sanash() as hisob:
+                    boshlanish = time.perf_counter()
+                    await app.process_update(update)
+                    kechikishlar[tur].append(time.perf_counter() - boshlanish)
+                db_sorovlari.append(hisob.soni)
+                db_vaqti.append(hisob.soniya)
+
+    oldin = _hisoblagichlar(bot)
+    boshlanish = time.perf_counter()
+    await asyncio.gather(*(ishchi() for _ in range(parallel)))
+    davomiylik = time.perf_counter() - boshlanish
+
+    api = app.bot.request.metodlar if hasattr(app.bot.request, 'metodlar') else {}
+    hisoblagichlar = _farq(oldin, _hisoblagichlar(bot))
+    await app.shutdown()
+    await asyncio.to_thread(bot.oqish_ijrochisi.toxtatish)
+
+    hammasi = [k for turdagi in kechikishlar.values() for k in turdagi]
+    return {
+        'parallel': parallel,
+        'seanslar': len(seanslar),
+        'updatelar': len(hammasi),
+        'soniya': round(davomiylik, 3),
+        'update_soniyasiga': round(len(hammasi) / davomiylik, 1) if davomiylik else 0,
+        'kechikish': foizlar(hammasi),
+        'turlar': {tur: foizlar(k) for tur, k in sorted(kechikishlar.items())},
+        'db_sorovlari': {
+            'jami': sum(db_sorovlari),
+            'update_boshiga': round(sum(db_sorovlari) / len(db_sorovlari), 2) if db_sorovlari else 0,
+            'update_boshiga_max': max(db_sorovlari, default=0),
+            'vaqt': foizlar(db_vaqti),
+        },
+        'api_chaqiruvlari': dict(sorted(api.items())),
+        'xatolar': dict(xatolar),
+        **hisoblagichlar,
+    }
+
+
+def main():
+    args = _argumentlar()
+    ulushlar = _aralash(args.aralash)
+    natija = {'muhit': tayyorlash.muhit(), 'sozlamalar': vars(args), 'natijalar': []}
+
+    settings.TELEGRAM_SOXTA_API = True
+    settings.TELEGRAM_SOXTA_KECHIKISH = args.api_kechikish
+    katalog = tempfile.mkdtemp(prefix='kadastr-yuklama-', dir=args.katalog)
+    settings.MEDIA_ROOT = katalog
+    try:
+        tayyorlash.baza_tayyorlash(katalog)
+        print(f"⏳ {args.qatorlar} qatorli sintetik baza...", file=sys.stderr)
+        tayyorlash.malumot_yaratish(katalog, args.qatorlar, urug=args.urug)
+
+        from bot import bot
+        # Har bir soxta API chaqiruvi va handler INFO logi natijani buzmasin
+        logging.getLogger().setLevel(logging.WARNING)
+        bot._indekslarni_tekshirish()
+
+        for i, parallel in enumerate(args.parallel):
+            # Har bir o'lchov bir xil sharoitda: bo'sh kesh, yangi foydalanuvchilar
+            bot.javob_keshi.tozalash()
+            seanslar = seanslar_yaratish(bot, args, ulushlar, birinchi_user=(i + 1) * 10_000_000)
+            print(f"⏳ parallel={parallel}: {len(seanslar)} seans...", file=sys.stderr)
+            natija['natijalar'].append(asyncio.run(_bajarish(bot, seanslar, parallel)))
+    finally:
+        connections.close_all()
+        shutil.rmtree(katalog, ignore_errors=True)
+
+    with open(args.chiqish, 'w', encoding='utf-8') as f:
+        json.dump(natija, f, ensure_ascii=False, indent=2)
+    print(f"✅ Natija yozildi: {args.chiqish}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 """
 Kadastr Telegram Bot
 Ishga tushurish: python bot/bot.py
+Webhook rejimi:  python bot/bot.py --webhook   (update'larni bot/webhook.py qabul qiladi)
 """
 import os
 import sys
@@ -11,16 +12,34 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kadastr_bot.settings')
 django.setup()
 
+import asyncio
 import logging
-from asgiref.sync import sync_to_async
+import math
+import tempfile
+import threading
+from collections import OrderedDict
 from django.conf import settings
+from django.db.models import Q
+from openpyxl import Workbook
 from telegram import Update, ReplyKeyboardMarkup, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, CallbackQueryHandler,
     filters, ContextTypes, ConversationHandler
 )
-
-from kadastr_app.models import KadastrMalumat, BotFoydalanuvchi, ObyektMalumat
+from telegram.request import HTTPXRequest
+
+from bot import metrikalar, ommaviy
+from bot.cheklov import TokenChelak, YagonaSorov
+from bot.ijrochi import OqishIjrochisi, olchangan_sync_to_async
+from kadastr_app.models import KadastrMalumat, ObyektMalumat
+from kadastr_app.holat import OBYEKT_BELGILARI, TOLOV_BELGILARI
+from kadastr_app.indeks import tolov_indeks, obyekt_indeks
+from kadastr_app.kalit import kadastr_kalit
+from kadastr_app.kesh import JavobKeshi
+from kadastr_app.metrikalar import HisobotOlchovi
+from kadastr_app.statistika import statistika
+from kadastr_app.summa import somga, summa_matni
+from kadastr_app.xulosa import toshkent_tumanlari
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -31,6 +50,13 @@ logger = logging.getLogger(__name__)
 # ConversationHandler holatlari
 OBYEKT_KADASTR_KIRISH = 1
 
+# Bir nechta natija topilganda ko'rsatiladigan yozuvlar soni
+TOLOV_NATIJA_CHEGARASI = 5
+OBYEKT_NATIJA_CHEGARASI = 10
+
+# Tuman ro'yxatidagi bitta sahifa hajmi
+TUMAN_SAHIFA_HAJMI = 15
+
 # ─── Tugma matnlari (bir joyda boshqarish uchun) ─────────────────────────────
 
 BTN_OBYEKT_HOLATI = '🏠 Obyekt holatini tekshirish'
@@ -69,6 +95,21 @@ BOSHQA_TUGMALAR = [
 ]
 
 
+# Takroriy qidiruvlar uchun tayyor javoblar keshi (yangi upload faollashganda eskiradi)
+javob_keshi = JavobKeshi(
+    hajm=getattr(settings, 'JAVOB_KESHI_HAJMI', 10000),
+    muddat=getattr(settings, 'JAVOB_KESHI_MUDDATI', 300),
+)
+
+# Bir vaqtda kelgan bir xil qidiruvlar bitta so'rovni kutadi
+yagona_sorov = YagonaSorov()
+
+# Foydalanuvchi bo'yicha so'rovlar chegarasi (bazaga murojaatdan oldin tekshiriladi)
+sorov_cheklovi = TokenChelak(
+    sigim=getattr(settings, 'BOT_SOROV_SIGIMI', 5),
+    tezlik=getattr(settings, 'BOT_SOROV_TEZLIGI', 0.5),
+)
+
 # ─── Yordamchi funksiyalar ────────────────────────────────────────────────────
 
 def fio_yashir(fio: str) -> str:
@@ -85,70 +126,170 @@ def fio_yashir(fio: str) -> str:
 
 # ─── Sync Django ORM funksiyalari ─────────────────────────────────────────────
 
-def _foydalanuvchi_saqlash(user_id, ism, username):
-    obj, yaratildi = BotFoydalanuvchi.objects.get_or_create(
-        telegram_id=user_id,
-        defaults={'ism': ism, 'username': username}
-    )
-    if not yaratildi:
-        obj.so_rovlar_soni += 1
-        obj.save()
-
-
-def _statistika_yangilash(user_id, ism, username):
-    try:
-        f = BotFoydalanuvchi.objects.get(telegram_id=user_id)
-        f.so_rovlar_soni += 1
-        f.save()
-    except BotFoydalanuvchi.DoesNotExist:
-        BotFoydalanuvchi.objects.create(
-            telegram_id=user_id, ism=ism,
-            username=username, so_rovlar_soni=1
-        )
+def _id_tartibida(qs, idlar, *maydonlar):
+    """Yozuvlarni indeks qaytargan id'lar tartibida oladi"""
+    qatorlar = {q['id']: q for q in qs.filter(pk__in=idlar).values('id', *maydonlar)}
+    return [qatorlar[pk] for pk in idlar if pk in qatorlar]
 
 
 def _qidirish(kadastr_raqam):
-    qs = KadastrMalumat.objects.filter(kadastr_raqami__icontains=kadastr_raqam)
-    return list(qs.values(
-        'viloyat', 'tuman', 'mfy', 'kocha', 'kadastr_raqami',
-        'invoys_raqami', 'summa_miqdori', 'tolovchi_fio', 'tolov_holati'
-    ))
+    jami, idlar = tolov_indeks.qidirish(kadastr_raqam, chegara=TOLOV_NATIJA_CHEGARASI)
+    natijalar = _id_tartibida(
+        KadastrMalumat.objects, idlar,
+        'viloyat__nomi', 'tuman__nomi', 'mfy__nomi', 'kocha__nomi', 'kadastr_raqami',
+        'invoys_raqami', 'summa_miqdori', 'tolovchi_fio', 'tolov_holati', 'holat_kodi'
+    )
+    return jami, natijalar
 
 
 def _toshkent_tumanlar():
-    tumanlar = (
-        KadastrMalumat.objects
-        .filter(viloyat__icontains='toshkent')
-        .values_list('tuman', flat=True)
-        .distinct()
-        .order_by('tuman')
+    # Oldindan hisoblangan TumanXulosa'dan (katta jadvalga murojaat qilinmaydi)
+    return toshkent_tumanlari()
+
+
+# (tuman, ma'lumot belgisi, sahifa) -> sahifadagi oxirgi yozuvning (tolovchi_fio, id)
+# kaliti. Keyingi sahifa shu kalitdan keyin keladigan yozuvlardan olinadi (keyset
+# pagination). Belgi kalitda — qayta importdan keyin eski versiya kursorlari ishlatilmaydi.
+_tuman_kursorlari = OrderedDict()
+_tuman_kursorlari_qulf = threading.Lock()
+_TUMAN_KURSORLARI_CHEGARASI = 10000
+
+
+def _kursor_ol(tuman_nomi, belgi, sahifa):
+    with _tuman_kursorlari_qulf:
+        return _tuman_kursorlari.get((tuman_nomi, belgi, sahifa))
+
+
+def _kursor_saqla(tuman_nomi, belgi, sahifa, kursor):
+    with _tuman_kursorlari_qulf:
+        _tuman_kursorlari[tuman_nomi, belgi, sahifa] = kursor
+        _tuman_kursorlari.move_to_end((tuman_nomi, belgi, sahifa))
+        while len(_tuman_kursorlari) > _TUMAN_KURSORLARI_CHEGARASI:
+            _tuman_kursorlari.popitem(last=False)
+
+
+def _tuman_tolanmaganlar(tuman_nomi):
+    return KadastrMalumat.objects.faol().filter(
+        tuman__nomi=tuman_nomi,
+        viloyat__nomi__icontains='toshkent',
+    ).tolanmaganlar()
+
+
+def _tuman_excel(tuman_nomi):
+    """
+    Tumandagi barcha to'lanmagan obyektlar .xlsx fayli (vaqtinchalik fayl).
+    Qatorlar bazadan iterator bilan o'qilib, openpyxl write-only rejimida
+    yoziladi — ro'yxat qancha katta bo'lmasin, xotira o'zgarmaydi.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(tuman_nomi[:31])
+    ws.append(['№', 'Kadastr raqami', 'MFY', "Ko'cha", 'Invoys raqami', "To'lovchi F.I.O",
+               "To'lov miqdori", "To'lov holati"])
+    qatorlar = _tuman_tolanmaganlar(tuman_nomi).order_by('tolovchi_fio', 'id').values_list(
+        'kadastr_raqami', 'mfy__nomi', 'kocha__nomi', 'invoys_raqami', 'tolovchi_fio', 'summa_miqdori', 'tolov_holati'
     )
-    return list(tumanlar)
+    for i, (kadastr, mfy, kocha, invoys, fio, summa, holat) in enumerate(qatorlar.iterator(chunk_size=2000), 1):
+        ws.append([i, kadastr, mfy, kocha, invoys, fio_yashir(fio), summa, holat])
+
+    # MFY bo'yicha jami — bitta GROUP BY/SUM so'rovi (summa_tiyin indeksidan)
+    ws = wb.create_sheet("MFY bo'yicha")
+    ws.append(['MFY', 'Obyektlar soni', "To'lanmagan summa"])
+    for q in _tuman_tolanmaganlar(tuman_nomi).tolanmagan_summalari('mfy__nomi'):
+        ws.append([q['mfy__nomi'], q['soni'], somga(q['summa_tiyin'])])
+
+    fayl = tempfile.TemporaryFile()
+    wb.save(fayl)
+    fayl.seek(0)
+    return fayl
+
+
+def _tuman_fuqarolari(tuman_nomi, sahifa):
+    """
+    Tumandagi to'lanmagan obyektlarning bitta sahifasi: (jami, sahifa, qatorlar).
+
+    Jami soni TumanXulosa'dan olinadi. Sahifa (tuman, tolovchi_fio, id)
+    indeksi bo'yicha oldingi sahifaning oxirgi kalitidan boshlab o'qiladi —
+    N-sahifa ham 1-sahifa kabi arzon. Kalit saqlanmagan bo'lsa (masalan,
+    bot qayta ishga tushganda yoki yangi versiya faollashganda) OFFSET bilan olinadi.
+    """
+    jami = sum(t['tolanmagan'] for t in toshkent_tumanlari() if t['tuman'] == tuman_nomi)
+    if not jami:
+        return 0, 0, []
+    jami_sahifa = (jami + TUMAN_SAHIFA_HAJMI - 1) // TUMAN_SAHIFA_HAJMI
+    sahifa = max(0, min(sahifa, jami_sahifa - 1))
 
+    qs = _tuman_tolanmaganlar(tuman_nomi).values(
+        'id', 'kadastr_raqami', 'mfy__nomi', 'kocha__nomi', 'invoys_raqami', 'tolovchi_fio', 'summa_miqdori', 'tolov_holati'
+    ).order_by('tolovchi_fio', 'id')
+
+    belgi = tolov_indeks.joriy_belgi()
+    kursor = _kursor_ol(tuman_nomi, belgi, sahifa - 1) if sahifa > 0 else None
+    if sahifa == 0:
+        qatorlar = list(qs[:TUMAN_SAHIFA_HAJMI])
+    elif kursor:
+        fio, pk = kursor
+        qatorlar = list(qs.filter(Q(tolovchi_fio__gt=fio) | Q(tolovchi_fio=fio, id__gt=pk))[:TUMAN_SAHIFA_HAJMI])
+    else:
+        boshlash = sahifa * TUMAN_SAHIFA_HAJMI
+        qatorlar = list(qs[boshlash:boshlash + TUMAN_SAHIFA_HAJMI])
 
-def _tuman_fuqarolari(tuman_nomi):
-    qs = KadastrMalumat.objects.filter(
-        viloyat__icontains='toshkent',
-        tuman__iexact=tuman_nomi,
-        tolov_holati__icontains="to'lanmagan"
-    ).values(
-        'kadastr_raqami', 'mfy', 'kocha', 'invoys_raqami', 'tolovchi_fio', 'summa_miqdori', 'tolov_holati'
-    ).order_by('tolovchi_fio')
-    return list(qs)
+    if qatorlar:
+        _kursor_saqla(tuman_nomi, belgi, sahifa, (qatorlar[-1]['tolovchi_fio'], qatorlar[-1]['id']))
+    return jami, sahifa, qatorlar
 
 
-def _obyekt_qidirish(kadastr_raqam):
-    qs = ObyektMalumat.objects.filter(kadastr_raqami__icontains=kadastr_raqam)
-    return list(qs.values('kadastr_raqami', 'viloyat', 'tuman', 'mfy', 'holati'))
+def _ommaviy_qidirish(raqamlar):
+    """Ko'p raqamli qidiruv: (topilganlar soni, natija .xlsx baytlari)"""
+    natijalar = ommaviy.ommaviy_qidirish(raqamlar)
+    topildi = sum(1 for _, tolovlar, holatlar in natijalar if tolovlar or holatlar)
+    return topildi, ommaviy.natija_fayli(natijalar, fio_yashir)
 
 
-# Async wrapperlar
-foydalanuvchi_saqlash = sync_to_async(_foydalanuvchi_saqlash)
-statistika_yangilash = sync_to_async(_statistika_yangilash)
-qidirish = sync_to_async(_qidirish)
-toshkent_tumanlar = sync_to_async(_toshkent_tumanlar)
-tuman_fuqarolari = sync_to_async(_tuman_fuqarolari)
-obyekt_qidirish = sync_to_async(_obyekt_qidirish)
+def _obyekt_qidirish(kadastr_raqam):
+    jami, idlar = obyekt_indeks.qidirish(kadastr_raqam, chegara=OBYEKT_NATIJA_CHEGARASI)
+    natijalar = _id_tartibida(
+        ObyektMalumat.objects, idlar,
+        'kadastr_raqami', 'viloyat__nomi', 'tuman__nomi', 'mfy__nomi', 'holati', 'holat_kodi'
+    )
+    return jami, natijalar
+
+
+# O'qish so'rovlari parallel bajariladi (har bir oqimda o'z ulanishi)
+oqish_ijrochisi = OqishIjrochisi(getattr(settings, 'BOT_OQISH_OQIMLARI', 8))
+
+# Kesh, birlashtirish, cheklov va pool hisoblagichlari /metrics'da
+HisobotOlchovi('bot_javob_keshi', "Javob keshi hisoblagichlari", javob_keshi.hisobot)
+HisobotOlchovi('bot_yagona_sorov', "Birlashtirilgan bir xil qidiruvlar", yagona_sorov.hisobot)
+HisobotOlchovi('bot_sorov_cheklovi', "Foydalanuvchi so'rovlari chegarasi", sorov_cheklovi.hisobot)
+HisobotOlchovi('bot_oqish_pooli', "O'qish pool'i holati", oqish_ijrochisi.hisobot)
+
+# Async wrapperlar. Yozuv (statistika) yagona oqimda — sync_to_async orqali
+statistika_yozish = olchangan_sync_to_async(statistika.yozish)
+qidirish = oqish_ijrochisi.oqish(_qidirish)
+toshkent_tumanlar = oqish_ijrochisi.oqish(_toshkent_tumanlar)
+tuman_fuqarolari = oqish_ijrochisi.oqish(_tuman_fuqarolari)
+tuman_excel = oqish_ijrochisi.oqish(_tuman_excel)
+obyekt_qidirish = oqish_ijrochisi.oqish(_obyekt_qidirish)
+ommaviy_qidirish = oqish_ijrochisi.oqish(_ommaviy_qidirish)
+
+
+async def _cheklovdan_otdi(update: Update, reply_markup=None):
+    """
+    So'rov chegarasi tekshiruvi. Oshib ketgan bo'lsa foydalanuvchiga
+    (ketma-ket rad etishlarda faqat bir marta) ogohlantirish yuboriladi.
+    """
+    kutish, birinchi = sorov_cheklovi.tekshirish(update.effective_user.id)
+    if not kutish:
+        return True
+    matn = (
+        f"⏳ So'rovlar juda tez yuborilmoqda. "
+        f"Iltimos, {math.ceil(kutish)} soniyadan keyin qayta urinib ko'ring."
+    )
+    if update.callback_query:
+        await update.callback_query.answer(matn)
+    elif birinchi:
+        await update.message.reply_text(matn, reply_markup=reply_markup)
+    return False
 
 
 # ─── Asosiy handlerlar ────────────────────────────────────────────────────────
@@ -156,7 +297,7 @@ obyekt_qidirish = sync_to_async(_obyekt_qidirish)
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     ism = f"{user.first_name or ''} {user.last_name or ''}".strip()
-    await foydalanuvchi_saqlash(user.id, ism, user.username or '')
+    statistika.qayd_qilish(user.id, ism, user.username or '', start=True)
     xabar = (
         f"🏛️ E'tirof Tosh Vil.botiga xush kelibsiz!\n\n"
         f"👤 Salom, *{user.first_name}*!\n\n"
@@ -177,7 +318,9 @@ async def yordam(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "t.me/tvkad kanaliga kirishingiz mumkin.\n\n"
         "📌 *Qanday ishlatish:*\n"
         "1. Kadastr raqamingizni yuboring.\n"
-        "2. Bot ma'lumotlarni ko'rsatadi.\n\n"
+        "2. Bot ma'lumotlarni ko'rsatadi.\n"
+        "3. Ko'p raqamni har birini yangi qatordan yoki Excel/CSV fayl "
+        "qilib yuboring — natija Excel faylda qaytadi.\n\n"
         "📌 *Kadastr raqam namunasi:*\n"
         "`11:13:42:02:01:0406`\n\n"
         "❓ Muammo yuzaga kelsa admin bilan bog'laning."
@@ -240,6 +383,41 @@ async def obyekt_holati_start(update: Update, context: ContextTypes.DEFAULT_TYPE
     return OBYEKT_KADASTR_KIRISH
 
 
+def _obyekt_xabari(kiritilgan, jami, natijalar):
+    if not jami:
+        return (
+            f"❌ *Ma'lumot topilmadi!*\n\n"
+            f"🔎 Qidirilgan raqam: `{kiritilgan}`\n\n"
+            f"📌 Kadastr raqamni to'g'ri kiriting yoki boshqa raqam kiriting:\n"
+            f"Namuna: `11:12:41:02:01:0254`\n\n"
+            f"Bekor qilish uchun tugmani bosing."
+        )
+
+    # Natijalar topildi
+    xabar = f"✅ *{jami} ta natija topildi*\n\n" if jami > 1 else ""
+
+    for m in natijalar:
+        holat = m['holati'] or '—'
+        holat_emoji = OBYEKT_BELGILARI[m['holat_kodi']][1]
+
+        xabar += (
+            f"🏠 *Obyekt ma'lumotlari*\n"
+            f"{'─' * 30}\n"
+            f"📋 *Kadastr raqami:* `{m['kadastr_raqami']}`\n"
+            f"🗺️ *Viloyat:* {m['viloyat__nomi'] or '—'}\n"
+            f"🏘️ *Tuman:* {m['tuman__nomi'] or '—'}\n"
+            f"🏡 *MFY:* {m['mfy__nomi'] or '—'}\n"
+            f"{holat_emoji} *Holati:* {holat}\n"
+            f"{'─' * 30}\n\n"
+        )
+
+    if jami > len(natijalar):
+        xabar += f"... va yana {jami - len(natijalar)} ta. 📌 Aniqroq raqam kiriting.\n\n"
+
+    xabar += "🔍 Boshqa kadastr raqam kiriting yoki bekor qiling."
+    return xabar
+
+
 async def obyekt_kadastr_qidirish(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Foydalanuvchi kadastr raqamini kiritdi — qidiruv"""
     kiritilgan = update.message.text.strip()
@@ -260,48 +438,25 @@ async def obyekt_kadastr_qidirish(update: Update, context: ContextTypes.DEFAULT_
         )
         return ConversationHandler.END
 
-    await update.message.reply_chat_action('typing')
-    natijalar = await obyekt_qidirish(kiritilgan)
-
-    if not natijalar:
-        await update.message.reply_text(
-            f"❌ *Ma'lumot topilmadi!*\n\n"
-            f"🔎 Qidirilgan raqam: `{kiritilgan}`\n\n"
-            f"📌 Kadastr raqamni to'g'ri kiriting yoki boshqa raqam kiriting:\n"
-            f"Namuna: `11:12:41:02:01:0254`\n\n"
-            f"Bekor qilish uchun tugmani bosing.",
-            parse_mode='Markdown',
-            reply_markup=BEKOR_TUGMA
-        )
+    if not await _cheklovdan_otdi(update, BEKOR_TUGMA):
         return OBYEKT_KADASTR_KIRISH
 
-    # Natijalar topildi
-    xabar = f"✅ *{len(natijalar)} ta natija topildi*\n\n" if len(natijalar) > 1 else ""
-
-    for m in natijalar:
-        holat = m['holati'] or '—'
-        holat_lower = holat.lower()
-        if 'muhokama' in holat_lower:
-            holat_emoji = "🔄"
-        elif 'rad' in holat_lower or 'bekor' in holat_lower:
-            holat_emoji = "❌"
-        elif 'tasdiqlangan' in holat_lower or 'qabul' in holat_lower:
-            holat_emoji = "✅"
-        else:
-            holat_emoji = "📋"
-
-        xabar += (
-            f"🏠 *Obyekt ma'lumotlari*\n"
-            f"{'─' * 30}\n"
-            f"📋 *Kadastr raqami:* `{m['kadastr_raqami']}`\n"
-            f"🗺️ *Viloyat:* {m['viloyat'] or '—'}\n"
-            f"🏘️ *Tuman:* {m['tuman'] or '—'}\n"
-            f"🏡 *MFY:* {m['mfy'] or '—'}\n"
-            f"{holat_emoji} *Holati:* {holat}\n"
-            f"{'─' * 30}\n\n"
-        )
-
-    xabar += "🔍 Boshqa kadastr raqam kiriting yoki bekor qiling."
+    kesh_kaliti = ('obyekt', kadastr_kalit(kiritilgan))
+    # Belgi qidiruvdan oldin olinadi: qidiruv paytida faollashgan versiya
+    # eski javobni yangi belgi ostida saqlatib qo'ymaydi
+    belgi = obyekt_indeks.belgi
+    saqlangan = javob_keshi.ol(kesh_kaliti, belgi)
+    if saqlangan is None:
+        await update.message.reply_chat_action('typing')
+        jami, natijalar = await yagona_sorov.bajarish(kesh_kaliti, obyekt_qidirish, kiritilgan)
+        saqlangan = {'natija': (jami, natijalar), 'kiritilgan': kiritilgan,
+                     'xabar': _obyekt_xabari(kiritilgan, jami, natijalar)}
+        javob_keshi.qoy(kesh_kaliti, belgi, saqlangan)
+
+    if saqlangan['kiritilgan'] == kiritilgan:
+        xabar = saqlangan['xabar']
+    else:
+        xabar = _obyekt_xabari(kiritilgan, *saqlangan['natija'])
 
     await update.message.reply_text(
         xabar,
@@ -318,39 +473,48 @@ async def obyekt_bekor(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # ─── E'tiroflar (tumanlar) ────────────────────────────────────────────────────
 
-async def etiroflar_tumanlar(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_chat_action('typing')
-    tumanlar = await toshkent_tumanlar()
-
-    if not tumanlar:
-        await update.message.reply_text(
-            "⚠️ Hozircha Toshkent viloyati bo'yicha ma'lumot mavjud emas.",
-            reply_markup=ASOSIY_KLAVIATURA
-        )
-        return
-
+def _tumanlar_xabari(tumanlar):
     keyboard = []
     qator = []
-    for tuman in tumanlar:
-        qator.append(InlineKeyboardButton(f"🏘️ {tuman}", callback_data=f"tuman:{tuman}"))
+    for t in tumanlar:
+        qator.append(InlineKeyboardButton(
+            f"🏘️ {t['tuman']} ({t['tolanmagan']})", callback_data=f"tuman:{t['tuman']}"
+        ))
         if len(qator) == 2:
             keyboard.append(qator)
             qator = []
     if qator:
         keyboard.append(qator)
 
-    await update.message.reply_text(
+    xabar = (
         f"📋 *To'lov jarayonidagi obyektlar*\n"
         f"🗺️ *Toshkent viloyati*\n\n"
+        f"💰 To'lanmagan: *{summa_matni(sum(t['tolanmagan_summa'] for t in tumanlar))}* so'm\n\n"
         f"Quyidagi tumanlardan birini tanlang:\n"
-        f"_(Jami {len(tumanlar)} ta tuman)_",
-        parse_mode='Markdown',
-        reply_markup=InlineKeyboardMarkup(keyboard)
+        f"_(Jami {len(tumanlar)} ta tuman)_"
     )
+    return xabar, InlineKeyboardMarkup(keyboard)
+
+
+async def etiroflar_tumanlar(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    await update.message.reply_chat_action('typing')
+    tumanlar = await toshkent_tumanlar()
+
+    if not tumanlar:
+        await update.message.reply_text(
+            "⚠️ Hozircha Toshkent viloyati bo'yicha ma'lumot mavjud emas.",
+            reply_markup=ASOSIY_KLAVIATURA
+        )
+        return
+
+    xabar, klaviatura = _tumanlar_xabari(tumanlar)
+    await update.message.reply_text(xabar, parse_mode='Markdown', reply_markup=klaviatura)
 
 
 async def tuman_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
+    if not await _cheklovdan_otdi(update):
+        return
     await query.answer()
 
     raw = query.data[len("tuman:"):]
@@ -362,10 +526,9 @@ async def tuman_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         tuman_nomi = raw
         sahifa = 0
 
-    SAHIFA_HAJMI = 15
-    fuqarolar = await tuman_fuqarolari(tuman_nomi)
+    jami, sahifa, sahifa_fuqarolar = await tuman_fuqarolari(tuman_nomi, sahifa)
 
-    if not fuqarolar:
+    if not sahifa_fuqarolar:
         keyboard = [[InlineKeyboardButton("◀️ Tumanlar ro'yxatiga qaytish", callback_data="tumanlar_royxat")]]
         await query.edit_message_text(
             f"✅ *{tuman_nomi}*\n\nBu tumanda to'lov jarayonidagi fuqarolar topilmadi.",
@@ -374,12 +537,8 @@ async def tuman_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    jami = len(fuqarolar)
-    jami_sahifa = (jami + SAHIFA_HAJMI - 1) // SAHIFA_HAJMI
-    sahifa = max(0, min(sahifa, jami_sahifa - 1))
-
-    boshlash = sahifa * SAHIFA_HAJMI
-    sahifa_fuqarolar = fuqarolar[boshlash:boshlash + SAHIFA_HAJMI]
+    jami_sahifa = (jami + TUMAN_SAHIFA_HAJMI - 1) // TUMAN_SAHIFA_HAJMI
+    boshlash = sahifa * TUMAN_SAHIFA_HAJMI
 
     xabar = (
         f"📋 *To'lov jarayonidagi obyektlar*\n"
@@ -395,8 +554,8 @@ async def tuman_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"*{i}.* 👤 {fio_yashir(f['tolovchi_fio'])}\n"
             f"   📋 `{f['kadastr_raqami']}`\n"
             f"🧾 *Invoys raqami:* {f['invoys_raqami']}\n"
-            f"🏘️ {f['mfy']}\n"
-            f"🏘️  {f['kocha']}\n"
+            f"🏘️ {f['mfy__nomi']}\n"
+            f"🏘️  {f['kocha__nomi']}\n"
             f"   💰 {summa} so'm\n"
             f"   ❌ {f['tolov_holati']}\n\n"
         )
@@ -410,6 +569,7 @@ async def tuman_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     keyboard = []
     if nav_buttons:
         keyboard.append(nav_buttons)
+    keyboard.append([InlineKeyboardButton("📥 Excel", callback_data=f"tuman_excel:{tuman_nomi}")])
     keyboard.append([InlineKeyboardButton("◀️ Tumanlar ro'yxatiga qaytish", callback_data="tumanlar_royxat")])
 
     await query.edit_message_text(
@@ -419,33 +579,101 @@ async def tuman_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+# (tuman, ma'lumot belgisi) -> yuborilgan Excel faylning Telegram file_id'si.
+# Yangi upload faollashsa belgi o'zgaradi va fayl qayta yaratiladi.
+_tuman_excel_fayllari = OrderedDict()
+_TUMAN_EXCEL_FAYLLARI_CHEGARASI = 1000
+
+
+async def _tuman_excel_yuborish(message, tuman_nomi):
+    """Faylni yaratib yuboradi; (file_id, chat_id) qaytaradi"""
+    with await tuman_excel(tuman_nomi) as fayl:
+        xabar = await message.reply_document(
+            document=fayl,
+            filename=f"{tuman_nomi} - to'lanmaganlar.xlsx",
+            caption=f"📥 *{tuman_nomi}*: to'lov jarayonidagi obyektlar",
+            parse_mode='Markdown',
+        )
+    return (xabar.document.file_id if xabar.document else None), message.chat_id
+
+
+async def tuman_excel_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    if not await _cheklovdan_otdi(update):
+        return
+    tuman_nomi = query.data[len("tuman_excel:"):]
+    kalit = (tuman_nomi, tolov_indeks.belgi)
+
+    file_id = _tuman_excel_fayllari.get(kalit)
+    if file_id:
+        await query.answer()
+        await query.message.reply_document(document=file_id)
+        return
+
+    await query.answer("⏳ Excel fayl tayyorlanmoqda...")
+    await query.message.reply_chat_action('upload_document')
+    # Bir vaqtda bosilgan tugmalar bitta faylni kutadi; u yuborilgach
+    # boshqa chatlarga Telegram'dagi nusxasi (file_id) jo'natiladi
+    file_id, chat_id = await yagona_sorov.bajarish(
+        ('tuman_excel',) + kalit, _tuman_excel_yuborish, query.message, tuman_nomi
+    )
+    if file_id and chat_id != query.message.chat_id:
+        await query.message.reply_document(document=file_id)
+    if file_id and kalit[1] is not None:
+        _tuman_excel_fayllari[kalit] = file_id
+        while len(_tuman_excel_fayllari) > _TUMAN_EXCEL_FAYLLARI_CHEGARASI:
+            _tuman_excel_fayllari.popitem(last=False)
+
+
 async def tumanlar_royxat_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
 
     tumanlar = await toshkent_tumanlar()
-    keyboard = []
-    qator = []
-    for tuman in tumanlar:
-        qator.append(InlineKeyboardButton(f"🏘️ {tuman}", callback_data=f"tuman:{tuman}"))
-        if len(qator) == 2:
-            keyboard.append(qator)
-            qator = []
-    if qator:
-        keyboard.append(qator)
-
-    await query.edit_message_text(
-        f"📋 *To'lov jarayonidagi obyektlar*\n"
-        f"🗺️ *Toshkent viloyati*\n\n"
-        f"Quyidagi tumanlardan birini tanlang:\n"
-        f"_(Jami {len(tumanlar)} ta tuman)_",
-        parse_mode='Markdown',
-        reply_markup=InlineKeyboardMarkup(keyboard)
-    )
+    xabar, klaviatura = _tumanlar_xabari(tumanlar)
+    await query.edit_message_text(xabar, parse_mode='Markdown', reply_markup=klaviatura)
 
 
 # ─── Kadastr to'lov qidirish ──────────────────────────────────────────────────
 
+def _tolov_xabari(kiritilgan, jami, natijalar):
+    if not jami:
+        return (
+            f"❌ *Ma'lumot topilmadi!*\n\n"
+            f"🔎 Qidirilgan raqam: `{kiritilgan}`\n\n"
+            f"📌 Iltimos, kadastr raqamni to'g'ri kiriting.\n"
+            f"Namuna: `11:13:42:02:01:0406`"
+        )
+
+    if jami > 1:
+        xabar = f"🔍 `{kiritilgan}` bo'yicha *{jami} ta natija* topildi:\n\n"
+        for i, m in enumerate(natijalar, 1):
+            xabar += f"{i}. `{m['kadastr_raqami']}` — {fio_yashir(m['tolovchi_fio'])}\n"
+        if jami > len(natijalar):
+            xabar += f"\n... va yana {jami - len(natijalar)} ta\n"
+        xabar += "\n📌 Aniqroq raqam kiriting."
+        return xabar
+
+    m = natijalar[0]
+    holat = m['tolov_holati'] or ''
+    holat_emoji = TOLOV_BELGILARI[m['holat_kodi']][1]
+
+    return (
+        f"✅ *Ma'lumot topildi!*\n"
+        f"{'─' * 30}\n"
+        f"🗺️ *Viloyat:* {m['viloyat__nomi']}\n"
+        f"🏘️ *Tuman:* {m['tuman__nomi']}\n"
+        f"🏘️ *Mahalla:* {m['mfy__nomi']}\n"
+        f"🏘️ *Ko'cha nomi:* {m['kocha__nomi']}\n"
+        f"📋 *Kadastr raqami:* `{m['kadastr_raqami']}`\n"
+        f"🧾 *Invoys raqami:* `{m['invoys_raqami']}`\n"
+        f"💰 *To'lov miqdori:* `{m['summa_miqdori']}` so'm\n"
+        f"👤 *To'lovchi F.I.O:* {fio_yashir(m['tolovchi_fio'])}\n"
+        f"{holat_emoji} *To'lov holati:* {holat}\n"
+        f"{'─' * 30}"
+    )
+
+
 async def kadastr_qidirish(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user = update.effective_user
     kiritilgan = update.message.text.strip()
@@ -481,68 +709,165 @@ async def kadastr_qidirish(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Agar hech qaysi tugma bo'lmasa — kadastr raqam sifatida qidirish
     ism = f"{user.first_name or ''} {user.last_name or ''}".strip()
-    await statistika_yangilash(user.id, ism, user.username or '')
-    await update.message.reply_chat_action('typing')
+    statistika.qayd_qilish(user.id, ism, user.username or '')
+
+    if not await _cheklovdan_otdi(update, ASOSIY_KLAVIATURA):
+        return
+
+    # Har bir qatorda bittadan raqam — ommaviy qidiruv
+    if '\n' in kiritilgan:
+        raqamlar = ommaviy.matndan_raqamlar(kiritilgan)
+        if len(raqamlar) > 1:
+            await _ommaviy_javob(update, raqamlar)
+            return
+
+    kesh_kaliti = ('tolov', kadastr_kalit(kiritilgan))
+    belgi = tolov_indeks.belgi
+    saqlangan = javob_keshi.ol(kesh_kaliti, belgi)
+    if saqlangan is None:
+        await update.message.reply_chat_action('typing')
+        jami, natijalar = await yagona_sorov.bajarish(kesh_kaliti, qidirish, kiritilgan)
+        saqlangan = {'natija': (jami, natijalar), 'kiritilgan': kiritilgan,
+                     'xabar': _tolov_xabari(kiritilgan, jami, natijalar)}
+        javob_keshi.qoy(kesh_kaliti, belgi, saqlangan)
+
+    if saqlangan['kiritilgan'] == kiritilgan:
+        xabar = saqlangan['xabar']
+    else:
+        xabar = _tolov_xabari(kiritilgan, *saqlangan['natija'])
+
+    await update.message.reply_text(xabar, parse_mode='Markdown', reply_markup=ASOSIY_KLAVIATURA)
+
 
-    natijalar = await qidirish(kiritilgan)
+# ─── Ommaviy qidiruv (ko'p raqam yoki fayl) ──────────────────────────────────
 
-    if not natijalar:
+async def _ommaviy_javob(update: Update, raqamlar):
+    if len(raqamlar) > ommaviy.chegara():
         await update.message.reply_text(
-            f"❌ *Ma'lumot topilmadi!*\n\n"
-            f"🔎 Qidirilgan raqam: `{kiritilgan}`\n\n"
-            f"📌 Iltimos, kadastr raqamni to'g'ri kiriting.\n"
-            f"Namuna: `11:13:42:02:01:0406`",
-            parse_mode='Markdown',
+            f"⚠️ Bir martada ko'pi bilan {ommaviy.chegara()} ta raqam qidirish mumkin "
+            f"(yuborilgani: {len(raqamlar)} ta).",
             reply_markup=ASOSIY_KLAVIATURA
         )
         return
 
-    if len(natijalar) > 1:
-        xabar = f"🔍 `{kiritilgan}` bo'yicha *{len(natijalar)} ta natija* topildi:\n\n"
-        for i, m in enumerate(natijalar[:5], 1):
-            xabar += f"{i}. `{m['kadastr_raqami']}` — {fio_yashir(m['tolovchi_fio'])}\n"
-        if len(natijalar) > 5:
-            xabar += f"\n... va yana {len(natijalar) - 5} ta\n"
-        xabar += "\n📌 Aniqroq raqam kiriting."
-        await update.message.reply_text(xabar, parse_mode='Markdown', reply_markup=ASOSIY_KLAVIATURA)
+    await update.message.reply_chat_action('upload_document')
+    topildi, fayl = await ommaviy_qidirish(raqamlar)
+    await update.message.reply_document(
+        document=fayl,
+        filename='kadastr_natijalar.xlsx',
+        caption=(
+            f"📊 *{len(raqamlar)} ta* raqamdan *{topildi} tasi* topildi.\n"
+            f"👤 To'lovchi F.I.O yashirilgan."
+        ),
+        parse_mode='Markdown',
+        reply_markup=ASOSIY_KLAVIATURA
+    )
+
+
+async def ommaviy_fayl(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Yuborilgan .xlsx / .csv fayldagi kadastr raqamlari bo'yicha qidiruv"""
+    hujjat = update.message.document
+    user = update.effective_user
+    ism = f"{user.first_name or ''} {user.last_name or ''}".strip()
+    statistika.qayd_qilish(user.id, ism, user.username or '')
+
+    if hujjat.file_size and hujjat.file_size > getattr(settings, 'BOT_OMMAVIY_FAYL_HAJMI', 5 * 1024 * 1024):
+        await update.message.reply_text("⚠️ Fayl hajmi juda katta.", reply_markup=ASOSIY_KLAVIATURA)
+        return
+    if not await _cheklovdan_otdi(update, ASOSIY_KLAVIATURA):
         return
 
-    m = natijalar[0]
-    holat = m['tolov_holati'] or ''
-    if "to'lanmagan" in holat.lower():
-        holat_emoji = "❌"
-    elif "to'langan" in holat.lower():
-        holat_emoji = "✅"
-    else:
-        holat_emoji = "⏳"
+    fayl = await hujjat.get_file()
+    baytlar = bytes(await fayl.download_as_bytearray())
+    try:
+        raqamlar = await asyncio.to_thread(ommaviy.fayldan_raqamlar, hujjat.file_name or '', baytlar)
+    except Exception:
+        logger.exception("Ommaviy qidiruv fayli o'qilmadi")
+        raqamlar = None
+    if not raqamlar:
+        await update.message.reply_text(
+            "❌ Fayldan kadastr raqamlari topilmadi.\n\n"
+            "📌 Raqamlar birinchi ustunda yoki sarlavhasi \"Kadastr raqami\" bo'lgan ustunda bo'lishi kerak.",
+            reply_markup=ASOSIY_KLAVIATURA
+        )
+        return
 
-    xabar = (
-        f"✅ *Ma'lumot topildi!*\n"
-        f"{'─' * 30}\n"
-        f"🗺️ *Viloyat:* {m['viloyat']}\n"
-        f"🏘️ *Tuman:* {m['tuman']}\n"
-        f"🏘️ *Mahalla:* {m['mfy']}\n"
-        f"🏘️ *Ko'cha nomi:* {m['kocha']}\n"
-        f"📋 *Kadastr raqami:* `{m['kadastr_raqami']}`\n"
-        f"🧾 *Invoys raqami:* `{m['invoys_raqami']}`\n"
-        f"💰 *To'lov miqdori:* `{m['summa_miqdori']}` so'm\n"
-        f"👤 *To'lovchi F.I.O:* {fio_yashir(m['tolovchi_fio'])}\n"
-        f"{holat_emoji} *To'lov holati:* {holat}\n"
-        f"{'─' * 30}"
-    )
-    await update.message.reply_text(xabar, parse_mode='Markdown', reply_markup=ASOSIY_KLAVIATURA)
+    await _ommaviy_javob(update, raqamlar)
 
 
-# ─── Main ─────────────────────────────────────────────────────────────────────
+# ─── Fon vazifalari ───────────────────────────────────────────────────────────
 
-def main():
-    token = settings.TELEGRAM_BOT_TOKEN
-    if not token:
-        print("❌ XATO: TELEGRAM_BOT_TOKEN o'rnatilmagan!")
-        sys.exit(1)
+async def _statistikani_davriy_yozish():
+    oraliq = getattr(settings, 'STATISTIKA_YOZISH_ORALIGI', 5)
+    while True:
+        await asyncio.sleep(oraliq)
+        try:
+            await statistika_yozish()
+        except Exception:
+            logger.exception("Statistikani yozishda xatolik")
 
-    print("🤖 Kadastr Bot ishga tushmoqda...")
-    app = Application.builder().token(token).build()
+
+def _indekslarni_tekshirish():
+    tolov_indeks.tayyorlash()
+    obyekt_indeks.tayyorlash()
+
+
+async def _indekslarni_davriy_tekshirish():
+    # Keshdan javob berilganda ham yangi upload faollashgani o'z vaqtida sezilishi uchun
+    oraliq = getattr(settings, 'KADASTR_INDEKS_TEKSHIRISH', 30)
+    while True:
+        await asyncio.sleep(oraliq)
+        try:
+            await olchangan_sync_to_async(_indekslarni_tekshirish)()
+        except Exception:
+            logger.exception("Indekslarni tekshirishda xatolik")
+        logger.debug("Javob keshi: %s", javob_keshi.hisobot())
+        logger.debug("O'qish pool'i: %s", oqish_ijrochisi.hisobot())
+        logger.debug("Birlashtirish: %s, cheklov: %s", yagona_sorov.hisobot(), sorov_cheklovi.hisobot())
+
+
+async def post_init(app: Application):
+    app.bot_data['statistika_vazifasi'] = asyncio.create_task(_statistikani_davriy_yozish())
+    app.bot_data['indeks_vazifasi'] = asyncio.create_task(_indekslarni_davriy_tekshirish())
+
+
+async def post_shutdown(app: Application):
+    for nomi in ('statistika_vazifasi', 'indeks_vazifasi'):
+        vazifa = app.bot_data.pop(nomi, None)
+        if vazifa:
+            vazifa.cancel()
+    # Xotirada qolgan hisoblagichlar yo'qolmasligi uchun
+    await statistika_yozish()
+    await asyncio.to_thread(oqish_ijrochisi.toxtatish)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def application_qurish(token, webhook=False):
+    """
+    Handlerlari ulangan Application'ni quradi (polling ham, webhook ham shuni ishlatadi).
+    webhook=True bo'lsa Updater yaratilmaydi — update'lar tashqaridan
+    (bot/webhook.py) update_queue'ga qo'yiladi.
+    """
+    builder = (
+        Application.builder()
+        .token(token)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        # Update'lar parallel qayta ishlanadi — bir xil qidiruvlar birlashadi, o'qishlar pool'da bajariladi
+        .concurrent_updates(getattr(settings, 'BOT_PARALLEL_UPDATELAR', 64))
+    )
+    if getattr(settings, 'TELEGRAM_SOXTA_API', False):
+        from bot.soxta_api import SoxtaSorov
+        sorov = SoxtaSorov()
+        builder = builder.get_updates_request(SoxtaSorov())
+    else:
+        # Builder standarti bilan bir xil pool; getUpdates (long polling) o'lchanmaydi
+        sorov = HTTPXRequest(connection_pool_size=256)
+    builder = builder.request(metrikalar.OlchanadiganSorov(sorov))
+    if webhook:
+        builder = builder.updater(None)
+    app = builder.build()
 
     # Obyekt holati ConversationHandler
     obyekt_conv = ConversationHandler(
@@ -586,13 +911,60 @@ def main():
     # Inline callback handlerlar
     app.add_handler(CallbackQueryHandler(tumanlar_royxat_callback, pattern="^tumanlar_royxat$"))
     app.add_handler(CallbackQueryHandler(tuman_callback, pattern="^tuman:"))
+    app.add_handler(CallbackQueryHandler(tuman_excel_callback, pattern="^tuman_excel:"))
+
+    # Ommaviy qidiruv uchun .xlsx / .csv fayllar
+    app.add_handler(MessageHandler(
+        filters.Document.FileExtension('xlsx') | filters.Document.FileExtension('csv'),
+        ommaviy_fayl
+    ))
 
     # Umumiy text handler (kadastr qidirish va tugma yo'naltirish)
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, kadastr_qidirish))
 
+    # Har bir handler davomiyligi va update'dagi SQL so'rovlar /metrics'da
+    metrikalar.handlerlarni_olchash(app)
+    return app
+
+
+async def webhook_ornatish(token):
+    """Telegram'ga webhook manzili va maxfiy tokenni ro'yxatdan o'tkazadi"""
+    app = application_qurish(token, webhook=True)
+    async with app:
+        await app.bot.set_webhook(
+            url=settings.TELEGRAM_WEBHOOK_URL,
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=True,
+        )
+
+
+def main():
+    token = settings.TELEGRAM_BOT_TOKEN
+    if not token:
+        print("❌ XATO: TELEGRAM_BOT_TOKEN o'rnatilmagan!")
+        sys.exit(1)
+
+    if '--webhook' in sys.argv[1:]:
+        # Update'larni ASGI ishchilari qabul qiladi (bot/webhook.py), bu yerda faqat ro'yxatdan o'tkaziladi
+        if not (getattr(settings, 'TELEGRAM_WEBHOOK_URL', '') and getattr(settings, 'TELEGRAM_WEBHOOK_SECRET', '')):
+            print("❌ XATO: TELEGRAM_WEBHOOK_URL va TELEGRAM_WEBHOOK_SECRET o'rnatilmagan!")
+            sys.exit(1)
+        asyncio.run(webhook_ornatish(token))
+        print(f"✅ Webhook o'rnatildi: {settings.TELEGRAM_WEBHOOK_URL}")
+        return
+
+    print("🤖 Kadastr Bot ishga tushmoqda...")
+    _indekslarni_tekshirish()
+    if getattr(settings, 'BOT_METRIKA_PORTI', 0):
+        metrikalar.server_ishga_tushirish(
+            settings.BOT_METRIKA_PORTI, getattr(settings, 'BOT_METRIKA_MANZIL', '127.0.0.1')
+        )
+    app = application_qurish(token)
+
     print("✅ Bot muvaffaqiyatli ishga tushdi!")
     app.run_polling(drop_pending_updates=True)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,93 @@
+"""
+Bot qidiruvlari oqimini boshqarish.
+
+YagonaSorov — bir vaqtda kelgan bir xil qidiruvlar (masalan, kanalda
+e'lon chiqqanda yuzlab foydalanuvchi yuborgan bitta kadastr raqami)
+bitta bazaviy so'rovni kutadi.
+TokenChelak — har bir foydalanuvchi uchun token-bucket: bitta chat
+barcha so'rov quvvatini egallab olmasligi uchun bazaga murojaatdan oldin tekshiriladi.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class YagonaSorov:
+    """Bir xil kalitli parallel so'rovlarni bitta vazifaga birlashtiradi (single-flight)"""
+
+    def __init__(self):
+        self._jarayonda = {}
+        self.bajarildi = 0
+        self.birlashtirildi = 0
+
+    def _tugadi(self, kalit, vazifa):
+        if self._jarayonda.get(kalit) is vazifa:
+            del self._jarayonda[kalit]
+        # Hamma kutuvchilar bekor qilingan bo'lsa ham xato "olinmagan" bo'lib qolmasin
+        if not vazifa.cancelled():
+            vazifa.exception()
+
+    async def bajarish(self, kalit, funksiya, *args):
+        vazifa = self._jarayonda.get(kalit)
+        if vazifa is None:
+            vazifa = asyncio.ensure_future(funksiya(*args))
+            self._jarayonda[kalit] = vazifa
+            vazifa.add_done_callback(lambda v: self._tugadi(kalit, v))
+            self.bajarildi += 1
+        else:
+            self.birlashtirildi += 1
+        # Bitta kutuvchi bekor qilinsa umumiy so'rov to'xtamaydi
+        return await asyncio.shield(vazifa)
+
+    def hisobot(self):
+        return {
+            'jarayonda': len(self._jarayonda),
+            'bajarildi': self.bajarildi,
+            'birlashtirildi': self.birlashtirildi,
+        }
+
+
+class TokenChelak:
+    """
+    Foydalanuvchi bo'yicha token-bucket: `sigim` tagacha ketma-ket so'rov,
+    keyin soniyasiga `tezlik` ta. Xotirada eng oxirgi `hajm` ta foydalanuvchi saqlanadi.
+    """
+
+    def __init__(self, sigim=5, tezlik=0.5, hajm=100000):
+        self.sigim = sigim
+        self.tezlik = tezlik
+        self.hajm = hajm
+        self._chelaklar = OrderedDict()
+        self._qulf = threading.Lock()
+        self.ruxsat_berildi = 0
+        self.rad_etildi = 0
+
+    def tekshirish(self, kalit):
+        """
+        So'rovga ruxsat bo'lsa (0.0, False), aks holda (kutish soniyasi, birinchi_rad).
+        birinchi_rad — ketma-ket rad etishlarning birinchisi (ogohlantirish bir marta yuboriladi).
+        """
+        hozir = time.monotonic()
+        with self._qulf:
+            tokenlar, oxirgi, rad_qatori = self._chelaklar.pop(kalit, (self.sigim, hozir, 0))
+            tokenlar = min(self.sigim, tokenlar + (hozir - oxirgi) * self.tezlik)
+            if tokenlar >= 1:
+                self._chelaklar[kalit] = (tokenlar - 1, hozir, 0)
+                natija = (0.0, False)
+                self.ruxsat_berildi += 1
+            else:
+                self._chelaklar[kalit] = (tokenlar, hozir, rad_qatori + 1)
+                natija = ((1 - tokenlar) / self.tezlik, rad_qatori == 0)
+                self.rad_etildi += 1
+            while len(self._chelaklar) > self.hajm:
+                self._chelaklar.popitem(last=False)
+        return natija
+
+    def hisobot(self):
+        with self._qulf:
+            return {
+                'foydalanuvchilar': len(self._chelaklar),
+                'ruxsat_berildi': self.ruxsat_berildi,
+                'rad_etildi': self.rad_etildi,
+            }
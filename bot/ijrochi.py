@@ -0,0 +1,141 @@
+"""
+Bot uchun o'qish so'rovlari ijrochisi.
+
+sync_to_async standart holatda (thread_sensitive=True) barcha ORM
+chaqiruvlarini bitta umumiy oqimda navbat bilan bajaradi — bir vaqtda
+kelgan 200 ta qidiruvning oxirgisi oldingi 199 tasini kutadi.
+OqishIjrochisi o'qish so'rovlarini cheklangan thread-pool'da parallel
+bajaradi; Django ulanishlari oqimga bog'liq, shuning uchun har bir oqim
+o'z ulanishini ochadi va to'xtatishda o'zi yopadi. Pool'dagi o'qishlar
+faqat o'qiladigan 'oqish' ulanishiga yo'naltiriladi (kadastr_app.routers).
+
+Yozuvlar (statistika) avvalgidek sync_to_async orqali yagona oqimda qoladi.
+Ikkala yo'lda ham navbatda kutish vaqti bot_navbat_kutish_soniyalari
+metrikasiga yoziladi.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, connections
+
+from bot.metrikalar import navbat_kutishi
+from kadastr_app.routers import faqat_oqish
+
+logger = logging.getLogger(__name__)
+
+
+def olchangan_sync_to_async(funksiya):
+    """sync_to_async, navbatda (umumiy oqimda) kutish vaqti o'lchanadi"""
+    @functools.wraps(funksiya)
+    async def orama(*args, **kwargs):
+        qoyilgan = time.monotonic()
+
+        def bajar():
+            navbat_kutishi.kuzatish(time.monotonic() - qoyilgan, ijrochi='sync_to_async')
+            return funksiya(*args, **kwargs)
+        return await sync_to_async(bajar)()
+    return orama
+
+
+class OqishIjrochisi:
+    """
+    O'qish uchun cheklangan thread-pool va uning hisoblagichlari.
+    hajm = 0 bo'lsa pool ishlatilmaydi — avvalgi sync_to_async yo'li.
+    """
+
+    def __init__(self, hajm=8, namuna=1000):
+        self.hajm = hajm
+        self._pool = None
+        self._qulf = threading.Lock()
+        self.navbatda = 0
+        self.bajarilmoqda = 0
+        self.bajarildi = 0
+        self._kutishlar = deque(maxlen=namuna)
+
+    def _pool_ol(self):
+        with self._qulf:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.hajm, thread_name_prefix='db-oqish')
+            return self._pool
+
+    def _bajar(self, qoyilgan, kontekst, funksiya, args, kwargs):
+        kutish = time.monotonic() - qoyilgan
+        with self._qulf:
+            self.navbatda -= 1
+            self.bajarilmoqda += 1
+            self._kutishlar.append(kutish)
+        navbat_kutishi.kuzatish(kutish, ijrochi='oqish')
+        try:
+            return kontekst.run(funksiya, *args, **kwargs)
+        except DatabaseError:
+            # Buzilgan ulanish keyingi so'rovda qayta ochiladi
+            connections.close_all()
+            raise
+        finally:
+            with self._qulf:
+                self.bajarilmoqda -= 1
+                self.bajarildi += 1
+
+    async def bajarish(self, funksiya, *args, **kwargs):
+        if not self.hajm:
+            return await olchangan_sync_to_async(funksiya)(*args, **kwargs)
+        with self._qulf:
+            self.navbatda += 1
+        kontekst = contextvars.copy_context()
+        kontekst.run(faqat_oqish.set, True)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool_ol(), self._bajar, time.monotonic(), kontekst, funksiya, args, kwargs,
+        )
+
+    def oqish(self, funksiya):
+        """Sync o'qish funksiyasini pool'da bajariladigan async funksiyaga o'raydi"""
+        @functools.wraps(funksiya)
+        async def orama(*args, **kwargs):
+            return await self.bajarish(funksiya, *args, **kwargs)
+        return orama
+
+    def hisobot(self):
+        """Navbat chuqurligi, bajarilayotganlar va kutish vaqti (o'rtacha / p99, soniya)"""
+        with self._qulf:
+            kutishlar = sorted(self._kutishlar)
+            return {
+                'oqimlar': self.hajm,
+                'navbatda': self.navbatda,
+                'bajarilmoqda': self.bajarilmoqda,
+                'bajarildi': self.bajarildi,
+                'kutish_ortacha': sum(kutishlar) / len(kutishlar) if kutishlar else 0.0,
+                'kutish_p99': kutishlar[int(len(kutishlar) * 0.99)] if kutishlar else 0.0,
+            }
+
+    def toxtatish(self, muddat=10):
+        """
+        Pool'ni to'xtatadi. Har bir oqim o'z ulanishini yopishi uchun barcha
+        oqimlarga bittadan yopish vazifasi beriladi; Barrier ularni bir vaqtda
+        ushlab turadi, shunda bitta oqim ikkita vazifani olib ketmaydi.
+        """
+        with self._qulf:
+            pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        tosiq = threading.Barrier(self.hajm, timeout=muddat)
+
+        def yopish():
+            try:
+                tosiq.wait()
+            except threading.BrokenBarrierError:
+                pass
+            finally:
+                connections.close_all()
+
+        for _ in range(self.hajm):
+            pool.submit(yopish)
+        pool.shutdown(wait=True)
+        logger.info("O'qish pool'i to'xtatildi: %s", self.hisobot())
@@ -0,0 +1,152 @@
+"""
+Bot metrikalari (kadastr_app.metrikalar reestrida).
+
+- har bir handler uchun davomiylik, xatolar va shu update'dagi SQL so'rovlar soni/vaqti;
+- Telegram Bot API chaqiruvlari kechikishi (OlchanadiganSorov);
+- bazaga navbat kutish vaqti (bot.ijrochi);
+- polling rejimida /metrics uchun kichik HTTP server (BOT_METRIKA_PORTI).
+  Webhook rejimida bot Django jarayonida ishlaydi — metrikalar /metrics/ da.
+"""
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from telegram.ext import ConversationHandler
+from telegram.request import BaseRequest
+
+from kadastr_app.metrikalar import (
+    MATN_TURI, SON_CHEGARALARI, Gistogramma, Hisoblagich, mahalliy_manzil, matn, ruxsat_bor, sorovlarni_sanash,
+)
+
+logger = logging.getLogger(__name__)
+
+handler_vaqti = Gistogramma('bot_handler_soniyalari', "Handlerning bajarilish vaqti", ('handler',))
+handler_xatolari = Hisoblagich('bot_handler_xatolar_total', "Xato bilan tugagan handlerlar", ('handler',))
+update_db_sorovlari = Gistogramma(
+    'bot_update_db_sorovlari', "Bitta update'dagi SQL so'rovlar soni", ('handler',), chegaralar=SON_CHEGARALARI
+)
+update_db_vaqti = Gistogramma('bot_update_db_soniyalari', "Bitta update'dagi SQL so'rovlar vaqti", ('handler',))
+api_vaqti = Gistogramma(
+    'bot_telegram_api_soniyalari', "Telegram Bot API chaqiruvi kechikishi", ('metod', 'natija')
+)
+navbat_kutishi = Gistogramma(
+    'bot_navbat_kutish_soniyalari', "Baza funksiyasi bajarilishidan oldin navbatda kutish", ('ijrochi',)
+)
+
+
+def olchanadigan(callback):
+    """Handler callback'ini o'lchaydigan o'ram; nomi — funksiya nomi"""
+    nomi = callback.__name__
+
+    @functools.wraps(callback)
+    async def orama(update, context):
+        boshlanish = time.perf_counter()
+        with sorovlarni_sanash() as hisob:
+            try:
+                return await callback(update, context)
+            except Exception:
+                handler_xatolari.qosh(handler=nomi)
+                raise
+            finally:
+                handler_vaqti.kuzatish(time.perf_counter() - boshlanish, handler=nomi)
+                update_db_sorovlari.kuzatish(hisob.soni, handler=nomi)
+                update_db_vaqti.kuzatish(hisob.soniya, handler=nomi)
+    orama.olchanadi = True
+    return orama
+
+
+def _handlerni_olchash(handler):
+    if isinstance(handler, ConversationHandler):
+        ichki = [*handler.entry_points, *handler.fallbacks]
+        for holat_handlerlari in handler.states.values():
+            ichki.extend(holat_handlerlari)
+        for h in ichki:
+            _handlerni_olchash(h)
+    elif not getattr(handler.callback, 'olchanadi', False):
+        handler.callback = olchanadigan(handler.callback)
+
+
+def handlerlarni_olchash(app):
+    """Application'ga qo'shilgan barcha handlerlarni (ConversationHandler ichidagilarni ham) o'raydi"""
+    for handlerlar in app.handlers.values():
+        for handler in handlerlar:
+            _handlerni_olchash(handler)
+
+
+class OlchanadiganSorov(BaseRequest):
+    """Boshqa BaseRequest'ni o'rab, har bir Bot API chaqiruvi vaqtini metod bo'yicha yozadi"""
+
+    def __init__(self, ichki):
+        self.ichki = ichki
+
+    def __getattr__(self, nom):
+        # Masalan, SoxtaSorov.chaqiruvlar
+        return getattr(self.ichki, nom)
+
+    @property
+    def read_timeout(self):
+        return self.ichki.read_timeout
+
+    async def initialize(self):
+        await self.ichki.initialize()
+
+    async def shutdown(self):
+        await self.ichki.shutdown()
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        metod = url.rsplit('/', 1)[-1]
+        boshlanish = time.perf_counter()
+        natija = 'xato'
+        try:
+            kod, javob = await self.ichki.do_request(
+                url, method, request_data=request_data, read_timeout=read_timeout,
+                write_timeout=write_timeout, connect_timeout=connect_timeout, pool_timeout=pool_timeout,
+            )
+            natija = str(kod)
+            return kod, javob
+        except Exception as e:
+            natija = type(e).__name__
+            raise
+        finally:
+            api_vaqti.kuzatish(time.perf_counter() - boshlanish, metod=metod, natija=natija)
+
+
+class _MetrikaHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0].rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        if not ruxsat_bor(self.headers.get('Authorization', ''), self.client_address[0]):
+            self.send_error(403)
+            return
+        tana = matn().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', MATN_TURI)
+        self.send_header('Content-Length', str(len(tana)))
+        self.end_headers()
+        self.wfile.write(tana)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrika so'rovi: " + format, *args)
+
+
+def server_ishga_tushirish(port, manzil='127.0.0.1'):
+    """
+    /metrics endpoint'ini fon oqimida ochadi. METRIKA_TOKEN bo'lmasa
+    faqat loopback manzilda tinglaydi — tashqi interfeysda ochiq qolmaydi.
+    """
+    if not getattr(settings, 'METRIKA_TOKEN', '') and not mahalliy_manzil(manzil):
+        raise ImproperlyConfigured(
+            f"Metrikalar {manzil} manzilida METRIKA_TOKEN'siz ochilmaydi: tokenni o'rnating "
+            "yoki BOT_METRIKA_MANZIL = '127.0.0.1' qoldiring"
+        )
+    server = ThreadingHTTPServer((manzil, port), _MetrikaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrikalar', daemon=True).start()
+    logger.info("Metrikalar: http://%s:%d/metrics", manzil, server.server_address[1])
+    return server
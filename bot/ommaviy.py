@@ -0,0 +1,125 @@
+"""
+Ommaviy (ko'p raqamli) kadastr qidiruvi.
+
+Bir xabardagi ko'p qatorli raqamlar yoki yuborilgan .xlsx/.csv fayl
+bitta IN so'rovi bilan (har bir jadvalga bittadan) qidiriladi va natija
+bitta Excel fayl sifatida qaytariladi.
+"""
+import csv
+import io
+
+import openpyxl
+from django.conf import settings
+
+from kadastr_app.kalit import kadastr_kalit
+from kadastr_app.models import KadastrMalumat, ObyektMalumat
+
+# Bitta IN (...) so'rovidagi kalitlar soni
+_IN_PAKET = 10000
+
+SARLAVHALAR = [
+    'Kiritilgan raqam', 'Natija', 'Viloyat', 'Tuman', 'MFY', "Ko'cha", 'Kadastr raqami',
+    'Invoys raqami', "To'lov miqdori", "To'lovchi F.I.O", "To'lov holati", 'Obyekt holati',
+]
+
+
+def chegara():
+    return getattr(settings, 'BOT_OMMAVIY_CHEGARASI', 5000)
+
+
+def _yagona(qiymatlar):
+    """Bo'sh va takroriy (bir xil kalitli) raqamlarni tashlab, tartibni saqlaydi"""
+    korilgan = set()
+    natija = []
+    for qiymat in qiymatlar:
+        qiymat = str(qiymat).strip() if qiymat is not None else ''
+        kalit = kadastr_kalit(qiymat)
+        if kalit and kalit not in korilgan:
+            korilgan.add(kalit)
+            natija.append(qiymat)
+    return natija
+
+
+def matndan_raqamlar(matn):
+    """Har bir qatorda bitta raqam"""
+    return _yagona(matn.splitlines())
+
+
+def _ustunni_tanlash(qatorlar):
+    """Sarlavhada 'kadastr' so'zi bo'lgan ustun, bo'lmasa birinchi ustun: (indeks, sarlavha_bormi)"""
+    for qator in qatorlar[:1]:
+        for idx, qiymat in enumerate(qator):
+            if qiymat and 'kadastr' in str(qiymat).lower():
+                return idx, True
+    return 0, False
+
+
+def fayldan_raqamlar(fayl_nomi, baytlar):
+    """.xlsx yoki .csv fayldagi kadastr raqamlari ustuni"""
+    if fayl_nomi.lower().endswith('.csv'):
+        try:
+            matn = baytlar.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            matn = baytlar.decode('cp1251')
+        try:
+            dialekt = csv.Sniffer().sniff(matn[:4096], delimiters=',;\t')
+        except csv.Error:
+            dialekt = csv.excel
+        qatorlar = list(csv.reader(io.StringIO(matn), dialekt))
+    else:
+        wb = openpyxl.load_workbook(io.BytesIO(baytlar), read_only=True, data_only=True)
+        try:
+            qatorlar = [qator for qator in wb.active.iter_rows(values_only=True) if any(qator)]
+        finally:
+            wb.close()
+
+    idx, sarlavha_bor = _ustunni_tanlash(qatorlar)
+    if sarlavha_bor:
+        qatorlar = qatorlar[1:]
+    return _yagona(qator[idx] for qator in qatorlar if idx < len(qator))
+
+
+def _kalit_boyicha(qs, kalitlar, *maydonlar):
+    natija = {}
+    for i in range(0, len(kalitlar), _IN_PAKET):
+        for q in qs.filter(kadastr_kalit__in=kalitlar[i:i + _IN_PAKET]).values('kadastr_kalit', *maydonlar):
+            natija.setdefault(q['kadastr_kalit'], []).append(q)
+    return natija
+
+
+def ommaviy_qidirish(raqamlar):
+    """
+    [(kiritilgan, to'lov yozuvlari, obyekt holatlari)] qaytaradi. Har bir
+    jadvalga bitta kadastr_kalit IN (...) so'rovi (faqat aniq moslik).
+    """
+    kalitlar = [kadastr_kalit(r) for r in raqamlar]
+    tolovlar = _kalit_boyicha(
+        KadastrMalumat.objects.faol(), kalitlar,
+        'viloyat__nomi', 'tuman__nomi', 'mfy__nomi', 'kocha__nomi', 'kadastr_raqami',
+        'invoys_raqami', 'summa_miqdori', 'tolovchi_fio', 'tolov_holati',
+    )
+    obyektlar = _kalit_boyicha(ObyektMalumat.objects.faol(), kalitlar, 'holati')
+    return [
+        (raqam, tolovlar.get(kalit, []), [o['holati'] for o in obyektlar.get(kalit, [])])
+        for raqam, kalit in zip(raqamlar, kalitlar)
+    ]
+
+
+def natija_fayli(natijalar, fio_yashir):
+    """Natijalarni .xlsx fayl (bayt) sifatida yozadi; F.I.O `fio_yashir` bilan yashiriladi"""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Natija')
+    ws.append(SARLAVHALAR)
+    for raqam, tolovlar, holatlar in natijalar:
+        obyekt_holati = ', '.join(h for h in holatlar if h)
+        if not tolovlar:
+            ws.append([raqam, 'Obyekt holati topildi' if holatlar else 'Topilmadi'] + [''] * 9 + [obyekt_holati])
+        for m in tolovlar:
+            ws.append([
+                raqam, 'Topildi', m['viloyat__nomi'], m['tuman__nomi'], m['mfy__nomi'], m['kocha__nomi'],
+                m['kadastr_raqami'], m['invoys_raqami'], m['summa_miqdori'], fio_yashir(m['tolovchi_fio']), m['tolov_holati'],
+                obyekt_holati,
+            ])
+    fayl = io.BytesIO()
+    wb.save(fayl)
+    return fayl.getvalue()
@@ -0,0 +1,80 @@
+"""
+Telegram Bot API'ning soxta (oflayn) varianti.
+
+TELEGRAM_SOXTA_API = True bo'lsa bot Telegram serveriga ulanmaydi: har bir
+API chaqiruvi shu yerda qayd qilinadi va namunaviy javob qaytariladi.
+Webhook'ni lokal sinash uchun — yozib olingan Update JSON endpoint'ga
+POST qilinadi, bot javoblari esa logda ko'rinadi.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import Counter, deque
+from itertools import count
+
+from django.conf import settings
+from telegram.request import BaseRequest
+
+logger = logging.getLogger(__name__)
+
+SOXTA_BOT = {'id': 1, 'is_bot': True, 'first_name': 'Kadastr', 'username': 'kadastr_sinov_bot'}
+
+# Natijasi Message bo'lgan metodlar
+_XABAR_METODLARI = {
+    'sendmessage', 'editmessagetext', 'senddocument', 'sendphoto', 'editmessagereplymarkup',
+}
+
+
+class SoxtaSorov(BaseRequest):
+    """
+    Bot API so'rovlarini tarmoqsiz bajaradi; oxirgi chaqiruvlar `chaqiruvlar`da,
+    metodlar bo'yicha soni `metodlar`da saqlanadi. `kechikish` (soniya) —
+    har bir javobdan oldin kutish (tarmoq kechikishini taqlid qilish uchun).
+    """
+
+    def __init__(self, saqlash=1000, kechikish=None):
+        self.chaqiruvlar = deque(maxlen=saqlash)
+        self.metodlar = Counter()
+        self.kechikish = getattr(settings, 'TELEGRAM_SOXTA_KECHIKISH', 0) if kechikish is None else kechikish
+        self._xabar_id = count(1)
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _natija(self, metod, parametrlar):
+        metod = metod.lower()
+        if metod == 'getme':
+            return SOXTA_BOT
+        if metod in _XABAR_METODLARI:
+            chat_id = parametrlar.get('chat_id') or 0
+            xabar = {
+                'message_id': parametrlar.get('message_id') or next(self._xabar_id),
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': parametrlar.get('text', ''),
+            }
+            if metod == 'senddocument':
+                file_id = f"soxta-{xabar['message_id']}"
+                xabar['document'] = {'file_id': file_id, 'file_unique_id': file_id}
+            return xabar
+        return True
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        metod = url.rsplit('/', 1)[-1]
+        parametrlar = request_data.parameters if request_data else {}
+        self.chaqiruvlar.append((metod, parametrlar))
+        self.metodlar[metod] += 1
+        if self.kechikish:
+            await asyncio.sleep(self.kechikish)
+        logger.info("Soxta API: %s %s", metod, str(parametrlar.get('text', ''))[:200])
+        javob = {'ok': True, 'result': self._natija(metod, parametrlar)}
+        return 200, json.dumps(javob).encode('utf-8')
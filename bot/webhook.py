@@ -0,0 +1,120 @@
+"""
+Telegram webhook endpoint (ASGI).
+
+Polling o'rniga update'larni Telegram o'zi POST qiladi; ularni
+kadastr_bot/asgi.py ostida ishlayotgan har bir uvicorn/daphne ishchisi
+qabul qiladi va o'z Application'ining update_queue'siga qo'yadi.
+Bir nechta ishchi load balancer ortida yukni bo'lishadi.
+
+Ishga tushirish:
+    uvicorn kadastr_bot.asgi:application --workers 4
+    python bot/bot.py --webhook      # Telegram'da webhook'ni ro'yxatdan o'tkazish
+
+Webhook rejimi faqat ASGI serverda, lifespan yoqilgan holda ishlaydi
+(uvicorn/daphne standarti): Application server event loop'ida yashaydi va
+server to'xtaganda lifespan.shutdown'da to'xtatiladi — xotiradagi statistika
+bazaga yoziladi, o'qish pool'i yopiladi. runserver yoki WSGI ostida har
+so'rov alohida event loop'da bajariladi, shuning uchun endpoint 503 qaytaradi.
+
+Lokal sinash (TELEGRAM_SOXTA_API = True — Telegram'ga ulanmaydi):
+    curl -X POST -H 'X-Telegram-Bot-Api-Secret-Token: <secret>' \
+         -d @update.json http://127.0.0.1:8000/telegram/webhook/
+"""
+import asyncio
+import hmac
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+_ilova = None
+_ilova_qulf = asyncio.Lock()
+# lifespan.startup kelgan event loop (ASGI server'ning asosiy loop'i)
+_tsikl = None
+
+
+async def _ilova_ol():
+    """Ishchi jarayondagi Application'ni birinchi update kelganda ishga tushiradi"""
+    global _ilova
+    if _ilova is not None:
+        return _ilova
+    async with _ilova_qulf:
+        if _ilova is None:
+            from bot import bot
+
+            await sync_to_async(bot._indekslarni_tekshirish)()
+            app = bot.application_qurish(settings.TELEGRAM_BOT_TOKEN, webhook=True)
+            await app.initialize()
+            await app.start()
+            # run_polling/run_webhook chaqirmagani uchun fon vazifalari shu yerda boshlanadi
+            await app.post_init(app)
+            _ilova = app
+            logger.info("Webhook Application ishga tushdi")
+    return _ilova
+
+
+async def _ilova_toxtatish():
+    """Application'ni to'xtatadi; post_shutdown statistikani yozadi va o'qish pool'ini yopadi"""
+    global _ilova
+    async with _ilova_qulf:
+        app, _ilova = _ilova, None
+    if app is None:
+        return
+    await app.stop()
+    await app.shutdown()
+    await app.post_shutdown(app)
+    logger.info("Webhook Application to'xtatildi")
+
+
+async def lifespan(scope, receive, send):
+    """ASGI lifespan: Django'ning ASGI handler'i uni qo'llamaydi, kadastr_bot/asgi.py shu yerga yo'naltiradi"""
+    global _tsikl
+    while True:
+        xabar = await receive()
+        if xabar['type'] == 'lifespan.startup':
+            _tsikl = asyncio.get_running_loop()
+            await send({'type': 'lifespan.startup.complete'})
+        elif xabar['type'] == 'lifespan.shutdown':
+            try:
+                await _ilova_toxtatish()
+            except Exception:
+                logger.exception("Webhook Application'ni to'xtatishda xatolik")
+            _tsikl = None
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def _token_togri(request):
+    kutilgan = getattr(settings, 'TELEGRAM_WEBHOOK_SECRET', '')
+    kelgan = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    # Maxfiy token o'rnatilmagan bo'lsa webhook o'chiq hisoblanadi
+    return bool(kutilgan) and hmac.compare_digest(kelgan.encode(), kutilgan.encode())
+
+
+@csrf_exempt
+@require_POST
+async def telegram_webhook(request):
+    if not _token_togri(request):
+        return HttpResponseForbidden()
+    if _tsikl is not asyncio.get_running_loop():
+        logger.error("Webhook rejimi lifespan yoqilgan ASGI serverni talab qiladi (uvicorn/daphne)")
+        return HttpResponse(status=503)
+    try:
+        malumot = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest()
+
+    app = await _ilova_ol()
+    update = Update.de_json(malumot, app.bot)
+    if update is None:
+        return HttpResponseBadRequest()
+    # Javob darhol qaytadi, update'ni Application o'z navbatidan qayta ishlaydi
+    await app.update_queue.put(update)
+    return HttpResponse()
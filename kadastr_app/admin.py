@@ -1,41 +1,163 @@
 from django.contrib import admin
-from django.utils.html import format_html
-from .models import ExcelUpload, KadastrMalumat, BotFoydalanuvchi, ObyektExcelUpload, ObyektMalumat
-from .excel_utils import excel_faylni_o_qi, obyekt_excel_o_qi
+from django.contrib.admin.utils import unquote
+from django.http import Http404, JsonResponse
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.utils.text import smart_split, unescape_string_literal
+from .models import (
+    ExcelUpload, KadastrMalumat, BotFoydalanuvchi, ObyektExcelUpload, ObyektMalumat, ImportJob, TumanXulosa,
+    ObyektHolatXulosa, KunlikStatistika, Viloyat, Tuman, Mfy, Kocha,
+)
+from .holat import OBYEKT_BELGILARI, TOLOV_BELGILARI
+from .indeks import versiya_ozgardi
+from .summa import somga, summa_matni
+from .vazifalar import import_navbatga_qoyish
+from .xulosa import obyekt_xulosasini_yangilash, tuman_xulosasini_yangilash
 
 
-@admin.register(ExcelUpload)
-class ExcelUploadAdmin(admin.ModelAdmin):
-    list_display = ['fayl', 'yuklangan_vaqt', 'yozuvlar_soni', 'izoh']
-    readonly_fields = ['yuklangan_vaqt', 'yozuvlar_soni']
+IMPORT_HOLAT_RANGLARI = {
+    ImportJob.KUTMOQDA: ('#6c757d', '⏳'),
+    ImportJob.BAJARILMOQDA: ('#fd7e14', '🔄'),
+    ImportJob.TUGADI: ('#28a745', '✅'),
+    ImportJob.XATO: ('#dc3545', '❌'),
+}
+
+
+def _import_holati_html(job):
+    if job is None:
+        return '—'
+    color, icon = IMPORT_HOLAT_RANGLARI[job.holat]
+    matn = f"{job.get_holat_display()}: {job.qatorlar_soni} ta qator"
+    if job.tezlik:
+        matn += f" ({job.tezlik:.0f} qator/s)"
+    if job.qoshildi or job.ozgardi or job.olib_tashlandi:
+        matn += (
+            f" | +{job.qoshildi} yangi, ~{job.ozgardi} o'zgargan, "
+            f"={job.ozgarmadi} o'zgarmagan, -{job.olib_tashlandi} olib tashlangan"
+        )
+    if job.summa_xatolari:
+        matn += f" | ⚠️ {job.summa_xatolari} ta qatorda summa o'qilmadi"
+    if job.takroriy_kalitlar:
+        matn += f" | ⚠️ {job.takroriy_kalitlar} ta takroriy kadastr raqami o'tkazib yuborildi"
+    if job.xato_matni:
+        matn += f" — {job.xato_matni}"
+    return format_html('<span style="color:{}; font-weight:bold;">{} {}</span>', color, icon, matn)
+
+
+class ImportUploadAdminMixin:
+    """Faylni saqlash importni navbatga qo'yadi; import holati sahifada kuzatiladi"""
+    change_form_template = 'admin/kadastr_app/import_change_form.html'
+
+    def _oxirgi_vazifa(self, obj):
+        if obj is None or obj.pk is None:
+            return None
+        return obj.import_vazifalari.order_by('-yaratilgan', '-id').first()
+
+    def import_holati(self, obj):
+        return _import_holati_html(self._oxirgi_vazifa(obj))
+    import_holati.short_description = "Import holati"
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
-        try:
-            if change:
-                KadastrMalumat.objects.filter(excel_fayl=obj).delete()
-            soni = excel_faylni_o_qi(obj)
-            obj.yozuvlar_soni = soni
-            obj.save()
-            self.message_user(request, f"✅ Excel fayl yuklandi! {soni} ta yozuv saqlandi.")
-        except Exception as e:
-            self.message_user(request, f"❌ Xatolik: {str(e)}", level='ERROR')
+        job = import_navbatga_qoyish(obj, qayta_import=change)
+        self.message_user(request, f"⏳ Import navbatga qo'yildi (vazifa #{job.pk}). Holatini shu sahifada kuzating.")
+
+    def get_urls(self):
+        nom = f'{self.model._meta.app_label}_{self.model._meta.model_name}_import_holati'
+        return [
+            path('<path:object_id>/import-holati/', self.admin_site.admin_view(self.import_holati_view), name=nom),
+        ] + super().get_urls()
+
+    def import_holati_view(self, request, object_id):
+        """Import holati maydoni uchun JSON: forma qayta yuklanmaydi, kiritilgan o'zgarishlar yo'qolmaydi"""
+        obj = self.get_object(request, unquote(object_id))
+        if obj is None or not self.has_view_permission(request, obj):
+            raise Http404
+        job = self._oxirgi_vazifa(obj)
+        return JsonResponse({'html': str(_import_holati_html(job)), 'faol': bool(job and job.faol)})
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        extra_context = extra_context or {}
+        job = self._oxirgi_vazifa(self.get_object(request, unquote(object_id)))
+        if job is not None and job.faol:
+            extra_context['yangilash_soniya'] = 3
+            extra_context['holat_manzili'] = reverse(
+                f'{self.admin_site.name}:{self.model._meta.app_label}_{self.model._meta.model_name}_import_holati',
+                args=[object_id],
+            )
+        return super().change_view(request, object_id, form_url, extra_context)
+
+    # Fayl o'chirilsa uning yozuvlari ham (CASCADE) o'chadi, FTS'dan — trigger orqali
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._ochirilgandan_keyin()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        self._ochirilgandan_keyin()
+
+    def _ochirilgandan_keyin(self):
+        versiya_ozgardi()
+
+
+class MatnQidiruvAdminMixin:
+    """
+    Ro'yxat sahifasidagi qidiruv FTS5 trigram jadvali orqali (matn_boyicha).
+    Django'dagidek har bir so'z search_fields'dan birortasida uchrashi kerak.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        for soz in smart_split(search_term):
+            if soz.startswith(('"', "'")) and soz[0] == soz[-1]:
+                soz = unescape_string_literal(soz)
+            queryset = queryset.matn_boyicha(soz, self.search_fields)
+        return queryset, False
+
+
+@admin.register(Viloyat, Tuman, Mfy, Kocha)
+class NomAdmin(admin.ModelAdmin):
+    """Hudud nomlari lug'ati (import paytida to'ldiriladi)"""
+    list_display = ['nomi']
+    search_fields = ['nomi']
+
+
+@admin.register(ExcelUpload)
+class ExcelUploadAdmin(ImportUploadAdminMixin, admin.ModelAdmin):
+    list_display = ['fayl', 'yuklangan_vaqt', 'import_rejimi', 'yozuvlar_soni', 'import_holati', 'izoh']
+    readonly_fields = ['yuklangan_vaqt', 'yozuvlar_soni', 'import_holati']
+
+    # Yozuvlar o'chgach tuman xulosasi ham qayta hisoblanadi
+    def _ochirilgandan_keyin(self):
+        super()._ochirilgandan_keyin()
+        tuman_xulosasini_yangilash()
 
 
 @admin.register(KadastrMalumat)
-class KadastrMalumatAdmin(admin.ModelAdmin):
+class KadastrMalumatAdmin(MatnQidiruvAdminMixin, admin.ModelAdmin):
     list_display = ['kadastr_raqami', 'viloyat', 'tuman', 'mfy', 'tolovchi_fio', 'summa_miqdori', 'tolov_holati_badge']
-    list_filter = ['viloyat', 'tuman', 'mfy', 'tolov_holati']
+    list_filter = ['viloyat', 'tuman', 'mfy', 'holat_kodi', 'tolov_holati']
     search_fields = ['kadastr_raqami', 'tolovchi_fio', 'invoys_raqami']
     readonly_fields = ['excel_fayl']
+    list_select_related = ['viloyat', 'tuman', 'mfy']
+    autocomplete_fields = ['viloyat', 'tuman', 'mfy', 'kocha']
+    change_list_template = 'admin/kadastr_app/kadastrmalumat/change_list.html'
+
+    def get_queryset(self, request):
+        # Import qilinayotgan (hali faollashmagan) versiyalar ko'rsatilmaydi
+        return super().get_queryset(request).faol()
+
+    def changelist_view(self, request, extra_context=None):
+        """Joriy filtr (tuman, MFY, ...) bo'yicha to'lanmaganlar soni va summasi — bitta SUM so'rovi"""
+        javob = super().changelist_view(request, extra_context)
+        cl = getattr(javob, 'context_data', {}).get('cl')
+        if cl is not None:
+            jami = cl.queryset.tolanmagan_jami()
+            javob.context_data['tolanmagan_soni'] = jami['soni']
+            javob.context_data['tolanmagan_summa'] = summa_matni(somga(jami['summa_tiyin']))
+        return javob
 
     def tolov_holati_badge(self, obj):
-        if obj.tolov_holati and "to'lanmagan" in obj.tolov_holati.lower():
-            color, icon = '#dc3545', '❌'
-        elif obj.tolov_holati and "to'langan" in obj.tolov_holati.lower():
-            color, icon = '#28a745', '✅'
-        else:
-            color, icon = '#6c757d', '⏳'
+        color, icon = TOLOV_BELGILARI[obj.holat_kodi]
         return format_html('<span style="color:{}; font-weight:bold;">{} {}</span>', color, icon, obj.tolov_holati)
     tolov_holati_badge.short_description = "To'lov holati"
 
@@ -43,44 +165,91 @@ class KadastrMalumatAdmin(admin.ModelAdmin):
 # ─── Obyekt holati admin ──────────────────────────────────────────────────────
 
 @admin.register(ObyektExcelUpload)
-class ObyektExcelUploadAdmin(admin.ModelAdmin):
-    list_display = ['fayl', 'yuklangan_vaqt', 'yozuvlar_soni', 'izoh']
-    readonly_fields = ['yuklangan_vaqt', 'yozuvlar_soni']
+class ObyektExcelUploadAdmin(ImportUploadAdminMixin, admin.ModelAdmin):
+    list_display = ['fayl', 'yuklangan_vaqt', 'import_rejimi', 'yozuvlar_soni', 'import_holati', 'izoh']
+    readonly_fields = ['yuklangan_vaqt', 'yozuvlar_soni', 'import_holati']
 
-    def save_model(self, request, obj, form, change):
-        super().save_model(request, obj, form, change)
-        try:
-            if change:
-                ObyektMalumat.objects.filter(excel_fayl=obj).delete()
-            soni = obyekt_excel_o_qi(obj)
-            obj.yozuvlar_soni = soni
-            obj.save()
-            self.message_user(request, f"✅ Obyekt Excel fayl yuklandi! {soni} ta yozuv saqlandi.")
-        except Exception as e:
-            self.message_user(request, f"❌ Xatolik: {str(e)}", level='ERROR')
+    def _ochirilgandan_keyin(self):
+        super()._ochirilgandan_keyin()
+        obyekt_xulosasini_yangilash()
 
 
 @admin.register(ObyektMalumat)
-class ObyektMalumatAdmin(admin.ModelAdmin):
+class ObyektMalumatAdmin(MatnQidiruvAdminMixin, admin.ModelAdmin):
     list_display = ['kadastr_raqami', 'viloyat', 'tuman', 'mfy', 'holati_badge']
-    list_filter = ['viloyat', 'tuman', 'holati']
+    list_filter = ['viloyat', 'tuman', 'holat_kodi', 'holati']
     search_fields = ['kadastr_raqami', 'mfy']
     readonly_fields = ['excel_fayl']
+    list_select_related = ['viloyat', 'tuman', 'mfy']
+    autocomplete_fields = ['viloyat', 'tuman', 'mfy']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).faol()
 
     def holati_badge(self, obj):
-        holat = obj.holati.lower() if obj.holati else ''
-        if 'muhokama' in holat:
-            color, icon = '#fd7e14', '🔄'
-        elif 'rad' in holat or 'bekor' in holat:
-            color, icon = '#dc3545', '❌'
-        elif 'tasdiqlangan' in holat or 'qabul' in holat:
-            color, icon = '#28a745', '✅'
-        else:
-            color, icon = '#6c757d', '📋'
+        color, icon = OBYEKT_BELGILARI[obj.holat_kodi]
         return format_html('<span style="color:{}; font-weight:bold;">{} {}</span>', color, icon, obj.holati)
     holati_badge.short_description = "Holati"
 
 
+@admin.register(TumanXulosa)
+class TumanXulosaAdmin(admin.ModelAdmin):
+    list_display = [
+        'viloyat', 'tuman', 'jami', 'tolanmagan', 'tolangan', 'tolanmagan_summa', 'tolangan_summa', 'yangilangan',
+    ]
+    list_filter = ['viloyat']
+    readonly_fields = [f.name for f in TumanXulosa._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ObyektHolatXulosa)
+class ObyektHolatXulosaAdmin(admin.ModelAdmin):
+    list_display = ['holat_kodi', 'soni', 'yangilangan']
+    readonly_fields = [f.name for f in ObyektHolatXulosa._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(KunlikStatistika)
+class KunlikStatistikaAdmin(admin.ModelAdmin):
+    list_display = ['sana', 'sorovlar', 'faol_foydalanuvchilar', 'yangi_foydalanuvchilar']
+    readonly_fields = [f.name for f in KunlikStatistika._meta.fields]
+    date_hierarchy = 'sana'
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'tur', 'upload', 'holat_badge', 'qatorlar_soni', 'tezlik',
+        'qoshildi', 'ozgardi', 'olib_tashlandi', 'summa_xatolari', 'takroriy_kalitlar', 'yaratilgan', 'tugagan',
+    ]
+    list_filter = ['tur', 'holat']
+    exclude = ['varaqlar']
+    readonly_fields = [f.name for f in ImportJob._meta.fields if f.name != 'varaqlar'] + ['varaqlar_jadvali']
+
+    def holat_badge(self, obj):
+        return _import_holati_html(obj)
+    holat_badge.short_description = "Holati"
+
+    def varaqlar_jadvali(self, obj):
+        if not obj.varaqlar:
+            return '—'
+        return format_html_join(
+            format_html('<br>'), '{}: {} ta qator ({} s)',
+            ((v['varaq'], v['qatorlar'], v['soniya']) for v in obj.varaqlar),
+        )
+    varaqlar_jadvali.short_description = "Varaqlar"
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(BotFoydalanuvchi)
 class BotFoydalanuvchiAdmin(admin.ModelAdmin):
     list_display = ['telegram_id', 'ism', 'username', 'so_rovlar_soni', 'oxirgi_murojaat']
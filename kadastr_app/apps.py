@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class KadastrAppConfig(AppConfig):
     name = 'kadastr_app'
+
+    def ready(self):
+        from . import metrikalar
+        metrikalar.ulash()
@@ -0,0 +1,308 @@
+"""
+Excel varaqlarini paket-paket o'qish.
+
+Fayldagi har bir ko'rinadigan varaq alohida o'qiladi: sarlavha
+`_ustun_indekslar` bilan aniqlanadi, qatorlar esa mapping maydonlari
+tartibidagi tuple'larga keltirilib, paketlar bilan beriladi. Bir nechta
+varaq (yoki fayl) bo'lsa ular jarayonlar pulida parallel o'qiladi, bazaga
+esa bitta yozuvchi (import vazifasi) varaqlar tartibida yozadi.
+
+Modul Django'ni import qilmaydi — pul jarayonlari uni 'spawn' bilan yuklaydi.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import openpyxl
+
+logger = logging.getLogger(__name__)
+
+# Sarlavha faqat shu qadar dastlabki qatorlar ichidan qidiriladi
+SARLAVHA_QIDIRISH_CHEGARASI = 50
+
+_XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+# Navbat to'la/bo'sh bo'lganda to'xtatish belgisini tekshirish oralig'i (soniya)
+_KUTISH = 0.5
+
+
+def _sarlavha_toping(rows, chegara=SARLAVHA_QIDIRISH_CHEGARASI):
+    """
+    Dastlabki `chegara` ta qator ichidan birinchi bo'sh bo'lmaganini sarlavha
+    sifatida qaytaradi. (sarlavha, ko'rilgan qatorlar soni) qaytaradi.
+    """
+    korildi = 0
+    for row in itertools.islice(rows, chegara):
+        korildi += 1
+        if any(row):
+            return row, korildi
+    return None, korildi
+
+
+def _ustun_indekslar(header_row, mapping):
+    """Sarlavha qatoridan ustun indekslarini toping"""
+    indekslar = {}
+    for idx, qiymat in enumerate(header_row):
+        if qiymat:
+            qiymat = str(qiymat).strip().lower()
+            for kalit, variantlar in mapping.items():
+                if qiymat in variantlar:
+                    indekslar[kalit] = idx
+                    break
+    return indekslar
+
+
+def _qiymat_ol(row_values, indekslar, kalit, standart=''):
+    idx = indekslar.get(kalit)
+    if idx is not None and idx < len(row_values):
+        val = row_values[idx]
+        return str(val).strip() if val is not None else standart
+    return standart
+
+
+def varaq_nomlari(yol):
+    """
+    Ko'rinadigan varaqlar nomi (kitobdagi tartibda). Faqat xl/workbook.xml
+    o'qiladi — umumiy satrlar jadvali yuklanmaydi.
+    """
+    try:
+        with zipfile.ZipFile(yol) as z:
+            ildiz = ET.fromstring(z.read('xl/workbook.xml'))
+    except (KeyError, zipfile.BadZipFile, ET.ParseError):
+        # Odatiy xato xabari uchun openpyxl'ning o'ziga qoldiriladi
+        wb = openpyxl.load_workbook(yol, read_only=True)
+        try:
+            return [ws.title for ws in wb.worksheets if ws.sheet_state == 'visible']
+        finally:
+            wb.close()
+    return [
+        v.get('name') for v in ildiz.iter(f'{_XLSX_NS}sheet')
+        if v.get('state', 'visible') == 'visible'
+    ]
+
+
+# Jarayonda oxirgi ochilgan kitob: bir faylning varaqlari ketma-ket o'qilganda
+# kitob (umumiy satrlar, varaqlar o'lchami) har safar qayta yuklanmaydi
+_kitob = {}
+
+
+def _kitob_ol(yol):
+    holat = os.stat(yol)
+    kalit = (yol, holat.st_mtime_ns, holat.st_size)
+    if kalit not in _kitob:
+        kitobni_yopish()
+        _kitob[kalit] = openpyxl.load_workbook(yol, read_only=True, data_only=True)
+    return _kitob[kalit]
+
+
+def kitobni_yopish():
+    for wb in _kitob.values():
+        wb.close()
+    _kitob.clear()
+
+
+def qator_indekslari(mapping):
+    """varaq_paketlari() qatorlaridagi ustunlar: {maydon: o'rni}"""
+    return {kalit: i for i, kalit in enumerate(mapping)}
+
+
+def varaq_paketlari(yol, varaq, mapping, standart, paket_hajmi, hisobot):
+    """
+    Bitta varaqning ma'lumot qatorlari — `paket_hajmi` talik ro'yxatlar.
+    Har bir qator `mapping` maydonlari tartibidagi tuple; bo'sh va kadastr
+    raqamisiz qatorlar tashlab ketiladi. `hisobot` lug'ati to'ldiriladi:
+    qatorlar soni, o'qish vaqti, holat ('ok', 'bosh' yoki 'sarlavhasiz').
+    """
+    boshlanish = time.monotonic()
+    hisobot.update(varaq=varaq, qatorlar=0, soniya=0.0, holat='bosh')
+    try:
+        rows = _kitob_ol(yol)[varaq].iter_rows(values_only=True)
+        header_row, korildi = _sarlavha_toping(rows)
+        if not korildi:
+            return
+        if not header_row:
+            hisobot['holat'] = 'sarlavhasiz'
+            return
+        hisobot['holat'] = 'ok'
+
+        ustunlar = _ustun_indekslar(header_row, mapping) or dict(standart)
+        tartib = [ustunlar.get(kalit) for kalit in mapping]
+        paket = []
+        for row in rows:
+            if not any(row) or not _qiymat_ol(row, ustunlar, 'kadastr_raqami'):
+                continue
+            paket.append(tuple(row[i] if i is not None and i < len(row) else None for i in tartib))
+            if len(paket) >= paket_hajmi:
+                hisobot['qatorlar'] += len(paket)
+                yield paket
+                paket = []
+        if paket:
+            hisobot['qatorlar'] += len(paket)
+            yield paket
+    finally:
+        hisobot['soniya'] = round(time.monotonic() - boshlanish, 3)
+
+
+def _qoyish(navbat, xabar, toxtat):
+    """Navbatga qo'yadi; yozuvchi bu varaqdan voz kechgan bo'lsa False"""
+    while not toxtat.is_set():
+        try:
+            navbat.put(xabar, timeout=_KUTISH)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _varaq_ishchisi(yol, varaq, mapping, standart, paket_hajmi, navbat, toxtat):
+    """Pul jarayonida: varaq paketlarini navbatga, oxirida hisobotni yuboradi"""
+    hisobot = {}
+    try:
+        for paket in varaq_paketlari(yol, varaq, mapping, standart, paket_hajmi, hisobot):
+            if not _qoyish(navbat, ('paket', paket), toxtat):
+                return
+    except Exception as e:
+        _qoyish(navbat, ('xato', e), toxtat)
+        return
+    _qoyish(navbat, ('tugadi', hisobot), toxtat)
+
+
+class _Varaq:
+    """Bitta varaqni o'qish vazifasi: jarayonda (navbat orqali) yoki shu jarayonda"""
+
+    def __init__(self, yol, nomi, mapping, standart):
+        self.yol = yol
+        self.nomi = nomi
+        self.mapping = mapping
+        self.standart = standart
+        self.hisobot = {}
+        self.navbat = self.toxtat = self.vazifa = None
+
+    def paketlar(self, paket_hajmi):
+        if self.vazifa is None:
+            yield from varaq_paketlari(self.yol, self.nomi, self.mapping, self.standart, paket_hajmi, self.hisobot)
+            return
+        while True:
+            try:
+                tur, qiymat = self.navbat.get(timeout=_KUTISH)
+            except queue.Empty:
+                if self.vazifa.done():
+                    raise self.vazifa.exception() or RuntimeError(f"{self.nomi}: o'qish jarayoni to'xtadi")
+                continue
+            if tur == 'paket':
+                yield qiymat
+            elif tur == 'xato':
+                raise qiymat
+            else:
+                self.hisobot.update(qiymat)
+                return
+
+    def bekor_qilish(self):
+        if self.vazifa is not None:
+            self.toxtat.set()
+            self.vazifa.cancel()
+
+
+class FaylManbai:
+    """Bitta faylning barcha varaqlari — import uchun yagona qatorlar oqimi"""
+
+    def __init__(self, varaqlar, mapping, paket_hajmi):
+        self.varaqlar = varaqlar
+        self.indekslar = qator_indekslari(mapping)
+        self._paket_hajmi = paket_hajmi
+
+    def qatorlar(self):
+        """Varaqlar tartibida; tugagach (yoki to'xtatilsa) o'qilmagan varaqlar bekor qilinadi"""
+        try:
+            for varaq in self.varaqlar:
+                for paket in varaq.paketlar(self._paket_hajmi):
+                    yield from paket
+            holatlar = {v.hisobot.get('holat') for v in self.varaqlar}
+            if 'ok' not in holatlar:
+                raise ValueError("Sarlavha qatori topilmadi!" if 'sarlavhasiz' in holatlar else "Excel fayl bo'sh!")
+        finally:
+            for varaq in self.varaqlar:
+                varaq.bekor_qilish()
+            kitobni_yopish()
+
+    def hisobot(self):
+        """Har bir varaq: nomi, qatorlar soni, o'qish vaqti va holati"""
+        return [dict(v.hisobot) for v in self.varaqlar if v.hisobot]
+
+
+class VaraqOqimi:
+    """
+    Fayllar varaqlarini jarayonlar pulida o'qiydi. `qoshish()` faylni
+    navbatga qo'yadi, `manba()` uning qatorlar oqimini beradi. Birinchi
+    `manba()` chaqiruvida navbatdagi barcha varaqlar (bir nechta faylniki
+    ham) pulga yuboriladi; o'qiladigan varaq bitta bo'lsa yoki
+    jarayonlar=1 bo'lsa — pulsiz, shu jarayonda o'qiladi.
+
+    Har bir varaqning navbatida ko'pi bilan `navbat_hajmi` ta paket turadi:
+    yozuvchi ortda qolsa o'quvchilar kutadi, xotira chegaralangan qoladi.
+    """
+
+    def __init__(self, jarayonlar=1, paket_hajmi=2000, navbat_hajmi=8):
+        self.jarayonlar = max(1, jarayonlar)
+        self.paket_hajmi = paket_hajmi
+        self.navbat_hajmi = navbat_hajmi
+        self._fayllar = {}
+        self._kutayotgan = []
+        self._yuborilgan = []
+        self._pul = self._menejer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.yopish()
+
+    def qoshish(self, yol, mapping, standart):
+        """Faylni o'qish navbatiga qo'yadi (takroriy chaqiruv e'tiborsiz qoldiriladi)"""
+        yol = str(yol)
+        if yol not in self._fayllar:
+            varaqlar = [_Varaq(yol, nomi, mapping, standart) for nomi in varaq_nomlari(yol)]
+            self._fayllar[yol] = FaylManbai(varaqlar, mapping, self.paket_hajmi)
+            self._kutayotgan.extend(varaqlar)
+
+    def manba(self, yol, mapping, standart):
+        """Faylning FaylManbai'si; navbatdagi varaqlar o'qila boshlaydi"""
+        self.qoshish(yol, mapping, standart)
+        if self.jarayonlar > 1 and len(self._kutayotgan) > 1:
+            self._pulga_yuborish()
+        self._kutayotgan.clear()
+        return self._fayllar.pop(str(yol))
+
+    def _pulga_yuborish(self):
+        if self._pul is None:
+            # fork emas: import web jarayonidagi oqimda ham ishlaydi (ochiq ulanishlar, qulflar)
+            ctx = multiprocessing.get_context('spawn')
+            self._menejer = ctx.Manager()
+            self._pul = ProcessPoolExecutor(self.jarayonlar, mp_context=ctx)
+            logger.info("Import puli: %d ta jarayon", self.jarayonlar)
+        for varaq in self._kutayotgan:
+            varaq.navbat = self._menejer.Queue(self.navbat_hajmi)
+            varaq.toxtat = self._menejer.Event()
+            varaq.vazifa = self._pul.submit(
+                _varaq_ishchisi, varaq.yol, varaq.nomi, varaq.mapping, varaq.standart,
+                self.paket_hajmi, varaq.navbat, varaq.toxtat,
+            )
+            self._yuborilgan.append(varaq)
+
+    def yopish(self):
+        # Kutib turgan o'quvchilar to'xtaydi, boshlanmaganlari bekor qilinadi
+        for varaq in self._yuborilgan:
+            varaq.bekor_qilish()
+        self._yuborilgan.clear()
+        self._fayllar.clear()
+        self._kutayotgan.clear()
+        if self._pul is not None:
+            self._pul.shutdown(wait=True, cancel_futures=True)
+            self._menejer.shutdown()
+            self._pul = self._menejer = None
@@ -1,6 +1,20 @@
-import openpyxl
-from .models import KadastrMalumat, ObyektMalumat
+import itertools
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .excel_oqish import VaraqOqimi, _qiymat_ol
+from .models import KadastrMalumat, Kocha, Mfy, ObyektMalumat, Tuman, Viloyat
+from .nomlar import keshlar
+from .summa import tiyinga
+
+logger = logging.getLogger(__name__)
 
 # ─── To'lov Excel ustun mapping ───────────────────────────────────────────────
 USTUN_MAPPING = {
@@ -24,124 +38,300 @@ OBYEKT_USTUN_MAPPING = {
     'holati':         ['holati', 'e'],
 }
 
+# Sarlavha tanilmasa ishlatiladigan standart ustunlar (A=0, B=1, ...)
+STANDART_INDEKSLAR = {
+    'viloyat': 1, 'tuman': 2, 'mfy': 3, 'kocha': 4,
+    'kadastr_raqami': 5, 'invoys_raqami': 6,
+    'summa_miqdori': 7, 'tolovchi_fio': 8, 'tolov_holati': 9,
+}
+OBYEKT_STANDART_INDEKSLAR = {
+    'kadastr_raqami': 0, 'viloyat': 1, 'tuman': 2, 'mfy': 3, 'holati': 4,
+}
+
+
+@dataclass
+class ImportNatija:
+    """
+    Import natijasi: saqlangan qatorlar soni va sarflangan vaqt.
+    Farq bo'yicha importda qo'shimcha ravishda o'zgarishlar hisobi yuritiladi.
+    """
+    soni: int = 0
+    vaqt: float = 0.0
+    qoshildi: int = 0
+    ozgardi: int = 0
+    ozgarmadi: int = 0
+    olib_tashlandi: int = 0
+    # Summasi son sifatida o'qilmagan qatorlar (faqat to'lov fayllari)
+    summa_xatolari: int = 0
+    # Farq bo'yicha: faylda kaliti takrorlangani uchun yozilmagan qatorlar
+    takroriy_kalitlar: int = 0
+    # Varaqlar bo'yicha: [{'varaq', 'qatorlar', 'soniya', 'holat'}]
+    varaqlar: list = field(default_factory=list)
+    # Farq bo'yicha import: faollashtirish paytida yoziladigan o'zgarishlar
+    yangilanadi: list = field(default_factory=list, repr=False)
+    ochiriladi: list = field(default_factory=list, repr=False)
+
+    @property
+    def tezlik(self):
+        """Soniyasiga saqlangan qatorlar"""
+        return self.soni / self.vaqt if self.vaqt else 0.0
+
+
+def _nomlar_paketi(rows, indekslar, nom_keshlari, paket_hajmi=None):
+    """
+    Qatorlarni paket-paket o'tkazadi; har bir paketdagi yangi hudud nomlari
+    qatorlar berilishidan oldin lug'at jadvallariga bittada qo'shiladi.
+    """
+    paket_hajmi = paket_hajmi or getattr(settings, 'IMPORT_PAKET_HAJMI', 2000)
+    while paket := list(itertools.islice(rows, paket_hajmi)):
+        for maydon, kesh in nom_keshlari.items():
+            kesh.hal_qilish({_qiymat_ol(r, indekslar, maydon) for r in paket})
+        yield from paket
+
+
+def varaq_oqimi(jarayonlar=None):
+    """Sozlamalar bo'yicha VaraqOqimi (IMPORT_JARAYONLAR, IMPORT_PAKET_HAJMI, IMPORT_NAVBAT_HAJMI)"""
+    if jarayonlar is None:
+        jarayonlar = getattr(settings, 'IMPORT_JARAYONLAR', 0) or os.cpu_count() or 1
+    return VaraqOqimi(
+        jarayonlar,
+        paket_hajmi=getattr(settings, 'IMPORT_PAKET_HAJMI', 2000),
+        navbat_hajmi=getattr(settings, 'IMPORT_NAVBAT_HAJMI', 8),
+    )
+
+
+@contextmanager
+def _excel_oqimi(fayl_yoli, mapping, standart_indekslar, oqim=None):
+    """
+    Faylning barcha ko'rinadigan varaqlarini (ustun indekslari, qatorlar
+    generatori, FaylManbai) sifatida beradi. Qatorlar paket-paket o'qiladi —
+    butun varaq xotiraga yuklanmaydi; `oqim` berilmasa vaqtinchalik pul ochiladi.
+    """
+    with ExitStack() as stack:
+        if oqim is None:
+            oqim = stack.enter_context(varaq_oqimi())
+        manba = oqim.manba(fayl_yoli, mapping, standart_indekslar)
+        rows = manba.qatorlar()
+        stack.callback(rows.close)
+        yield manba.indekslar, rows, manba
+
+
+def _paketlab_saqlash(model, obyektlar, progress=None, paket_hajmi=None, natija=None):
+    """
+    Obyektlarni qat'iy hajmli paketlar bilan bulk_create qiladi. Xotirada
+    bir vaqtda faqat bitta paket turadi. Har bir paket alohida tranzaksiyada
+    yoziladi, shunda import jarayoni (progress) boshqa ulanishlarga ko'rinadi.
+    """
+    paket_hajmi = paket_hajmi or getattr(settings, 'IMPORT_PAKET_HAJMI', 2000)
+    natija = natija or ImportNatija()
+    boshlanish = time.monotonic()
 
-def _sarlavha_toping(rows):
-    """Birinchi bo'sh bo'lmagan qatorni sarlavha sifatida qaytaradi"""
-    for i, row in enumerate(rows):
-        if any(c.value for c in row):
-            return row, i
-    return None, 0
+    def _yozish(paket):
+        with transaction.atomic():
+            model.objects.bulk_create(paket)
+        natija.soni += len(paket)
+        natija.vaqt = time.monotonic() - boshlanish
+        if progress:
+            progress(natija)
 
+    paket = []
+    for obj in obyektlar:
+        paket.append(obj)
+        if len(paket) >= paket_hajmi:
+            _yozish(paket)
+            paket = []
+    if paket:
+        _yozish(paket)
 
-def _ustun_indekslar(header_row, mapping):
-    """Sarlavha qatoridan ustun indekslarini toping"""
-    indekslar = {}
-    for cell in header_row:
-        if cell.value:
-            qiymat = str(cell.value).strip().lower()
-            for kalit, variantlar in mapping.items():
-                if qiymat in variantlar:
-                    indekslar[kalit] = cell.column - 1
-                    break
-    return indekslar
+    natija.vaqt = time.monotonic() - boshlanish
+    logger.info(
+        "%s: %d ta qator %.2f s da saqlandi (%.0f qator/s)",
+        model.__name__, natija.soni, natija.vaqt, natija.tezlik
+    )
+    return natija
 
 
-def _qiymat_ol(row_values, indekslar, kalit, standart=''):
-    idx = indekslar.get(kalit)
-    if idx is not None and idx < len(row_values):
-        val = row_values[idx]
-        return str(val).strip() if val is not None else standart
-    return standart
+def farq_asosi(model, upload):
+    """
+    Farq bo'yicha import solishtiriladigan faol qatorlar: shu upload'niki va
+    u almashtirayotgan upload'niki (boshqa upload'lar qatorlariga tegilmaydi).
+    """
+    shart = Q(excel_fayl=upload, versiya=upload.faol_versiya or 0)
+    eski = upload.almashtiriladi
+    if eski is not None and eski.faol_versiya:
+        shart |= Q(excel_fayl=eski, versiya=eski.faol_versiya)
+    return model.objects.filter(shart)
+
+
+def _farq_boyicha_saqlash(model, upload, obyektlar, progress=None):
+    """
+    Fayl qatorlarini farq_asosi() bilan kadastr_kalit bo'yicha solishtiradi.
+    Faqat yangi qatorlar darhol (versiya ostida) yoziladi; o'zgargan va faylda
+    yo'q qatorlar natija ichida qaytariladi va farqni_qollash() orqali
+    faollashtirish tranzaksiyasida yoziladi. Kaliti bo'sh qatorlar
+    solishtirilmaydi: eskilari o'chiriladi, fayldagilari qayta qo'shiladi.
+    Faylda takrorlangan kalitning faqat birinchi qatori olinadi, qolganlari
+    takroriy_kalitlar'da hisoblanadi.
+    """
+    boshlanish = time.monotonic()
+    mavjud = {}
+    takrorlar = []
+    faol_qatorlar = farq_asosi(model, upload)
+    for kalit, pk, xesh in faol_qatorlar.values_list('kadastr_kalit', 'id', 'mazmun_hash').iterator(chunk_size=10000):
+        if not kalit or kalit in mavjud:
+            takrorlar.append(pk)
+        else:
+            mavjud[kalit] = (pk, xesh)
+
+    natija = ImportNatija()
+    korilgan = set()
+
+    def yangi_qatorlar():
+        for obj in obyektlar:
+            if not obj.kadastr_kalit:
+                natija.qoshildi += 1
+                yield obj
+                continue
+            if obj.kadastr_kalit in korilgan:
+                if natija.takroriy_kalitlar < 5:
+                    logger.warning("Takroriy kadastr raqami o'tkazib yuborildi: %s", obj.kadastr_raqami)
+                natija.takroriy_kalitlar += 1
+                continue
+            korilgan.add(obj.kadastr_kalit)
+            eski = mavjud.get(obj.kadastr_kalit)
+            if eski is None:
+                natija.qoshildi += 1
+                yield obj
+            elif eski[1] == obj.mazmun_hash:
+                natija.ozgarmadi += 1
+            else:
+                obj.pk = eski[0]
+                natija.yangilanadi.append(obj)
+                natija.ozgardi += 1
+
+    _paketlab_saqlash(model, yangi_qatorlar(), progress, natija=natija)
+
+    natija.ochiriladi = [pk for kalit, (pk, _) in mavjud.items() if kalit not in korilgan] + takrorlar
+    natija.olib_tashlandi = len(natija.ochiriladi)
+    natija.soni = natija.qoshildi + natija.ozgardi + natija.ozgarmadi
+    natija.vaqt = time.monotonic() - boshlanish
+    logger.info(
+        "%s farq bo'yicha: +%d, ~%d, =%d, -%d, %d ta takroriy kalit (%.0f qator/s)",
+        model.__name__, natija.qoshildi, natija.ozgardi, natija.ozgarmadi,
+        natija.olib_tashlandi, natija.takroriy_kalitlar, natija.tezlik
+    )
+    return natija
+
+
+def farqni_qollash(model, natija, paket_hajmi=None):
+    """Farq bo'yicha importning o'zgargan va olib tashlangan qatorlarini bazaga yozadi"""
+    paket_hajmi = paket_hajmi or getattr(settings, 'IMPORT_PAKET_HAJMI', 2000)
+    maydonlar = list(model.MAZMUN_MAYDONLARI) + list(model.HISOBLANGAN_MAYDONLAR)
+    if natija.yangilanadi:
+        model.objects.bulk_update(natija.yangilanadi, maydonlar, batch_size=paket_hajmi)
+    for i in range(0, len(natija.ochiriladi), paket_hajmi):
+        paket = natija.ochiriladi[i:i + paket_hajmi]
+        model.objects.filter(pk__in=paket).delete()
+
+
+def _saqlash(model, upload, qatorlar, progress, farq):
+    if farq:
+        return _farq_boyicha_saqlash(model, upload, qatorlar, progress)
+    return _paketlab_saqlash(model, qatorlar, progress)
 
 
 # ─── To'lov Excel yuklash ─────────────────────────────────────────────────────
 
-def excel_faylni_o_qi(excel_upload_obj):
-    """To'lov Excel faylini o'qib, KadastrMalumat bazaga saqlaydi"""
-    wb = openpyxl.load_workbook(excel_upload_obj.fayl.path, data_only=True)
-    ws = wb.active
-    rows = list(ws.iter_rows(values_only=False))
-    if not rows:
-        raise ValueError("Excel fayl bo'sh!")
-
-    header_row, header_idx = _sarlavha_toping(rows)
-    if not header_row:
-        raise ValueError("Sarlavha qatori topilmadi!")
-
-    indekslar = _ustun_indekslar(header_row, USTUN_MAPPING)
-    if not indekslar:
-        indekslar = {
-            'viloyat': 1, 'tuman': 2, 'mfy': 3, 'kocha': 4,
-            'kadastr_raqami': 5, 'invoys_raqami': 6,
-            'summa_miqdori': 7, 'tolovchi_fio': 8, 'tolov_holati': 9,
-        }
-
-    malumatlar = []
-    for row in rows[header_idx + 1:]:
-        row_values = [cell.value for cell in row]
+def _tolov_qatorlari(excel_upload_obj, versiya, rows, indekslar, summa_xatolari):
+    summa_idx = indekslar.get('summa_miqdori')
+    nom = keshlar(Viloyat, Tuman, Mfy, Kocha)
+    for row_values in _nomlar_paketi(rows, indekslar, nom):
         if not any(row_values):
             continue
         kadastr = _qiymat_ol(row_values, indekslar, 'kadastr_raqami')
         if not kadastr:
             continue
-        malumatlar.append(KadastrMalumat(
+        obj = KadastrMalumat(
             excel_fayl=excel_upload_obj,
-            viloyat=_qiymat_ol(row_values, indekslar, 'viloyat'),
-            tuman=_qiymat_ol(row_values, indekslar, 'tuman'),
-            mfy=_qiymat_ol(row_values, indekslar, 'mfy'),
-            kocha=_qiymat_ol(row_values, indekslar, 'kocha'),
+            versiya=versiya,
+            viloyat=nom['viloyat'][_qiymat_ol(row_values, indekslar, 'viloyat')],
+            tuman=nom['tuman'][_qiymat_ol(row_values, indekslar, 'tuman')],
+            mfy=nom['mfy'][_qiymat_ol(row_values, indekslar, 'mfy')],
+            kocha=nom['kocha'][_qiymat_ol(row_values, indekslar, 'kocha')],
             kadastr_raqami=kadastr,
             invoys_raqami=_qiymat_ol(row_values, indekslar, 'invoys_raqami'),
             summa_miqdori=_qiymat_ol(row_values, indekslar, 'summa_miqdori'),
             tolovchi_fio=_qiymat_ol(row_values, indekslar, 'tolovchi_fio'),
             tolov_holati=_qiymat_ol(row_values, indekslar, 'tolov_holati'),
-        ))
+        )
+        obj.kalitlarni_hisoblash()
+        if summa_idx is not None and summa_idx < len(row_values) and isinstance(row_values[summa_idx], (int, float)):
+            # Son katak matnga aylantirilmasdan o'qiladi
+            obj.summa_tiyin = tiyinga(row_values[summa_idx])
+        if obj.summa_xatosi:
+            if summa_xatolari[0] < 5:
+                logger.warning("Summa o'qilmadi: %s — %r", kadastr, obj.summa_miqdori)
+            summa_xatolari[0] += 1
+        yield obj
 
-    KadastrMalumat.objects.bulk_create(malumatlar)
-    return len(malumatlar)
+
+def excel_faylni_o_qi(excel_upload_obj, versiya, progress=None, farq=False, oqim=None):
+    """
+    To'lov Excel faylini (barcha varaqlarini) oqim rejimida o'qib, KadastrMalumat
+    bazaga `versiya` raqami bilan saqlaydi. Versiya faollashtirilmaguncha qatorlar
+    botga ko'rinmaydi. farq=True bo'lsa faqat faol ma'lumotdan farq qiladigan
+    qatorlar yoziladi. `oqim` — umumiy VaraqOqimi (navbatdagi fayllar bilan).
+    """
+    summa_xatolari = [0]
+    yol = excel_upload_obj.fayl.path
+    with _excel_oqimi(yol, USTUN_MAPPING, STANDART_INDEKSLAR, oqim) as (indekslar, rows, manba):
+        qatorlar = _tolov_qatorlari(excel_upload_obj, versiya, rows, indekslar, summa_xatolari)
+        natija = _saqlash(KadastrMalumat, excel_upload_obj, qatorlar, progress, farq)
+    natija.summa_xatolari = summa_xatolari[0]
+    natija.varaqlar = manba.hisobot()
+    if natija.summa_xatolari:
+        logger.warning("%d ta qatorda summa o'qilmadi", natija.summa_xatolari)
+    return natija
 
 
 # ─── Obyekt holati Excel yuklash ──────────────────────────────────────────────
 
-def obyekt_excel_o_qi(obyekt_upload_obj):
-    """Obyekt holati Excel faylini o'qib, ObyektMalumat bazaga saqlaydi"""
-    wb = openpyxl.load_workbook(obyekt_upload_obj.fayl.path, data_only=True)
-    ws = wb.active
-    rows = list(ws.iter_rows(values_only=False))
-    if not rows:
-        raise ValueError("Excel fayl bo'sh!")
-
-    header_row, header_idx = _sarlavha_toping(rows)
-    if not header_row:
-        raise ValueError("Sarlavha qatori topilmadi!")
-
-    indekslar = _ustun_indekslar(header_row, OBYEKT_USTUN_MAPPING)
-    if not indekslar:
-        # Standart: A=0, B=1, C=2, D=3, E=4
-        indekslar = {
-            'kadastr_raqami': 0,
-            'viloyat': 1,
-            'tuman': 2,
-            'mfy': 3,
-            'holati': 4,
-        }
-
-    malumatlar = []
-    for row in rows[header_idx + 1:]:
-        row_values = [cell.value for cell in row]
+def _obyekt_qatorlari(obyekt_upload_obj, versiya, rows, indekslar):
+    nom = keshlar(Viloyat, Tuman, Mfy)
+    for row_values in _nomlar_paketi(rows, indekslar, nom):
         if not any(row_values):
             continue
         kadastr = _qiymat_ol(row_values, indekslar, 'kadastr_raqami')
         if not kadastr:
             continue
-        malumatlar.append(ObyektMalumat(
+        obj = ObyektMalumat(
             excel_fayl=obyekt_upload_obj,
+            versiya=versiya,
             kadastr_raqami=kadastr,
-            viloyat=_qiymat_ol(row_values, indekslar, 'viloyat'),
-            tuman=_qiymat_ol(row_values, indekslar, 'tuman'),
-            mfy=_qiymat_ol(row_values, indekslar, 'mfy'),
+            viloyat=nom['viloyat'][_qiymat_ol(row_values, indekslar, 'viloyat')],
+            tuman=nom['tuman'][_qiymat_ol(row_values, indekslar, 'tuman')],
+            mfy=nom['mfy'][_qiymat_ol(row_values, indekslar, 'mfy')],
             holati=_qiymat_ol(row_values, indekslar, 'holati'),
-        ))
+        )
+        obj.kalitlarni_hisoblash()
+        yield obj
+
 
-    ObyektMalumat.objects.bulk_create(malumatlar)
-    return len(malumatlar)
\ No newline at end of file
+def obyekt_excel_o_qi(obyekt_upload_obj, versiya, progress=None, farq=False, oqim=None):
+    """
+    Obyekt holati Excel faylini (barcha varaqlarini) oqim rejimida o'qib,
+    ObyektMalumat bazaga `versiya` raqami bilan saqlaydi (farq=True — faqat o'zgarishlar).
+    """
+    yol = obyekt_upload_obj.fayl.path
+    with _excel_oqimi(yol, OBYEKT_USTUN_MAPPING, OBYEKT_STANDART_INDEKSLAR, oqim) as (indekslar, rows, manba):
+        qatorlar = _obyekt_qatorlari(obyekt_upload_obj, versiya, rows, indekslar)
+        natija = _saqlash(ObyektMalumat, obyekt_upload_obj, qatorlar, progress, farq)
+    natija.varaqlar = manba.hisobot()
+    return natija
+
+
+# Import modeli -> (ustun mapping, standart indekslar): fayllarni oldindan navbatga qo'yish uchun
+USTUNLAR = {
+    KadastrMalumat: (USTUN_MAPPING, STANDART_INDEKSLAR),
+    ObyektMalumat: (OBYEKT_USTUN_MAPPING, OBYEKT_STANDART_INDEKSLAR),
+}
@@ -0,0 +1,99 @@
+"""
+To'lov va obyekt holatlari.
+
+Exceldagi erkin matn (tolov_holati, holati) import paytida kichik butun
+kodga ajratiladi va indeksli holat_kodi ustuniga yoziladi. Kalit so'zlar
+qoidalari bitta jadvalda — bot, admin va xulosalar shundan foydalanadi.
+Jadvalni HOLAT_QOIDALARI sozlamasi bilan almashtirish mumkin; keyin mavjud
+yozuvlar `python manage.py holatlarni_tasniflash` bilan qayta tasniflanadi.
+"""
+import functools
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import models
+
+
+class TolovHolati(models.IntegerChoices):
+    NOMALUM = 0, "Noma'lum"
+    TOLANMAGAN = 1, "To'lanmagan"
+    TOLANGAN = 2, "To'langan"
+
+
+class ObyektHolati(models.IntegerChoices):
+    BOSHQA = 0, "Boshqa"
+    MUHOKAMADA = 1, "Muhokamada"
+    RAD_ETILGAN = 2, "Rad etilgan"
+    TASDIQLANGAN = 3, "Tasdiqlangan"
+
+
+TURLAR = {'tolov': TolovHolati, 'obyekt': ObyektHolati}
+
+# Tur -> [(kod nomi, kalit so'zlar)]: matnda so'zlardan biri uchrasa shu kod.
+# Birinchi mos kelgan qoida olinadi, hech biri mos kelmasa — 0.
+STANDART_QOIDALAR = {
+    'tolov': [
+        ('TOLANMAGAN', ["to'lanmagan"]),
+        ('TOLANGAN', ["to'langan"]),
+    ],
+    'obyekt': [
+        ('MUHOKAMADA', ['muhokama']),
+        ('RAD_ETILGAN', ['rad', 'bekor']),
+        ('TASDIQLANGAN', ['tasdiqlangan', 'qabul']),
+    ],
+}
+
+# Kod -> (rang, emoji): admin nishonlari va bot xabarlari uchun
+TOLOV_BELGILARI = {
+    TolovHolati.TOLANMAGAN: ('#dc3545', '❌'),
+    TolovHolati.TOLANGAN: ('#28a745', '✅'),
+    TolovHolati.NOMALUM: ('#6c757d', '⏳'),
+}
+OBYEKT_BELGILARI = {
+    ObyektHolati.MUHOKAMADA: ('#fd7e14', '🔄'),
+    ObyektHolati.RAD_ETILGAN: ('#dc3545', '❌'),
+    ObyektHolati.TASDIQLANGAN: ('#28a745', '✅'),
+    ObyektHolati.BOSHQA: ('#6c757d', '📋'),
+}
+
+# "to‘lanmagan", "toʻlanmagan" va "to'lanmagan" bir xil tasniflanadi
+_APOSTROFLAR = str.maketrans({c: "'" for c in '‘’ʻʼ`´'})
+
+
+def _normal(matn):
+    return str(matn or '').translate(_APOSTROFLAR).lower()
+
+
+@functools.cache
+def _qoidalar(tur):
+    enum = TURLAR[tur]
+    jadval = getattr(settings, 'HOLAT_QOIDALARI', {}).get(tur, STANDART_QOIDALAR[tur])
+    return tuple((enum[nom], tuple(_normal(s) for s in sozlar)) for nom, sozlar in jadval)
+
+
+@functools.lru_cache(maxsize=4096)
+def _tasniflash(tur, matn):
+    matn = _normal(matn)
+    for kod, sozlar in _qoidalar(tur):
+        if any(s in matn for s in sozlar):
+            return kod
+    return TURLAR[tur](0)
+
+
+def tolov_kodi(matn):
+    """To'lov holati matni -> TolovHolati"""
+    return _tasniflash('tolov', matn or '')
+
+
+def obyekt_kodi(matn):
+    """Obyekt holati matni -> ObyektHolati"""
+    return _tasniflash('obyekt', matn or '')
+
+
+def _sozlama_ozgardi(setting, **kwargs):
+    if setting == 'HOLAT_QOIDALARI':
+        _qoidalar.cache_clear()
+        _tasniflash.cache_clear()
+
+
+setting_changed.connect(_sozlama_ozgardi, dispatch_uid='kadastr_holat_qoidalari')
@@ -0,0 +1,184 @@
+import bisect
+import logging
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from django.conf import settings
+
+from . import qidiruv
+from .kalit import kadastr_kalit
+from .models import KadastrMalumat, ObyektMalumat, _OXIRGI_BELGI
+
+logger = logging.getLogger(__name__)
+
+
+def _versiya_fayli():
+    """Faollashtirish belgisi fayli: import uni qayta yozadi, bot jarayonlari mazmunini kuzatadi"""
+    return Path(getattr(settings, 'KADASTR_VERSIYA_FAYLI', None) or Path(settings.MEDIA_ROOT) / '.faol_versiya')
+
+
+def _versiya_fayli_belgisi():
+    # mtime emas: fayl tizimi vaqti ketma-ket ikki yozuvni ajratmasligi mumkin
+    try:
+        return _versiya_fayli().read_text()
+    except OSError:
+        return None
+
+
+def versiya_ozgardi():
+    """
+    Upload faollashtirilgandan yoki o'chirilgandan keyin chaqiriladi. Shu
+    serverdagi barcha jarayonlarning indeks belgisi keyingi murojaatdayoq
+    eskiradi — KADASTR_INDEKS_TEKSHIRISH oralig'i kutilmaydi.
+    """
+    fayl = _versiya_fayli()
+    try:
+        fayl.parent.mkdir(parents=True, exist_ok=True)
+        fayl.write_text(str(time.time_ns()))
+    except OSError:
+        logger.warning("Versiya belgisi fayli yozilmadi: %s", fayl, exc_info=True)
+
+
+class KadastrIndeks:
+    """
+    Kadastr raqamlari bo'yicha xotiradagi indeks.
+
+    Normallashtirilgan kalitlar tartiblangan ro'yxatda, ularga mos id'lar
+    parallel massivda saqlanadi. Aniq va prefiks qidiruv bisect orqali
+    O(log n) da bajariladi, bazaga faqat topilgan id'lar bo'yicha murojaat qilinadi.
+
+    Indeks faqat faol versiyadagi yozuvlardan quriladi va upload'larning
+    faol versiyalari o'zgarganda qayta quriladi — yangi Excel fayl boshqa
+    jarayonda (admin / import ishchisi) faollashtirilganda ham bot buni ko'radi.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._malumot = ([], array('q'))
+        self._belgi = None
+        self._tekshirilgan = 0.0
+        self._fayl_belgisi = None
+        self._qulf = threading.Lock()
+
+    def joriy_belgi(self):
+        """Upload'larning hozirgi faol versiyalari (bazadan, tekshirish oralig'isiz)"""
+        upload_model = self.model._meta.get_field('excel_fayl').related_model
+        return tuple(upload_model.objects.order_by('pk').values_list('pk', 'faol_versiya'))
+
+    def qurish(self):
+        """Indeksni bazadan to'liq qayta quradi"""
+        boshlanish = time.monotonic()
+        self._fayl_belgisi = _versiya_fayli_belgisi()
+        belgi = self.joriy_belgi()
+        qatorlar = (
+            self.model.objects.faol()
+            .exclude(kadastr_kalit='')
+            .values_list('kadastr_kalit', 'id')
+            .iterator(chunk_size=10000)
+        )
+        juftlar = sorted(qatorlar)
+
+        self._malumot = ([k for k, _ in juftlar], array('q', (pk for _, pk in juftlar)))
+        self._belgi = belgi
+        self._tekshirilgan = time.monotonic()
+        logger.info(
+            "%s indeksi qurildi: %d ta kalit, %.2f s",
+            self.model.__name__, len(juftlar), time.monotonic() - boshlanish
+        )
+
+    @property
+    def belgi(self):
+        """
+        Oxirgi tekshirilgan ma'lumot belgisi (javob keshini eskirtirish uchun).
+        Versiya fayli tekshiruvdan keyin o'zgargan bo'lsa None — keshdagi
+        javoblar mos kelmaydi, keyingi qidiruv belgini bazadan yangilaydi.
+        """
+        if _versiya_fayli_belgisi() != self._fayl_belgisi:
+            self.eskirgan()
+            return None
+        return self._belgi
+
+    def tayyorlash(self):
+        """
+        Kerak bo'lsa (birinchi marta yoki ma'lumot o'zgarganda) indeksni quradi.
+        KADASTR_XOTIRA_INDEKSI = False bo'lsa faqat belgi yangilanadi.
+        """
+        oraliq = getattr(settings, 'KADASTR_INDEKS_TEKSHIRISH', 30)
+        if self._belgi is not None and time.monotonic() - self._tekshirilgan < oraliq:
+            return
+        with self._qulf:
+            if self._belgi is not None and time.monotonic() - self._tekshirilgan < oraliq:
+                return
+            # Bazadan oldin: shu orada yozilgan belgi keyingi murojaatda yana tekshiriladi
+            self._fayl_belgisi = _versiya_fayli_belgisi()
+            if not getattr(settings, 'KADASTR_XOTIRA_INDEKSI', True):
+                self._belgi = self.joriy_belgi()
+                self._tekshirilgan = time.monotonic()
+            elif self._belgi is None or self.joriy_belgi() != self._belgi:
+                self.qurish()
+            else:
+                self._tekshirilgan = time.monotonic()
+
+    def eskirgan(self):
+        """Keyingi murojaatda belgini qayta tekshirishga majburlaydi"""
+        self._tekshirilgan = 0.0
+
+    @staticmethod
+    def _idlar(qs, chegara):
+        qs = qs.order_by('kadastr_kalit', 'id')
+        idlar = qs.values_list('id', flat=True)
+        if chegara is not None:
+            idlar = idlar[:chegara]
+        return qs.count(), list(idlar)
+
+    def _bazadan(self, matn, chegara):
+        return self._idlar(self.model.objects.faol().kalit_boyicha(matn), chegara)
+
+    def _qism_satr(self, kalit, chegara):
+        """Aniq va prefiks moslik bo'lmasa — kalit ichida uchraydigan yozuvlar (FTS5 trigram)"""
+        if len(kalit) < qidiruv.TRIGRAM_MIN:
+            return 0, []
+        return self._idlar(self.model.objects.faol().matn_boyicha(kalit, ['kadastr_kalit']), chegara)
+
+    def qidirish(self, matn, chegara=None):
+        """
+        (jami, idlar) qaytaradi. Aniq moslik bo'lsa faqat u, aks holda
+        shu prefiks bilan boshlanadigan barcha kalitlar hisobga olinadi;
+        ular ham bo'lmasa — kalit ichida qism-satr sifatida uchraydiganlar.
+        idlar ro'yxati `chegara` bilan cheklanadi.
+
+        KADASTR_XOTIRA_INDEKSI = False bo'lsa, xuddi shu so'rov
+        kadastr_kalit ustunidagi B-tree indeks orqali bazada bajariladi.
+        """
+        kalit = kadastr_kalit(matn)
+        if not kalit:
+            return 0, []
+        jami, idlar = self._prefiks(kalit, chegara)
+        if not jami:
+            return self._qism_satr(kalit, chegara)
+        return jami, idlar
+
+    def _prefiks(self, kalit, chegara):
+        # Indekssiz rejimda ham — javob keshi belgisi yangilanib turishi uchun
+        self.tayyorlash()
+        if not getattr(settings, 'KADASTR_XOTIRA_INDEKSI', True):
+            return self._bazadan(kalit, chegara)
+
+        kalitlar, idlar = self._malumot
+        boshi = bisect.bisect_left(kalitlar, kalit)
+        aniq_oxiri = bisect.bisect_right(kalitlar, kalit, boshi)
+        if aniq_oxiri > boshi:
+            oxiri = aniq_oxiri
+        else:
+            oxiri = bisect.bisect_left(kalitlar, kalit + _OXIRGI_BELGI, boshi)
+
+        jami = oxiri - boshi
+        if chegara is not None:
+            oxiri = min(oxiri, boshi + chegara)
+        return jami, list(idlar[boshi:oxiri])
+
+
+tolov_indeks = KadastrIndeks(KadastrMalumat)
+obyekt_indeks = KadastrIndeks(ObyektMalumat)
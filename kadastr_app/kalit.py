@@ -0,0 +1,22 @@
+import hashlib
+
+
+def kadastr_kalit(qiymat):
+    """
+    Kadastr raqamini yagona (kanonik) ko'rinishga keltiradi.
+
+    '11:13:42:02:01:0406', '11 13 42 02 01 0406', '11-13-42-02-01-0406'
+    va '11134202010406' — barchasi '11134202010406' bo'ladi.
+    """
+    if qiymat is None:
+        return ''
+    return ''.join(c for c in str(qiymat) if c.isalnum()).upper()
+
+
+def mazmun_hash(qiymatlar):
+    """
+    Qator mazmunining qisqa xeshi (32 ta hex belgi). Farq bo'yicha importda
+    qator o'zgarganini bilish uchun ishlatiladi.
+    """
+    matn = '\x1f'.join('' if q is None else str(q) for q in qiymatlar)
+    return hashlib.blake2b(matn.encode('utf-8'), digest_size=16).hexdigest()
@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class JavobKeshi:
+    """
+    Hajmi cheklangan LRU + TTL kesh.
+
+    Har bir yozuv ma'lumot "belgisi" (faol versiyalar) bilan saqlanadi:
+    yangi upload faollashib belgi o'zgarsa, eski yozuvlar avtomatik eskiradi.
+    Belgi None (noma'lum, hozirgina eskirgan) bo'lsa kesh ishlatilmaydi.
+    Kesh faqat jarayon xotirasida ishlaydi — tekshirish bazaga ham,
+    thread-pool'ga ham murojaat qilmaydi.
+    """
+
+    def __init__(self, hajm=10000, muddat=300):
+        self.hajm = hajm
+        self.muddat = muddat
+        self._yozuvlar = OrderedDict()
+        self._qulf = threading.Lock()
+        self.topildi = 0
+        self.topilmadi = 0
+
+    def ol(self, kalit, belgi):
+        with self._qulf:
+            yozuv = self._yozuvlar.get(kalit)
+            if yozuv is not None:
+                vaqt, yozuv_belgisi, qiymat = yozuv
+                if belgi is not None and yozuv_belgisi == belgi and time.monotonic() - vaqt < self.muddat:
+                    self._yozuvlar.move_to_end(kalit)
+                    self.topildi += 1
+                    return qiymat
+                del self._yozuvlar[kalit]
+            self.topilmadi += 1
+            return None
+
+    def qoy(self, kalit, belgi, qiymat):
+        if belgi is None:
+            return
+        with self._qulf:
+            self._yozuvlar[kalit] = (time.monotonic(), belgi, qiymat)
+            self._yozuvlar.move_to_end(kalit)
+            while len(self._yozuvlar) > self.hajm:
+                self._yozuvlar.popitem(last=False)
+
+    def tozalash(self):
+        with self._qulf:
+            self._yozuvlar.clear()
+
+    def hisobot(self):
+        """Kesh hisoblagichlari: hajm, topildi (hit), topilmadi (miss) va ulush"""
+        with self._qulf:
+            jami = self.topildi + self.topilmadi
+            return {
+                'hajm': len(self._yozuvlar),
+                'topildi': self.topildi,
+                'topilmadi': self.topilmadi,
+                'ulush': self.topildi / jami if jami else 0.0,
+            }
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kadastr_app.holat import obyekt_kodi, tolov_kodi
+from kadastr_app.models import KadastrMalumat, ObyektMalumat
+from kadastr_app.xulosa import obyekt_xulosasini_yangilash, tuman_xulosasini_yangilash
+
+
+class Command(BaseCommand):
+    help = "holat_kodi ustunlarini joriy HOLAT_QOIDALARI bo'yicha qayta hisoblaydi (qoidalar o'zgargandan keyin)"
+
+    def handle(self, *args, **options):
+        for model, maydon, kod_funksiyasi in (
+            (KadastrMalumat, 'tolov_holati', tolov_kodi),
+            (ObyektMalumat, 'holati', obyekt_kodi),
+        ):
+            # Har xil holat matnlari oz — har biri uchun bitta UPDATE
+            ozgardi = 0
+            with transaction.atomic():
+                for matn in model.objects.order_by().values_list(maydon, flat=True).distinct():
+                    kod = kod_funksiyasi(matn)
+                    ozgardi += model.objects.filter(**{maydon: matn}).exclude(holat_kodi=kod).update(holat_kodi=kod)
+            self.stdout.write(f"{model.__name__}: {ozgardi} ta yozuv qayta tasniflandi")
+        tuman_xulosasini_yangilash()
+        obyekt_xulosasini_yangilash()
+        self.stdout.write(self.style.SUCCESS("✅ Tuman va obyekt holatlari xulosalari yangilandi"))
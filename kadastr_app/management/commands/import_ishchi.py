@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from kadastr_app.vazifalar import navbatni_bajarish, osilib_qolganlarni_tiklash
+
+
+class Command(BaseCommand):
+    help = "Navbatdagi Excel import vazifalarini bajaruvchi ishchi (IMPORT_ISHCHI = 'command' uchun)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--oraliq', type=float, default=2.0,
+            help="Navbat bo'sh bo'lganda qayta tekshirish oralig'i (soniya)"
+        )
+        parser.add_argument(
+            '--bir-marta', action='store_true',
+            help="Navbatni bir marta bo'shatib, chiqib ketish"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("⏳ Import ishchisi ishga tushdi...")
+        tiklandi = osilib_qolganlarni_tiklash()
+        if tiklandi:
+            self.stdout.write(self.style.WARNING(f"⚠️ {tiklandi} ta osilib qolgan vazifa XATO deb belgilandi"))
+        while True:
+            soni = navbatni_bajarish()
+            if soni:
+                self.stdout.write(self.style.SUCCESS(f"✅ {soni} ta vazifa bajarildi"))
+            if options['bir_marta']:
+                return
+            time.sleep(options['oraliq'])
@@ -0,0 +1,248 @@
+"""
+Prometheus matn formatidagi metrikalar.
+
+Hisoblagich, gistogramma va hisobot (callback) o'lchovlari jarayon
+xotirasida yig'iladi va `matn()` bilan chiqariladi: Django'da /metrics/
+(kadastr_app.views), polling rejimidagi botda esa ichki HTTP server
+(bot/metrikalar.py) orqali.
+
+Bazaga har bir so'rov (execute_wrapper orqali) soni va vaqti umumiy
+hisoblanadi, `sorovlarni_sanash()` bloki ichida esa shu blokka (masalan,
+bitta bot update'iga) tegishli hisobga ham qo'shiladi.
+"""
+import bisect
+import contextvars
+import hmac
+import ipaddress
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Soniyalar uchun standart gistogramma chegaralari
+VAQT_CHEGARALARI = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SON_CHEGARALARI = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+MATN_TURI = 'text/plain; version=0.0.4; charset=utf-8'
+
+_reestr = []
+_reestr_qulf = threading.Lock()
+
+
+def _belgilar_matni(nomlar, qiymatlar, qoshimcha=()):
+    juftlar = list(zip(nomlar, qiymatlar)) + list(qoshimcha)
+    if not juftlar:
+        return ''
+    ichi = ','.join(
+        '%s="%s"' % (n, str(q).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for n, q in juftlar
+    )
+    return '{%s}' % ichi
+
+
+def _son(qiymat):
+    if qiymat == float('inf'):
+        return '+Inf'
+    return repr(float(qiymat)) if isinstance(qiymat, float) else str(qiymat)
+
+
+class _Metrika:
+    tur = 'untyped'
+
+    def __init__(self, nom, yordam, belgilar=()):
+        self.nom = nom
+        self.yordam = yordam
+        self.belgilar = tuple(belgilar)
+        self._qulf = threading.Lock()
+        self._qiymatlar = {}
+        with _reestr_qulf:
+            _reestr.append(self)
+
+    def _kalit(self, belgilar):
+        return tuple(str(belgilar.get(b, '')) for b in self.belgilar)
+
+    def qatorlar(self):
+        raise NotImplementedError
+
+    def matn(self):
+        return '\n'.join([f'# HELP {self.nom} {self.yordam}', f'# TYPE {self.nom} {self.tur}', *self.qatorlar()])
+
+
+class Hisoblagich(_Metrika):
+    """Faqat o'sadigan son (counter)"""
+    tur = 'counter'
+
+    def qosh(self, qiymat=1, **belgilar):
+        kalit = self._kalit(belgilar)
+        with self._qulf:
+            self._qiymatlar[kalit] = self._qiymatlar.get(kalit, 0) + qiymat
+
+    def qatorlar(self):
+        with self._qulf:
+            qiymatlar = sorted(self._qiymatlar.items())
+        return [f'{self.nom}{_belgilar_matni(self.belgilar, k)} {_son(q)}' for k, q in qiymatlar]
+
+
+class Gistogramma(_Metrika):
+    """Kuzatuvlar taqsimoti (histogram): chegaralar bo'yicha yig'ma sonlar, yig'indi va soni"""
+    tur = 'histogram'
+
+    def __init__(self, nom, yordam, belgilar=(), chegaralar=VAQT_CHEGARALARI):
+        super().__init__(nom, yordam, belgilar)
+        self.chegaralar = tuple(sorted(chegaralar))
+
+    def kuzatish(self, qiymat, **belgilar):
+        kalit = self._kalit(belgilar)
+        with self._qulf:
+            savatlar = self._qiymatlar.get(kalit)
+            if savatlar is None:
+                savatlar = self._qiymatlar[kalit] = [[0] * (len(self.chegaralar) + 1), 0.0, 0]
+            savatlar[0][bisect.bisect_left(self.chegaralar, qiymat)] += 1
+            savatlar[1] += qiymat
+            savatlar[2] += 1
+
+    @contextmanager
+    def vaqt(self, **belgilar):
+        boshlanish = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.kuzatish(time.perf_counter() - boshlanish, **belgilar)
+
+    def qatorlar(self):
+        with self._qulf:
+            qiymatlar = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._qiymatlar.items())
+        natija = []
+        for kalit, (savatlar, yigindi, soni) in qiymatlar:
+            jami = 0
+            for chegara, son in zip(self.chegaralar + (float('inf'),), savatlar):
+                jami += son
+                belgi = _belgilar_matni(self.belgilar, kalit, [('le', _son(chegara))])
+                natija.append(f'{self.nom}_bucket{belgi} {jami}')
+            belgi = _belgilar_matni(self.belgilar, kalit)
+            natija.append(f'{self.nom}_sum{belgi} {_son(yigindi)}')
+            natija.append(f'{self.nom}_count{belgi} {soni}')
+        return natija
+
+
+class HisobotOlchovi(_Metrika):
+    """
+    Mavjud `hisobot()` lug'atlaridan (kesh, pool, cheklov) o'lchovlar:
+    har bir son kaliti `<nom>{qiymat="kalit"}` qatori bo'ladi.
+    """
+    tur = 'gauge'
+
+    def __init__(self, nom, yordam, funksiya):
+        super().__init__(nom, yordam, ('qiymat',))
+        self.funksiya = funksiya
+
+    def qatorlar(self):
+        return [
+            f'{self.nom}{_belgilar_matni(self.belgilar, (k,))} {_son(q)}'
+            for k, q in sorted(self.funksiya().items())
+            if isinstance(q, (int, float)) and not isinstance(q, bool)
+        ]
+
+
+def matn():
+    """Barcha ro'yxatdagi metrikalar — Prometheus text exposition format 0.0.4"""
+    with _reestr_qulf:
+        metrikalar = list(_reestr)
+    return '\n'.join(m.matn() for m in metrikalar) + '\n'
+
+
+def mahalliy_manzil(manzil):
+    """127.0.0.1, ::1 va shu kabi loopback manzillar"""
+    try:
+        ip = ipaddress.ip_address(manzil)
+    except ValueError:
+        return manzil == 'localhost'
+    return ip.is_loopback or bool(getattr(ip, 'ipv4_mapped', None) and ip.ipv4_mapped.is_loopback)
+
+
+def ruxsat_bor(authorization, manzil):
+    """
+    METRIKA_TOKEN o'rnatilgan bo'lsa 'Bearer <token>' sarlavhasi talab qilinadi,
+    aks holda faqat shu serverning o'zidan (loopback) kelgan so'rovlarga ruxsat.
+    """
+    token = getattr(settings, 'METRIKA_TOKEN', '')
+    if not token:
+        return mahalliy_manzil(manzil)
+    return hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+
+
+# ─── Baza so'rovlari ──────────────────────────────────────────────────────────
+
+db_sorovlari = Hisoblagich('kadastr_db_sorovlar_total', "Bazaga yuborilgan SQL so'rovlar", ('alias',))
+db_vaqti = Gistogramma('kadastr_db_sorov_soniyalari', "Bitta SQL so'rovning bajarilish vaqti", ('alias',))
+
+
+class SorovHisobi:
+    """
+    Bitta blok (update, HTTP so'rov) davomidagi SQL so'rovlar soni va vaqti.
+    Ichma-ich bloklarda so'rov tashqi (ota) hisoblarga ham qo'shiladi.
+    """
+    __slots__ = ('soni', 'soniya', 'ota')
+
+    def __init__(self, ota=None):
+        self.soni = 0
+        self.soniya = 0.0
+        self.ota = ota
+
+
+_joriy_hisob = contextvars.ContextVar('kadastr_sorov_hisobi', default=None)
+
+
+@contextmanager
+def sorovlarni_sanash():
+    """
+    Blok ichidagi (shu kontekstdan nusxa olgan oqimlardagi ham) SQL so'rovlarni
+    bitta SorovHisobi'ga yig'adi.
+    """
+    hisob = SorovHisobi(_joriy_hisob.get())
+    token = _joriy_hisob.set(hisob)
+    try:
+        yield hisob
+    finally:
+        _joriy_hisob.reset(token)
+
+
+def _sorovni_olchash(execute, sql, params, many, context):
+    boshlanish = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        davomiylik = time.perf_counter() - boshlanish
+        alias = context['connection'].alias
+        db_sorovlari.qosh(alias=alias)
+        db_vaqti.kuzatish(davomiylik, alias=alias)
+        hisob = _joriy_hisob.get()
+        while hisob is not None:
+            hisob.soni += 1
+            hisob.soniya += davomiylik
+            hisob = hisob.ota
+
+
+def _ulanish_yaratildi(sender, connection, **kwargs):
+    if _sorovni_olchash not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sorovni_olchash)
+
+
+def ulash():
+    """Har bir yangi DB ulanishiga o'lchovchini qo'shadi (AppConfig.ready'dan chaqiriladi)"""
+    connection_created.connect(_ulanish_yaratildi, dispatch_uid='kadastr_metrikalar')
+
+
+# ─── Import vazifalari ────────────────────────────────────────────────────────
+
+import_vaqti = Gistogramma(
+    'kadastr_import_soniyalari', "Import vazifasining davomiyligi", ('tur', 'holat'),
+    chegaralar=(1, 5, 15, 30, 60, 120, 300, 600, 1200, 3600),
+)
+import_qatorlari = Hisoblagich('kadastr_import_qatorlar_total', "Import qilingan qatorlar", ('tur',))
+import_tezligi = Gistogramma(
+    'kadastr_import_qator_tezligi', "Import tezligi (qator/soniya)", ('tur',),
+    chegaralar=(100, 500, 1000, 2500, 5000, 10000, 25000, 50000),
+)
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+def _kalit(qiymat):
+    # kadastr_app.kalit.kadastr_kalit bilan bir xil (migratsiya mustaqil bo'lishi uchun nusxa)
+    return ''.join(c for c in str(qiymat or '') if c.isalnum()).upper()
+
+
+def kalitlarni_toldirish(apps, schema_editor):
+    for model_nomi in ('KadastrMalumat', 'ObyektMalumat'):
+        Model = apps.get_model('kadastr_app', model_nomi)
+        paket = []
+        for obj in Model.objects.only('id', 'kadastr_raqami').iterator(chunk_size=5000):
+            obj.kadastr_kalit = _kalit(obj.kadastr_raqami)
+            paket.append(obj)
+            if len(paket) >= 5000:
+                Model.objects.bulk_update(paket, ['kadastr_kalit'])
+                paket = []
+        if paket:
+            Model.objects.bulk_update(paket, ['kadastr_kalit'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0003_obyektexcelupload_alter_excelupload_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kadastrmalumat',
+            name='kadastr_kalit',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200, verbose_name='Kadastr kaliti'),
+        ),
+        migrations.AddField(
+            model_name='obyektmalumat',
+            name='kadastr_kalit',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200, verbose_name='Kadastr kaliti'),
+        ),
+        migrations.RunPython(kalitlarni_toldirish, migrations.RunPython.noop),
+    ]
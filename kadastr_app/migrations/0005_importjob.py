@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0004_kadastr_kalit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tur', models.CharField(choices=[('tolov', "To'lov ma'lumotlari"), ('obyekt', 'Obyekt holati')], max_length=20, verbose_name='Turi')),
+                ('qayta_import', models.BooleanField(default=False, verbose_name='Qayta import')),
+                ('holat', models.CharField(choices=[('kutmoqda', 'Navbatda'), ('bajarilmoqda', 'Bajarilmoqda'), ('tugadi', 'Tugadi'), ('xato', 'Xato')], db_index=True, default='kutmoqda', max_length=20, verbose_name='Holati')),
+                ('qatorlar_soni', models.IntegerField(default=0, verbose_name='Saqlangan qatorlar')),
+                ('tezlik', models.FloatField(default=0, verbose_name='Tezlik (qator/s)')),
+                ('xato_matni', models.TextField(blank=True, verbose_name='Xato matni')),
+                ('yaratilgan', models.DateTimeField(auto_now_add=True, verbose_name='Yaratilgan')),
+                ('boshlangan', models.DateTimeField(blank=True, null=True, verbose_name='Boshlangan')),
+                ('tugagan', models.DateTimeField(blank=True, null=True, verbose_name='Tugagan')),
+                ('excel_fayl', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_vazifalari', to='kadastr_app.excelupload', verbose_name="To'lov fayli")),
+                ('obyekt_fayl', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='import_vazifalari', to='kadastr_app.obyektexcelupload', verbose_name='Obyekt fayli')),
+            ],
+            options={
+                'verbose_name': 'Import vazifasi',
+                'verbose_name_plural': 'Import vazifalari',
+                'ordering': ['-yaratilgan'],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:38
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mavjud_yozuvlarni_faollashtirish(apps, schema_editor):
+    """
+    Mavjud har bir upload uchun tugagan ImportJob yaratiladi va uning id'si
+    upload hamda uning yozuvlari versiyasi sifatida belgilanadi.
+    """
+    ImportJob = apps.get_model('kadastr_app', 'ImportJob')
+    juftlar = [
+        ('ExcelUpload', 'KadastrMalumat', 'tolov', 'excel_fayl'),
+        ('ObyektExcelUpload', 'ObyektMalumat', 'obyekt', 'obyekt_fayl'),
+    ]
+    for upload_nomi, malumat_nomi, tur, job_maydoni in juftlar:
+        Upload = apps.get_model('kadastr_app', upload_nomi)
+        Malumat = apps.get_model('kadastr_app', malumat_nomi)
+        for upload in Upload.objects.all():
+            job = ImportJob.objects.create(**{
+                'tur': tur, job_maydoni: upload, 'holat': 'tugadi',
+                'qatorlar_soni': upload.yozuvlar_soni, 'tugagan': timezone.now(),
+            })
+            Malumat.objects.filter(excel_fayl=upload).update(versiya=job.pk)
+            upload.faol_versiya = job.pk
+            upload.save(update_fields=['faol_versiya'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='excelupload',
+            name='faol_versiya',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Faol versiya'),
+        ),
+        migrations.AddField(
+            model_name='kadastrmalumat',
+            name='versiya',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, editable=False, verbose_name='Versiya'),
+        ),
+        migrations.AddField(
+            model_name='obyektexcelupload',
+            name='faol_versiya',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True, verbose_name='Faol versiya'),
+        ),
+        migrations.AddField(
+            model_name='obyektmalumat',
+            name='versiya',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, editable=False, verbose_name='Versiya'),
+        ),
+        migrations.RunPython(mavjud_yozuvlarni_faollashtirish, migrations.RunPython.noop),
+    ]
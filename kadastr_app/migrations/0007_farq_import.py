@@ -0,0 +1,84 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:40
+
+import hashlib
+
+from django.db import migrations, models
+
+MAZMUN_MAYDONLARI = {
+    'KadastrMalumat': (
+        'viloyat', 'tuman', 'mfy', 'kocha', 'kadastr_raqami',
+        'invoys_raqami', 'summa_miqdori', 'tolovchi_fio', 'tolov_holati',
+    ),
+    'ObyektMalumat': ('kadastr_raqami', 'viloyat', 'tuman', 'mfy', 'holati'),
+}
+
+
+def _mazmun_hash(qiymatlar):
+    # kadastr_app.kalit.mazmun_hash bilan bir xil (migratsiya mustaqil bo'lishi uchun nusxa)
+    matn = '\x1f'.join('' if q is None else str(q) for q in qiymatlar)
+    return hashlib.blake2b(matn.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def xeshlarni_toldirish(apps, schema_editor):
+    for model_nomi, maydonlar in MAZMUN_MAYDONLARI.items():
+        Model = apps.get_model('kadastr_app', model_nomi)
+        paket = []
+        for obj in Model.objects.only('id', *maydonlar).iterator(chunk_size=5000):
+            obj.mazmun_hash = _mazmun_hash(getattr(obj, m) for m in maydonlar)
+            paket.append(obj)
+            if len(paket) >= 5000:
+                Model.objects.bulk_update(paket, ['mazmun_hash'])
+                paket = []
+        if paket:
+            Model.objects.bulk_update(paket, ['mazmun_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0006_faol_versiya'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='excelupload',
+            name='import_rejimi',
+            field=models.CharField(choices=[('toliq', "To'liq (faylning yangi versiyasi)"), ('farq', "Farq bo'yicha (kadastr raqami bo'yicha yangilash)")], default='toliq', help_text="Farq bo'yicha: faqat yangi, o'zgargan va faylda yo'q qatorlar yoziladi/o'chiriladi", max_length=10, verbose_name='Import rejimi'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='olib_tashlandi',
+            field=models.IntegerField(default=0, verbose_name='Olib tashlandi'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='ozgardi',
+            field=models.IntegerField(default=0, verbose_name="O'zgardi"),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='ozgarmadi',
+            field=models.IntegerField(default=0, verbose_name="O'zgarmadi"),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='qoshildi',
+            field=models.IntegerField(default=0, verbose_name="Qo'shildi"),
+        ),
+        migrations.AddField(
+            model_name='kadastrmalumat',
+            name='mazmun_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Mazmun xeshi'),
+        ),
+        migrations.AddField(
+            model_name='obyektexcelupload',
+            name='import_rejimi',
+            field=models.CharField(choices=[('toliq', "To'liq (faylning yangi versiyasi)"), ('farq', "Farq bo'yicha (kadastr raqami bo'yicha yangilash)")], default='toliq', help_text="Farq bo'yicha: faqat yangi, o'zgargan va faylda yo'q qatorlar yoziladi/o'chiriladi", max_length=10, verbose_name='Import rejimi'),
+        ),
+        migrations.AddField(
+            model_name='obyektmalumat',
+            name='mazmun_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Mazmun xeshi'),
+        ),
+        migrations.RunPython(xeshlarni_toldirish, migrations.RunPython.noop),
+    ]
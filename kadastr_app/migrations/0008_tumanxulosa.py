@@ -0,0 +1,75 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:43
+
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def _summa(matn):
+    tozalangan = ''.join(str(matn or '').split()).replace(',', '.')
+    try:
+        return Decimal(tozalangan or 0)
+    except InvalidOperation:
+        return Decimal(0)
+
+
+def xulosani_hisoblash(apps, schema_editor):
+    # kadastr_app.xulosa.tuman_xulosasini_yangilash bilan bir xil hisob (tarixiy modellar ustida)
+    ExcelUpload = apps.get_model('kadastr_app', 'ExcelUpload')
+    KadastrMalumat = apps.get_model('kadastr_app', 'KadastrMalumat')
+    TumanXulosa = apps.get_model('kadastr_app', 'TumanXulosa')
+
+    faol_versiyalar = ExcelUpload.objects.exclude(faol_versiya=None).values('faol_versiya')
+    xulosalar = defaultdict(lambda: {'jami': 0, 'tolanmagan': 0, 'tolangan': 0, 'summa': Decimal(0)})
+    qatorlar = (
+        KadastrMalumat.objects.filter(versiya__in=faol_versiyalar)
+        .values_list('viloyat', 'tuman', 'tolov_holati', 'summa_miqdori')
+    )
+    for viloyat, tuman, holat, summa in qatorlar.iterator(chunk_size=5000):
+        x = xulosalar[viloyat, tuman]
+        x['jami'] += 1
+        holat = (holat or '').lower()
+        if "to'lanmagan" in holat:
+            x['tolanmagan'] += 1
+            x['summa'] += _summa(summa)
+        elif "to'langan" in holat:
+            x['tolangan'] += 1
+
+    TumanXulosa.objects.bulk_create([
+        TumanXulosa(
+            viloyat=viloyat, tuman=tuman, jami=x['jami'], tolanmagan=x['tolanmagan'],
+            tolangan=x['tolangan'], tolanmagan_summa=x['summa'],
+        )
+        for (viloyat, tuman), x in xulosalar.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0007_farq_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TumanXulosa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('viloyat', models.CharField(max_length=200, verbose_name='Viloyat')),
+                ('tuman', models.CharField(max_length=200, verbose_name='Tuman')),
+                ('jami', models.IntegerField(default=0, verbose_name='Jami obyektlar')),
+                ('tolanmagan', models.IntegerField(default=0, verbose_name="To'lanmagan")),
+                ('tolangan', models.IntegerField(default=0, verbose_name="To'langan")),
+                ('tolanmagan_summa', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name="To'lanmagan summa")),
+                ('yangilangan', models.DateTimeField(auto_now=True, verbose_name='Yangilangan')),
+            ],
+            options={
+                'verbose_name': 'Tuman xulosasi',
+                'verbose_name_plural': 'Tumanlar xulosasi',
+                'ordering': ['viloyat', 'tuman'],
+                'constraints': [models.UniqueConstraint(fields=('viloyat', 'tuman'), name='tuman_xulosa_yagona')],
+            },
+        ),
+        migrations.RunPython(xulosani_hisoblash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0008_tumanxulosa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='kadastrmalumat',
+            index=models.Index(fields=['tuman', 'tolovchi_fio', 'id'], name='kadastr_tuman_fio_idx'),
+        ),
+    ]
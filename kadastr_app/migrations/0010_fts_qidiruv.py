@@ -0,0 +1,52 @@
+# Generated by Django 6.0.2
+
+import logging
+
+from django.db import OperationalError, migrations
+
+logger = logging.getLogger(__name__)
+
+# (asosiy jadval, FTS ustunlari) — models.MATN_MAYDONLARI nusxasi
+FTS_JADVALLARI = [
+    ('kadastr_app_kadastrmalumat', ['kadastr_kalit', 'kadastr_raqami', 'tolovchi_fio', 'invoys_raqami', 'mfy', 'kocha']),
+    ('kadastr_app_obyektmalumat', ['kadastr_kalit', 'kadastr_raqami', 'mfy']),
+]
+
+
+def fts_yaratish(apps, schema_editor):
+    """FTS5 trigram jadvallarini yaratib, mavjud yozuvlar bilan to'ldiradi (faqat SQLite)"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for jadval, ustunlar in FTS_JADVALLARI:
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {jadval}_fts USING fts5({', '.join(ustunlar)}, tokenize='trigram')"
+                )
+            except OperationalError as e:
+                # SQLite FTS5/trigram'siz yig'ilgan bo'lsa qidiruv icontains bilan qoladi
+                logger.warning("%s_fts yaratilmadi (%s) — qism-satr qidiruvi icontains bilan bajariladi", jadval, e)
+                return
+            cursor.execute(
+                f"INSERT INTO {jadval}_fts (rowid, {', '.join(ustunlar)}) "
+                f"SELECT id, {', '.join(ustunlar)} FROM {jadval}"
+            )
+
+
+def fts_ochirish(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for jadval, _ in FTS_JADVALLARI:
+            cursor.execute(f'DROP TABLE IF EXISTS {jadval}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0009_tuman_sahifa_indeksi'),
+    ]
+
+    operations = [
+        migrations.RunPython(fts_yaratish, fts_ochirish),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:10
+
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _summa(matn):
+    tozalangan = ''.join(str(matn or '').split()).replace(',', '.')
+    try:
+        return Decimal(tozalangan or 0)
+    except InvalidOperation:
+        return Decimal(0)
+
+
+def xulosalarni_toldirish(apps, schema_editor):
+    """
+    Mavjud ma'lumot uchun: tumanlar bo'yicha to'langan summa, obyekt holatlari
+    taqsimoti va foydalanuvchilarning birinchi/oxirgi murojaat kunlari.
+    """
+    ExcelUpload = apps.get_model('kadastr_app', 'ExcelUpload')
+    ObyektExcelUpload = apps.get_model('kadastr_app', 'ObyektExcelUpload')
+    KadastrMalumat = apps.get_model('kadastr_app', 'KadastrMalumat')
+    ObyektMalumat = apps.get_model('kadastr_app', 'ObyektMalumat')
+    TumanXulosa = apps.get_model('kadastr_app', 'TumanXulosa')
+    ObyektHolatXulosa = apps.get_model('kadastr_app', 'ObyektHolatXulosa')
+    BotFoydalanuvchi = apps.get_model('kadastr_app', 'BotFoydalanuvchi')
+    KunlikStatistika = apps.get_model('kadastr_app', 'KunlikStatistika')
+
+    summalar = defaultdict(Decimal)
+    qatorlar = (
+        KadastrMalumat.objects.filter(
+            versiya__in=ExcelUpload.objects.exclude(faol_versiya=None).values('faol_versiya'),
+            tolov_holati__icontains="to'langan",
+        )
+        .exclude(tolov_holati__icontains="to'lanmagan")
+        .values_list('viloyat', 'tuman', 'summa_miqdori')
+    )
+    for viloyat, tuman, summa in qatorlar.iterator(chunk_size=5000):
+        summalar[viloyat, tuman] += _summa(summa)
+    for (viloyat, tuman), summa in summalar.items():
+        TumanXulosa.objects.filter(viloyat=viloyat, tuman=tuman).update(tolangan_summa=summa)
+
+    holatlar = Counter()
+    faol_obyektlar = ObyektMalumat.objects.filter(
+        versiya__in=ObyektExcelUpload.objects.exclude(faol_versiya=None).values('faol_versiya')
+    )
+    for holati in faol_obyektlar.values_list('holati', flat=True).iterator(chunk_size=5000):
+        holatlar[holati.strip() or '—'] += 1
+    ObyektHolatXulosa.objects.bulk_create([ObyektHolatXulosa(holati=h, soni=n) for h, n in holatlar.items()])
+
+    # So'rovlar soni kunlar bo'yicha saqlanmagan — faqat foydalanuvchilar tiklanadi
+    yangi, faol = Counter(), Counter()
+    for birinchi, oxirgi in BotFoydalanuvchi.objects.values_list('birinchi_murojaat', 'oxirgi_murojaat').iterator():
+        yangi[timezone.localdate(birinchi)] += 1
+        faol[timezone.localdate(oxirgi)] += 1
+    KunlikStatistika.objects.bulk_create([
+        KunlikStatistika(sana=sana, yangi_foydalanuvchilar=yangi[sana], faol_foydalanuvchilar=faol[sana])
+        for sana in yangi.keys() | faol.keys()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0010_fts_qidiruv'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KunlikStatistika',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sana', models.DateField(unique=True, verbose_name='Sana')),
+                ('sorovlar', models.IntegerField(default=0, verbose_name="So'rovlar")),
+                ('faol_foydalanuvchilar', models.IntegerField(default=0, verbose_name='Faol foydalanuvchilar')),
+                ('yangi_foydalanuvchilar', models.IntegerField(default=0, verbose_name='Yangi foydalanuvchilar')),
+                ('yangilangan', models.DateTimeField(auto_now=True, verbose_name='Yangilangan')),
+            ],
+            options={
+                'verbose_name': 'Kunlik statistika',
+                'verbose_name_plural': 'Kunlik statistika',
+                'ordering': ['-sana'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ObyektHolatXulosa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('holati', models.CharField(max_length=200, unique=True, verbose_name='Holati')),
+                ('soni', models.IntegerField(default=0, verbose_name='Soni')),
+                ('yangilangan', models.DateTimeField(auto_now=True, verbose_name='Yangilangan')),
+            ],
+            options={
+                'verbose_name': 'Obyekt holati xulosasi',
+                'verbose_name_plural': 'Obyekt holatlari xulosasi',
+                'ordering': ['-soni', 'holati'],
+            },
+        ),
+        migrations.AddField(
+            model_name='tumanxulosa',
+            name='tolangan_summa',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name="To'langan summa"),
+        ),
+        migrations.RunPython(xulosalarni_toldirish, migrations.RunPython.noop),
+    ]
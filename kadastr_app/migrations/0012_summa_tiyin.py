@@ -0,0 +1,107 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:15
+
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+_VALYUTA = re.compile(r"(so['‘’ʻ`]?m|сўм|сум|uzs)\.?$", re.IGNORECASE)
+
+
+def _ming_guruhlari(qism, ajratuvchi):
+    guruhlar = qism.split(ajratuvchi)
+    return (
+        1 <= len(guruhlar[0]) <= 3
+        and all(g.isdigit() for g in guruhlar)
+        and all(len(g) == 3 for g in guruhlar[1:])
+    )
+
+
+def _tiyinga(qiymat):
+    # kadastr_app.summa.tiyinga (matn uchun) bilan bir xil — migratsiya mustaqil bo'lishi uchun nusxa
+    matn = _VALYUTA.sub('', ''.join(str(qiymat or '').split())).replace("'", '').replace('’', '')
+    ishora = 1
+    if matn[:1] in ('+', '-'):
+        ishora = -1 if matn[0] == '-' else 1
+        matn = matn[1:]
+    if not re.fullmatch(r'[0-9.,]+', matn) or not any(c.isdigit() for c in matn):
+        return None
+    nuqta, vergul = matn.rfind('.'), matn.rfind(',')
+    if nuqta >= 0 and vergul >= 0:
+        kasr, ming = ('.', ',') if nuqta > vergul else (',', '.')
+        butun, _, qoldiq = matn.rpartition(kasr)
+        if not _ming_guruhlari(butun, ming) or not qoldiq.isdigit():
+            return None
+        matn = butun.replace(ming, '') + '.' + qoldiq
+    elif nuqta >= 0 or vergul >= 0:
+        ajratuvchi = '.' if nuqta >= 0 else ','
+        qismlar = matn.split(ajratuvchi)
+        if len(qismlar) > 2:
+            if not _ming_guruhlari(matn, ajratuvchi):
+                return None
+            matn = matn.replace(ajratuvchi, '')
+        elif len(qismlar[1]) == 3 and qismlar[0] not in ('', '0') and _ming_guruhlari(matn, ajratuvchi):
+            matn = matn.replace(ajratuvchi, '')
+        else:
+            # '1250000.005' — birinchi guruh uzun, demak kasr qismi
+            matn = '.'.join(qismlar)
+    try:
+        return ishora * int(Decimal(matn).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) * 100)
+    except InvalidOperation:
+        return None
+
+
+def summalarni_toldirish(apps, schema_editor):
+    ExcelUpload = apps.get_model('kadastr_app', 'ExcelUpload')
+    KadastrMalumat = apps.get_model('kadastr_app', 'KadastrMalumat')
+    TumanXulosa = apps.get_model('kadastr_app', 'TumanXulosa')
+
+    paket = []
+    for obj in KadastrMalumat.objects.only('id', 'summa_miqdori').iterator(chunk_size=5000):
+        obj.summa_tiyin = _tiyinga(obj.summa_miqdori)
+        if obj.summa_tiyin is not None:
+            paket.append(obj)
+        if len(paket) >= 5000:
+            KadastrMalumat.objects.bulk_update(paket, ['summa_tiyin'])
+            paket = []
+    if paket:
+        KadastrMalumat.objects.bulk_update(paket, ['summa_tiyin'])
+
+    # Tuman xulosasi summalari endi summa_tiyin ustunidan (kadastr_app.xulosa kabi)
+    tolanmagan = Q(tolov_holati__icontains="to'lanmagan")
+    tolangan = Q(tolov_holati__icontains="to'langan") & ~tolanmagan
+    qatorlar = (
+        KadastrMalumat.objects.filter(versiya__in=ExcelUpload.objects.exclude(faol_versiya=None).values('faol_versiya'))
+        .order_by().values('viloyat', 'tuman')
+        .annotate(tolanmagan=Sum('summa_tiyin', filter=tolanmagan), tolangan=Sum('summa_tiyin', filter=tolangan))
+    )
+    for q in qatorlar:
+        TumanXulosa.objects.filter(viloyat=q['viloyat'], tuman=q['tuman']).update(
+            tolanmagan_summa=Decimal(q['tolanmagan'] or 0) / 100, tolangan_summa=Decimal(q['tolangan'] or 0) / 100,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0011_boshqaruv_paneli'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='summa_xatolari',
+            field=models.IntegerField(default=0, verbose_name="O'qilmagan summalar"),
+        ),
+        migrations.AddField(
+            model_name='kadastrmalumat',
+            name='summa_tiyin',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Summa (tiyin)'),
+        ),
+        migrations.AddIndex(
+            model_name='kadastrmalumat',
+            index=models.Index(fields=['tuman', 'mfy', 'tolov_holati', 'versiya', 'summa_tiyin'], name='kadastr_tuman_mfy_summa_idx'),
+        ),
+        migrations.RunPython(summalarni_toldirish, migrations.RunPython.noop),
+    ]
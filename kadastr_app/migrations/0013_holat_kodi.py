@@ -0,0 +1,64 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+# kadastr_app.holat.STANDART_QOIDALAR bilan bir xil (migratsiya mustaqil bo'lishi uchun nusxa)
+_QOIDALAR = {
+    'KadastrMalumat': ('tolov_holati', [(1, ["to'lanmagan"]), (2, ["to'langan"])]),
+    'ObyektMalumat': ('holati', [(1, ['muhokama']), (2, ['rad', 'bekor']), (3, ['tasdiqlangan', 'qabul'])]),
+}
+_APOSTROFLAR = str.maketrans({c: "'" for c in '‘’ʻʼ`´'})
+
+
+def _kod(matn, qoidalar):
+    matn = str(matn or '').translate(_APOSTROFLAR).lower()
+    for kod, sozlar in qoidalar:
+        if any(s in matn for s in sozlar):
+            return kod
+    return 0
+
+
+def kodlarni_toldirish(apps, schema_editor):
+    for model_nomi, (maydon, qoidalar) in _QOIDALAR.items():
+        Model = apps.get_model('kadastr_app', model_nomi)
+        for matn in Model.objects.order_by().values_list(maydon, flat=True).distinct():
+            kod = _kod(matn, qoidalar)
+            if kod:
+                Model.objects.filter(**{maydon: matn}).update(holat_kodi=kod)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0012_summa_tiyin'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='kadastrmalumat',
+            name='kadastr_tuman_fio_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='kadastrmalumat',
+            name='kadastr_tuman_mfy_summa_idx',
+        ),
+        migrations.AddField(
+            model_name='kadastrmalumat',
+            name='holat_kodi',
+            field=models.PositiveSmallIntegerField(choices=[(0, "Noma'lum"), (1, "To'lanmagan"), (2, "To'langan")], default=0, editable=False, verbose_name='Holat kodi'),
+        ),
+        migrations.AddField(
+            model_name='obyektmalumat',
+            name='holat_kodi',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Boshqa'), (1, 'Muhokamada'), (2, 'Rad etilgan'), (3, 'Tasdiqlangan')], db_index=True, default=0, editable=False, verbose_name='Holat kodi'),
+        ),
+        migrations.RunPython(kodlarni_toldirish, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='kadastrmalumat',
+            index=models.Index(fields=['tuman', 'holat_kodi', 'tolovchi_fio', 'id'], name='kadastr_tuman_holat_fio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kadastrmalumat',
+            index=models.Index(fields=['tuman', 'holat_kodi', 'mfy', 'versiya', 'summa_tiyin'], name='kadastr_tuman_holat_summa_idx'),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# Lug'at modeli -> uning nomlari olinadigan (model, maydon) juftlari
+_MAYDONLAR = {
+    'Viloyat': [('KadastrMalumat', 'viloyat'), ('ObyektMalumat', 'viloyat')],
+    'Tuman': [('KadastrMalumat', 'tuman'), ('ObyektMalumat', 'tuman')],
+    'Mfy': [('KadastrMalumat', 'mfy'), ('ObyektMalumat', 'mfy')],
+    'Kocha': [('KadastrMalumat', 'kocha')],
+}
+
+
+def nomlarni_kochirish(apps, schema_editor):
+    """Eski matn ustunlaridagi nomlar lug'atga qo'shiladi va FK ustunlari to'ldiriladi"""
+    for lugat_nomi, manbalar in _MAYDONLAR.items():
+        Lugat = apps.get_model('kadastr_app', lugat_nomi)
+        nomlar = set()
+        for model_nomi, maydon in manbalar:
+            Model = apps.get_model('kadastr_app', model_nomi)
+            nomlar.update(Model.objects.order_by().values_list(f'{maydon}_nomi', flat=True).distinct())
+        Lugat.objects.bulk_create([Lugat(nomi=n) for n in nomlar], batch_size=5000, ignore_conflicts=True)
+        for model_nomi, maydon in manbalar:
+            Model = apps.get_model('kadastr_app', model_nomi)
+            Model.objects.update(**{
+                maydon: Subquery(Lugat.objects.filter(nomi=OuterRef(f'{maydon}_nomi')).values('id')[:1])
+            })
+
+
+def _lugat(nomi, verbose_name, verbose_name_plural):
+    return migrations.CreateModel(
+        name=nomi,
+        fields=[
+            ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ('nomi', models.CharField(max_length=200, unique=True, verbose_name='Nomi')),
+        ],
+        options={
+            'verbose_name': verbose_name,
+            'verbose_name_plural': verbose_name_plural,
+            'ordering': ['nomi'],
+            'abstract': False,
+        },
+    )
+
+
+def _fk(lugat, verbose_name, null=False):
+    return models.ForeignKey(
+        db_index=False, null=null, on_delete=django.db.models.deletion.PROTECT, related_name='+',
+        to=f'kadastr_app.{lugat}', verbose_name=verbose_name,
+    )
+
+
+# (model, maydon, lug'at, verbose_name)
+_FK_MAYDONLAR = [
+    ('kadastrmalumat', 'viloyat', 'viloyat', 'Viloyat'),
+    ('kadastrmalumat', 'tuman', 'tuman', 'Tuman'),
+    ('kadastrmalumat', 'mfy', 'mfy', 'Mahalla nomi'),
+    ('kadastrmalumat', 'kocha', 'kocha', "Ko'cha nomi"),
+    ('obyektmalumat', 'viloyat', 'viloyat', 'Viloyat nomi'),
+    ('obyektmalumat', 'tuman', 'tuman', 'Tuman nomi'),
+    ('obyektmalumat', 'mfy', 'mfy', 'MFY'),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0013_holat_kodi'),
+    ]
+
+    operations = [
+        _lugat('Viloyat', 'Viloyat', 'Viloyatlar'),
+        _lugat('Tuman', 'Tuman', 'Tumanlar'),
+        _lugat('Mfy', 'MFY', 'MFYlar'),
+        _lugat('Kocha', "Ko'cha", "Ko'chalar"),
+        migrations.RemoveIndex(
+            model_name='kadastrmalumat',
+            name='kadastr_tuman_holat_fio_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='kadastrmalumat',
+            name='kadastr_tuman_holat_summa_idx',
+        ),
+        *[
+            migrations.RenameField(model_name=model, old_name=maydon, new_name=f'{maydon}_nomi')
+            for model, maydon, _, _ in _FK_MAYDONLAR
+        ],
+        *[
+            migrations.AddField(model_name=model, name=maydon, field=_fk(lugat, verbose_name, null=True))
+            for model, maydon, lugat, verbose_name in _FK_MAYDONLAR
+        ],
+        migrations.RunPython(nomlarni_kochirish, migrations.RunPython.noop),
+        *[
+            migrations.RemoveField(model_name=model, name=f'{maydon}_nomi')
+            for model, maydon, _, _ in _FK_MAYDONLAR
+        ],
+        *[
+            migrations.AlterField(model_name=model, name=maydon, field=_fk(lugat, verbose_name))
+            for model, maydon, lugat, verbose_name in _FK_MAYDONLAR
+        ],
+        migrations.AddIndex(
+            model_name='kadastrmalumat',
+            index=models.Index(fields=['tuman', 'holat_kodi', 'tolovchi_fio', 'id'], name='kadastr_tuman_holat_fio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kadastrmalumat',
+            index=models.Index(fields=['tuman', 'holat_kodi', 'mfy', 'versiya', 'summa_tiyin'], name='kadastr_tuman_holat_summa_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0014_hudud_nomlari'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='varaqlar',
+            field=models.JSONField(blank=True, default=list, verbose_name='Varaqlar'),
+        ),
+    ]
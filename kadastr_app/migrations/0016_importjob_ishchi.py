@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0015_importjob_varaqlar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='ishchi',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Ishchi'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:40
+
+from decimal import Decimal
+from importlib import import_module
+
+from django.db import migrations
+from django.db.models import Q, Sum
+
+# 0012 dagi tuzatilgan nusxa: '1250000.005' endi ming guruhi deb o'qilmaydi
+_tiyinga = import_module('kadastr_app.migrations.0012_summa_tiyin')._tiyinga
+
+_TOLANMAGAN = 1
+_TOLANGAN = 2
+
+
+def summalarni_tuzatish(apps, schema_editor):
+    ExcelUpload = apps.get_model('kadastr_app', 'ExcelUpload')
+    KadastrMalumat = apps.get_model('kadastr_app', 'KadastrMalumat')
+    TumanXulosa = apps.get_model('kadastr_app', 'TumanXulosa')
+
+    # Faqat uzun birinchi guruhdan keyin bitta ajratuvchi va 3 raqam kelgan summalar noto'g'ri o'qilgan
+    paket = []
+    tumanlar = set()
+    nomzodlar = KadastrMalumat.objects.filter(summa_miqdori__regex=r'[0-9]{4}[.,][0-9]{3}')
+    for obj in nomzodlar.only('id', 'summa_miqdori', 'summa_tiyin', 'tuman_id').iterator(chunk_size=5000):
+        tiyin = _tiyinga(obj.summa_miqdori)
+        if tiyin != obj.summa_tiyin:
+            obj.summa_tiyin = tiyin
+            paket.append(obj)
+            tumanlar.add(obj.tuman_id)
+    for i in range(0, len(paket), 5000):
+        KadastrMalumat.objects.bulk_update(paket[i:i + 5000], ['summa_tiyin'])
+
+    # Ta'sirlangan tumanlar xulosasi (kadastr_app.xulosa kabi)
+    tolanmagan, tolangan = Q(holat_kodi=_TOLANMAGAN), Q(holat_kodi=_TOLANGAN)
+    qatorlar = (
+        KadastrMalumat.objects.filter(
+            tuman_id__in=tumanlar,
+            versiya__in=ExcelUpload.objects.exclude(faol_versiya=None).values('faol_versiya'),
+        )
+        .order_by().values('viloyat__nomi', 'tuman__nomi')
+        .annotate(tolanmagan=Sum('summa_tiyin', filter=tolanmagan), tolangan=Sum('summa_tiyin', filter=tolangan))
+    )
+    for q in qatorlar:
+        TumanXulosa.objects.filter(viloyat=q['viloyat__nomi'], tuman=q['tuman__nomi']).update(
+            tolanmagan_summa=Decimal(q['tolanmagan'] or 0) / 100, tolangan_summa=Decimal(q['tolangan'] or 0) / 100,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0016_importjob_ishchi'),
+    ]
+
+    operations = [
+        migrations.RunPython(summalarni_tuzatish, migrations.RunPython.noop),
+    ]
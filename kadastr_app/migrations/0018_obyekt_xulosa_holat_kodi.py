@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def xulosani_tozalash(apps, schema_editor):
+    # Matn bo'yicha xulosa qatorlari kod ustuniga ko'chirilmaydi — qayta hisoblanadi
+    apps.get_model('kadastr_app', 'ObyektHolatXulosa').objects.all().delete()
+
+
+def xulosani_hisoblash(apps, schema_editor):
+    ObyektExcelUpload = apps.get_model('kadastr_app', 'ObyektExcelUpload')
+    ObyektMalumat = apps.get_model('kadastr_app', 'ObyektMalumat')
+    ObyektHolatXulosa = apps.get_model('kadastr_app', 'ObyektHolatXulosa')
+
+    qatorlar = (
+        ObyektMalumat.objects.filter(
+            versiya__in=ObyektExcelUpload.objects.exclude(faol_versiya=None).values('faol_versiya')
+        )
+        .order_by().values('holat_kodi').annotate(soni=Count('id'))
+    )
+    ObyektHolatXulosa.objects.bulk_create(
+        [ObyektHolatXulosa(holat_kodi=q['holat_kodi'], soni=q['soni']) for q in qatorlar]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0017_summa_tuzatish'),
+    ]
+
+    operations = [
+        migrations.RunPython(xulosani_tozalash, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='obyektholatxulosa',
+            options={
+                'ordering': ['-soni', 'holat_kodi'],
+                'verbose_name': 'Obyekt holati xulosasi',
+                'verbose_name_plural': 'Obyekt holatlari xulosasi',
+            },
+        ),
+        migrations.RemoveField(
+            model_name='obyektholatxulosa',
+            name='holati',
+        ),
+        migrations.AddField(
+            model_name='obyektholatxulosa',
+            name='holat_kodi',
+            field=models.PositiveSmallIntegerField(
+                choices=[(0, 'Boshqa'), (1, 'Muhokamada'), (2, 'Rad etilgan'), (3, 'Tasdiqlangan')],
+                default=0, unique=True, verbose_name='Holati',
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(xulosani_hisoblash, xulosani_tozalash),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 6.0.2 on 2026-10-18 21:10
+
+import logging
+
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+# asosiy jadval -> [(FTS ustuni, nomi olinadigan lug'at jadvali yoki None)]
+FTS_JADVALLARI = {
+    'kadastr_app_kadastrmalumat': [
+        ('kadastr_kalit', None), ('kadastr_raqami', None), ('tolovchi_fio', None), ('invoys_raqami', None),
+        ('mfy', 'kadastr_app_mfy'), ('kocha', 'kadastr_app_kocha'),
+    ],
+    'kadastr_app_obyektmalumat': [
+        ('kadastr_kalit', None), ('kadastr_raqami', None), ('mfy', 'kadastr_app_mfy'),
+    ],
+}
+
+
+def _qiymat(qator, ustun, lugat):
+    if lugat is None:
+        return f'{qator}.{ustun}'
+    return f'(SELECT nomi FROM {lugat} WHERE id = {qator}.{ustun}_id)'
+
+
+def _triggerlar(jadval, ustunlar):
+    fts = f'{jadval}_fts'
+    nomlar = ', '.join(u for u, _ in ustunlar)
+    qiymatlar = ', '.join(_qiymat('NEW', u, l) for u, l in ustunlar)
+    yozish = f'INSERT INTO {fts} (rowid, {nomlar}) VALUES (NEW.id, {qiymatlar});'
+    ochirish = f'DELETE FROM {fts} WHERE rowid = OLD.id;'
+    kuzatiladi = ', '.join(u if l is None else f'{u}_id' for u, l in ustunlar)
+    sqllar = {
+        f'{fts}_ai': f'AFTER INSERT ON {jadval} BEGIN {yozish} END',
+        f'{fts}_au': f'AFTER UPDATE OF {kuzatiladi} ON {jadval} BEGIN {ochirish} {yozish} END',
+        f'{fts}_ad': f'AFTER DELETE ON {jadval} BEGIN {ochirish} END',
+    }
+    # Lug'atdagi nom o'zgarsa (admin) unga bog'langan yozuvlar ham yangilanadi
+    for ustun, lugat in ustunlar:
+        if lugat is not None:
+            sqllar[f'{fts}_{ustun}_au'] = (
+                f'AFTER UPDATE OF nomi ON {lugat} BEGIN UPDATE {fts} SET {ustun} = NEW.nomi '
+                f'WHERE rowid IN (SELECT id FROM {jadval} WHERE {ustun}_id = NEW.id); END'
+            )
+    return sqllar
+
+
+def triggerlar_yaratish(apps, schema_editor):
+    """
+    FTS jadvallarini asosiy jadvallar bilan SQLite triggerlari orqali sinxron
+    saqlaydi va ularni bir marta qayta to'ldiradi. FTS jadvali yo'q bo'lsa
+    (FTS5/trigram'siz SQLite) trigger ham yaratilmaydi — qidiruv icontains bilan.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for jadval, ustunlar in FTS_JADVALLARI.items():
+            fts = f'{jadval}_fts'
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [fts])
+            if cursor.fetchone() is None:
+                logger.warning("%s jadvali yo'q — FTS triggerlari yaratilmadi, qidiruv icontains bilan", fts)
+                continue
+            cursor.execute(f'DELETE FROM {fts}')
+            cursor.execute(
+                f"INSERT INTO {fts} (rowid, {', '.join(u for u, _ in ustunlar)}) "
+                f"SELECT id, {', '.join(_qiymat(jadval, u, l) for u, l in ustunlar)} FROM {jadval}"
+            )
+            for nom, sql in _triggerlar(jadval, ustunlar).items():
+                cursor.execute(f'CREATE TRIGGER {nom} {sql}')
+
+
+def triggerlar_ochirish(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for jadval, ustunlar in FTS_JADVALLARI.items():
+            for nom in _triggerlar(jadval, ustunlar):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {nom}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0018_obyekt_xulosa_holat_kodi'),
+    ]
+
+    operations = [
+        migrations.RunPython(triggerlar_yaratish, triggerlar_ochirish),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-18 21:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0019_fts_triggerlar'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='botfoydalanuvchi',
+            name='oxirgi_murojaat',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Oxirgi murojaat'),
+        ),
+    ]
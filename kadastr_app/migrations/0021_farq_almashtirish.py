@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-18 22:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kadastr_app', '0020_botfoydalanuvchi_oxirgi_murojaat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='excelupload',
+            name='almashtiriladi',
+            field=models.ForeignKey(blank=True, help_text="Farq bo'yicha: yangi kunlik fayl shu faylning faol qatorlari bilan solishtiriladi, qatorlar yangi faylga ko'chadi va eski fayl faol bo'lmay qoladi", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='kadastr_app.excelupload', verbose_name='Almashtiriladigan fayl'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='takroriy_kalitlar',
+            field=models.IntegerField(default=0, verbose_name='Takroriy kalitlar'),
+        ),
+        migrations.AddField(
+            model_name='obyektexcelupload',
+            name='almashtiriladi',
+            field=models.ForeignKey(blank=True, help_text="Farq bo'yicha: yangi kunlik fayl shu faylning faol qatorlari bilan solishtiriladi, qatorlar yangi faylga ko'chadi va eski fayl faol bo'lmay qoladi", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='kadastr_app.obyektexcelupload', verbose_name='Almashtiriladigan fayl'),
+        ),
+        migrations.AlterField(
+            model_name='excelupload',
+            name='import_rejimi',
+            field=models.CharField(choices=[('toliq', "To'liq (faylning yangi versiyasi)"), ('farq', "Farq bo'yicha (kadastr raqami bo'yicha yangilash)")], default='toliq', help_text='Farq bo\'yicha: faqat yangi, o\'zgargan va faylda yo\'q qatorlar yoziladi/o\'chiriladi. Fayl shu yozuvning oldingi fayli bilan (faylni almashtirib qayta saqlanganda) yoki "Almashtiriladigan fayl" bilan solishtiriladi', max_length=10, verbose_name='Import rejimi'),
+        ),
+        migrations.AlterField(
+            model_name='obyektexcelupload',
+            name='import_rejimi',
+            field=models.CharField(choices=[('toliq', "To'liq (faylning yangi versiyasi)"), ('farq', "Farq bo'yicha (kadastr raqami bo'yicha yangilash)")], default='toliq', help_text='Farq bo\'yicha: faqat yangi, o\'zgargan va faylda yo\'q qatorlar yoziladi/o\'chiriladi. Fayl shu yozuvning oldingi fayli bilan (faylni almashtirib qayta saqlanganda) yoki "Almashtiriladigan fayl" bilan solishtiriladi', max_length=10, verbose_name='Import rejimi'),
+        ),
+    ]
@@ -1,4 +1,139 @@
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from . import qidiruv
+from .holat import ObyektHolati, TolovHolati, obyekt_kodi, tolov_kodi
+from .kalit import kadastr_kalit, mazmun_hash
+from .summa import tiyinga
+
+# Upload import rejimlari
+IMPORT_TOLIQ = 'toliq'
+IMPORT_FARQ = 'farq'
+IMPORT_REJIM_TANLOVLARI = [
+    (IMPORT_TOLIQ, "To'liq (faylning yangi versiyasi)"),
+    (IMPORT_FARQ, "Farq bo'yicha (kadastr raqami bo'yicha yangilash)"),
+]
+
+# Prefiks oralig'ining yuqori chegarasi uchun belgi
+_OXIRGI_BELGI = '\U0010ffff'
+
+
+class KadastrQuerySet(models.QuerySet):
+    """kadastr_kalit ustuni bo'yicha indeksli qidiruv va faol versiya filtri"""
+
+    def faol(self):
+        """
+        Faqat faol versiyadagi yozuvlar. Import yangi versiyani alohida
+        yozadi va tayyor bo'lgach upload.faol_versiya bir UPDATE bilan
+        almashtiriladi — shu paytgacha yangi qatorlar botga ko'rinmaydi.
+        """
+        upload_model = self.model._meta.get_field('excel_fayl').related_model
+        faol_versiyalar = upload_model.objects.exclude(faol_versiya=None).values('faol_versiya')
+        return self.filter(versiya__in=faol_versiyalar)
+
+    def kalit_boyicha(self, matn):
+        """
+        Aniq moslik bo'lsa faqat uni, aks holda prefiks bo'yicha mos
+        yozuvlarni qaytaradi. Ikkalasi ham B-tree indeks orqali bajariladi
+        (LIKE '%x%' emas, tenglik va oraliq so'rovlari).
+        """
+        kalit = kadastr_kalit(matn)
+        if not kalit:
+            return self.none()
+        aniq = self.filter(kadastr_kalit=kalit)
+        if aniq.exists():
+            return aniq
+        return self.filter(kadastr_kalit__gte=kalit, kadastr_kalit__lt=kalit + _OXIRGI_BELGI)
+
+    def matn_boyicha(self, matn, maydonlar=None):
+        """
+        `matn` ko'rsatilgan maydonlardan birortasida qism-satr sifatida
+        uchraydigan yozuvlar (icontains semantikasi). FTS5 trigram jadvali
+        bo'lsa u orqali, aks holda (yoki matn juda qisqa bo'lsa) icontains bilan.
+        """
+        maydonlar = maydonlar or self.model.MATN_MAYDONLARI
+        matn = (matn or '').strip()
+        if not matn:
+            return self
+        if len(matn) >= qidiruv.TRIGRAM_MIN and qidiruv.fts_yoqilgan(self.model, self.db):
+            return self.filter(id__in=qidiruv.fts_sorovi(self.model, matn, maydonlar))
+        shart = Q()
+        for maydon in maydonlar:
+            if self.model._meta.get_field(maydon).is_relation:
+                maydon = f'{maydon}__nomi'
+            shart |= Q(**{f'{maydon}__icontains': matn})
+        return self.filter(shart)
+
+
+class TolovQuerySet(KadastrQuerySet):
+    """To'lov yozuvlari: summalar bazada (summa_tiyin ustuni) yig'iladi"""
+
+    def tolanmaganlar(self):
+        return self.filter(holat_kodi=TolovHolati.TOLANMAGAN)
+
+    def tolanmagan_summalari(self, *guruh):
+        """
+        `guruh` maydonlari (masalan, 'tuman' yoki 'tuman', 'mfy') bo'yicha
+        to'lanmagan qatorlar soni va summasi (tiyin) — bitta GROUP BY/SUM so'rovi.
+        """
+        return (
+            self.tolanmaganlar().order_by().values(*guruh)
+            .annotate(soni=Count('id'), summa_tiyin=Sum('summa_tiyin'))
+            .order_by(*guruh)
+        )
+
+    def tolanmagan_jami(self):
+        """{'soni': .., 'summa_tiyin': ..} — butun queryset bo'yicha"""
+        jami = self.tolanmaganlar().aggregate(soni=Count('id'), summa_tiyin=Sum('summa_tiyin'))
+        jami['summa_tiyin'] = jami['summa_tiyin'] or 0
+        return jami
+
+
+# ─── Hudud nomlari lug'ati (kadastr_app.nomlar) ───────────────────────────────
+
+class _Nom(models.Model):
+    """Takrorlanuvchi nom bir marta saqlanadi; ma'lumot jadvallari unga FK bilan bog'lanadi"""
+    nomi = models.CharField(max_length=200, unique=True, verbose_name="Nomi")
+
+    class Meta:
+        abstract = True
+        ordering = ['nomi']
+
+    def __str__(self):
+        return self.nomi
+
+
+class Viloyat(_Nom):
+    class Meta(_Nom.Meta):
+        verbose_name = "Viloyat"
+        verbose_name_plural = "Viloyatlar"
+
+
+class Tuman(_Nom):
+    class Meta(_Nom.Meta):
+        verbose_name = "Tuman"
+        verbose_name_plural = "Tumanlar"
+
+
+class Mfy(_Nom):
+    class Meta(_Nom.Meta):
+        verbose_name = "MFY"
+        verbose_name_plural = "MFYlar"
+
+
+class Kocha(_Nom):
+    class Meta(_Nom.Meta):
+        verbose_name = "Ko'cha"
+        verbose_name_plural = "Ko'chalar"
+
+
+def _nom_maydoni(model, verbose_name):
+    # Alohida indeks shart emas: tuman/mfy qidiruvlari kompozit indekslardan o'tadi
+    return models.ForeignKey(
+        model, on_delete=models.PROTECT, related_name='+', db_index=False, verbose_name=verbose_name
+    )
 
 
 class ExcelUpload(models.Model):
@@ -7,6 +142,19 @@ class ExcelUpload(models.Model):
     yuklangan_vaqt = models.DateTimeField(auto_now_add=True, verbose_name="Yuklangan vaqt")
     yozuvlar_soni = models.IntegerField(default=0, verbose_name="Yozuvlar soni")
     izoh = models.CharField(max_length=255, blank=True, verbose_name="Izoh")
+    import_rejimi = models.CharField(
+        max_length=10, choices=IMPORT_REJIM_TANLOVLARI, default=IMPORT_TOLIQ, verbose_name="Import rejimi",
+        help_text="Farq bo'yicha: faqat yangi, o'zgargan va faylda yo'q qatorlar yoziladi/o'chiriladi. "
+                  "Fayl shu yozuvning oldingi fayli bilan (faylni almashtirib qayta saqlanganda) yoki "
+                  "\"Almashtiriladigan fayl\" bilan solishtiriladi"
+    )
+    almashtiriladi = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        verbose_name="Almashtiriladigan fayl",
+        help_text="Farq bo'yicha: yangi kunlik fayl shu faylning faol qatorlari bilan solishtiriladi, "
+                  "qatorlar yangi faylga ko'chadi va eski fayl faol bo'lmay qoladi"
+    )
+    faol_versiya = models.PositiveBigIntegerField(null=True, blank=True, editable=False, verbose_name="Faol versiya")
 
     class Meta:
         verbose_name = "Excel fayl (To'lov)"
@@ -16,6 +164,10 @@ class ExcelUpload(models.Model):
     def __str__(self):
         return f"{self.fayl.name} ({self.yuklangan_vaqt.strftime('%d.%m.%Y %H:%M')})"
 
+    def clean(self):
+        if self.almashtiriladi_id and self.almashtiriladi_id == self.pk:
+            raise ValidationError({'almashtiriladi': "Fayl o'zini almashtira olmaydi"})
+
 
 class KadastrMalumat(models.Model):
     """Kadastr to'lov ma'lumotlari"""
@@ -23,23 +175,70 @@ class KadastrMalumat(models.Model):
         ExcelUpload, on_delete=models.CASCADE,
         related_name='malumatlar', verbose_name="Manba fayl"
     )
-    viloyat = models.CharField(max_length=200, verbose_name="Viloyat")
-    tuman = models.CharField(max_length=200, verbose_name="Tuman")
-    mfy = models.CharField(max_length=200, verbose_name="Mahalla nomi")
-    kocha = models.CharField(max_length=200, verbose_name="Ko'cha nomi")
+    versiya = models.PositiveBigIntegerField(default=0, db_index=True, editable=False, verbose_name="Versiya")
+    viloyat = _nom_maydoni(Viloyat, "Viloyat")
+    tuman = _nom_maydoni(Tuman, "Tuman")
+    mfy = _nom_maydoni(Mfy, "Mahalla nomi")
+    kocha = _nom_maydoni(Kocha, "Ko'cha nomi")
     kadastr_raqami = models.CharField(max_length=200, verbose_name="Kadastr raqami", db_index=True)
+    kadastr_kalit = models.CharField(
+        max_length=200, verbose_name="Kadastr kaliti", db_index=True, blank=True, editable=False
+    )
+    mazmun_hash = models.CharField(max_length=32, blank=True, editable=False, verbose_name="Mazmun xeshi")
     invoys_raqami = models.CharField(max_length=200, verbose_name="Invoys raqami", blank=True)
     summa_miqdori = models.CharField(max_length=200, verbose_name="To'lov miqdori", blank=True)
+    # summa_miqdori'ning son qiymati (tiyin); bo'sh yoki o'qib bo'lmasa NULL
+    summa_tiyin = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="Summa (tiyin)")
     tolovchi_fio = models.CharField(max_length=300, verbose_name="To'lovchi F.I.O", blank=True)
     tolov_holati = models.CharField(max_length=100, verbose_name="To'lov holati", blank=True)
+    # tolov_holati matnining tasnifi (kadastr_app.holat qoidalari bo'yicha)
+    holat_kodi = models.PositiveSmallIntegerField(
+        choices=TolovHolati.choices, default=TolovHolati.NOMALUM, editable=False, verbose_name="Holat kodi"
+    )
+
+    objects = TolovQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Kadastr to'lov ma'lumot"
         verbose_name_plural = "Kadastr to'lov ma'lumotlar"
+        indexes = [
+            # Botdagi tumanning to'lanmaganlar sahifalari (keyset pagination) uchun
+            models.Index(fields=['tuman', 'holat_kodi', 'tolovchi_fio', 'id'], name='kadastr_tuman_holat_fio_idx'),
+            # Tuman/MFY bo'yicha summalar faqat indeksdan o'qiladi (jadvalga murojaatsiz)
+            models.Index(
+                fields=['tuman', 'holat_kodi', 'mfy', 'versiya', 'summa_tiyin'], name='kadastr_tuman_holat_summa_idx'
+            ),
+        ]
+
+    # Farq bo'yicha importda solishtiriladigan (xeshga kiradigan) maydonlar
+    MAZMUN_MAYDONLARI = (
+        'viloyat', 'tuman', 'mfy', 'kocha', 'kadastr_raqami',
+        'invoys_raqami', 'summa_miqdori', 'tolovchi_fio', 'tolov_holati',
+    )
+    # FTS (qism-satr) qidiruv jadvalidagi maydonlar (0019 migratsiyasidagi triggerlar bilan bir xil)
+    MATN_MAYDONLARI = ('kadastr_kalit', 'kadastr_raqami', 'tolovchi_fio', 'invoys_raqami', 'mfy', 'kocha')
+    # kalitlarni_hisoblash() to'ldiradigan maydonlar
+    HISOBLANGAN_MAYDONLAR = ('kadastr_kalit', 'mazmun_hash', 'summa_tiyin', 'holat_kodi')
 
     def __str__(self):
         return f"{self.kadastr_raqami} - {self.tolovchi_fio}"
 
+    def kalitlarni_hisoblash(self):
+        """kadastr_kalit, mazmun_hash, summa_tiyin va holat_kodi ustunlarini qayta hisoblaydi"""
+        self.kadastr_kalit = kadastr_kalit(self.kadastr_raqami)
+        self.mazmun_hash = mazmun_hash(getattr(self, m) for m in self.MAZMUN_MAYDONLARI)
+        self.summa_tiyin = tiyinga(self.summa_miqdori)
+        self.holat_kodi = tolov_kodi(self.tolov_holati)
+
+    @property
+    def summa_xatosi(self):
+        """summa_miqdori bo'sh emas, lekin son sifatida o'qilmadi"""
+        return self.summa_tiyin is None and bool(self.summa_miqdori.strip(' -—–'))
+
+    def save(self, *args, **kwargs):
+        self.kalitlarni_hisoblash()
+        super().save(*args, **kwargs)
+
 
 # ─── Obyekt holati uchun alohida model ────────────────────────────────────────
 
@@ -49,6 +248,19 @@ class ObyektExcelUpload(models.Model):
     yuklangan_vaqt = models.DateTimeField(auto_now_add=True, verbose_name="Yuklangan vaqt")
     yozuvlar_soni = models.IntegerField(default=0, verbose_name="Yozuvlar soni")
     izoh = models.CharField(max_length=255, blank=True, verbose_name="Izoh")
+    import_rejimi = models.CharField(
+        max_length=10, choices=IMPORT_REJIM_TANLOVLARI, default=IMPORT_TOLIQ, verbose_name="Import rejimi",
+        help_text="Farq bo'yicha: faqat yangi, o'zgargan va faylda yo'q qatorlar yoziladi/o'chiriladi. "
+                  "Fayl shu yozuvning oldingi fayli bilan (faylni almashtirib qayta saqlanganda) yoki "
+                  "\"Almashtiriladigan fayl\" bilan solishtiriladi"
+    )
+    almashtiriladi = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+        verbose_name="Almashtiriladigan fayl",
+        help_text="Farq bo'yicha: yangi kunlik fayl shu faylning faol qatorlari bilan solishtiriladi, "
+                  "qatorlar yangi faylga ko'chadi va eski fayl faol bo'lmay qoladi"
+    )
+    faol_versiya = models.PositiveBigIntegerField(null=True, blank=True, editable=False, verbose_name="Faol versiya")
 
     class Meta:
         verbose_name = "Excel fayl (Obyekt holati)"
@@ -58,6 +270,10 @@ class ObyektExcelUpload(models.Model):
     def __str__(self):
         return f"{self.fayl.name} ({self.yuklangan_vaqt.strftime('%d.%m.%Y %H:%M')})"
 
+    def clean(self):
+        if self.almashtiriladi_id and self.almashtiriladi_id == self.pk:
+            raise ValidationError({'almashtiriladi': "Fayl o'zini almashtira olmaydi"})
+
 
 class ObyektMalumat(models.Model):
     """Obyekt holati ma'lumotlari"""
@@ -65,19 +281,44 @@ class ObyektMalumat(models.Model):
         ObyektExcelUpload, on_delete=models.CASCADE,
         related_name='malumatlar', verbose_name="Manba fayl"
     )
+    versiya = models.PositiveBigIntegerField(default=0, db_index=True, editable=False, verbose_name="Versiya")
     kadastr_raqami = models.CharField(max_length=200, verbose_name="Kadastr raqami", db_index=True)
-    viloyat = models.CharField(max_length=200, verbose_name="Viloyat nomi", blank=True)
-    tuman = models.CharField(max_length=200, verbose_name="Tuman nomi", blank=True)
-    mfy = models.CharField(max_length=200, verbose_name="MFY", blank=True)
+    kadastr_kalit = models.CharField(
+        max_length=200, verbose_name="Kadastr kaliti", db_index=True, blank=True, editable=False
+    )
+    mazmun_hash = models.CharField(max_length=32, blank=True, editable=False, verbose_name="Mazmun xeshi")
+    viloyat = _nom_maydoni(Viloyat, "Viloyat nomi")
+    tuman = _nom_maydoni(Tuman, "Tuman nomi")
+    mfy = _nom_maydoni(Mfy, "MFY")
     holati = models.CharField(max_length=200, verbose_name="Holati", blank=True)
+    holat_kodi = models.PositiveSmallIntegerField(
+        choices=ObyektHolati.choices, default=ObyektHolati.BOSHQA, db_index=True, editable=False,
+        verbose_name="Holat kodi"
+    )
+
+    objects = KadastrQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Obyekt holati"
         verbose_name_plural = "Obyekt holatlari"
 
+    MAZMUN_MAYDONLARI = ('kadastr_raqami', 'viloyat', 'tuman', 'mfy', 'holati')
+    MATN_MAYDONLARI = ('kadastr_kalit', 'kadastr_raqami', 'mfy')
+    HISOBLANGAN_MAYDONLAR = ('kadastr_kalit', 'mazmun_hash', 'holat_kodi')
+
     def __str__(self):
         return f"{self.kadastr_raqami} - {self.holati}"
 
+    def kalitlarni_hisoblash(self):
+        """kadastr_kalit, mazmun_hash va holat_kodi ustunlarini qayta hisoblaydi"""
+        self.kadastr_kalit = kadastr_kalit(self.kadastr_raqami)
+        self.mazmun_hash = mazmun_hash(getattr(self, m) for m in self.MAZMUN_MAYDONLARI)
+        self.holat_kodi = obyekt_kodi(self.holati)
+
+    def save(self, *args, **kwargs):
+        self.kalitlarni_hisoblash()
+        super().save(*args, **kwargs)
+
 
 class BotFoydalanuvchi(models.Model):
     """Telegram bot foydalanuvchilari statistikasi"""
@@ -86,7 +327,8 @@ class BotFoydalanuvchi(models.Model):
     username = models.CharField(max_length=100, blank=True, verbose_name="Username")
     so_rovlar_soni = models.IntegerField(default=0, verbose_name="So'rovlar soni")
     birinchi_murojaat = models.DateTimeField(auto_now_add=True, verbose_name="Birinchi murojaat")
-    oxirgi_murojaat = models.DateTimeField(auto_now=True, verbose_name="Oxirgi murojaat")
+    # auto_now emas: statistika xotiradan yozilganda haqiqiy murojaat vaqti saqlanadi
+    oxirgi_murojaat = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Oxirgi murojaat")
 
     class Meta:
         verbose_name = "Bot foydalanuvchi"
@@ -94,4 +336,131 @@ class BotFoydalanuvchi(models.Model):
         ordering = ['-oxirgi_murojaat']
 
     def __str__(self):
-        return f"{self.ism} ({self.telegram_id})"
\ No newline at end of file
+        return f"{self.ism} ({self.telegram_id})"
+
+class ImportJob(models.Model):
+    """Excel import vazifasi — admin navbatga qo'yadi, ishchi fon rejimida bajaradi"""
+    TUR_TOLOV = 'tolov'
+    TUR_OBYEKT = 'obyekt'
+    TUR_TANLOVLARI = [
+        (TUR_TOLOV, "To'lov ma'lumotlari"),
+        (TUR_OBYEKT, "Obyekt holati"),
+    ]
+
+    KUTMOQDA = 'kutmoqda'
+    BAJARILMOQDA = 'bajarilmoqda'
+    TUGADI = 'tugadi'
+    XATO = 'xato'
+    HOLAT_TANLOVLARI = [
+        (KUTMOQDA, "Navbatda"),
+        (BAJARILMOQDA, "Bajarilmoqda"),
+        (TUGADI, "Tugadi"),
+        (XATO, "Xato"),
+    ]
+
+    tur = models.CharField(max_length=20, choices=TUR_TANLOVLARI, verbose_name="Turi")
+    excel_fayl = models.ForeignKey(
+        ExcelUpload, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='import_vazifalari', verbose_name="To'lov fayli"
+    )
+    obyekt_fayl = models.ForeignKey(
+        ObyektExcelUpload, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='import_vazifalari', verbose_name="Obyekt fayli"
+    )
+    qayta_import = models.BooleanField(default=False, verbose_name="Qayta import")
+    holat = models.CharField(
+        max_length=20, choices=HOLAT_TANLOVLARI, default=KUTMOQDA,
+        db_index=True, verbose_name="Holati"
+    )
+    qatorlar_soni = models.IntegerField(default=0, verbose_name="Saqlangan qatorlar")
+    qoshildi = models.IntegerField(default=0, verbose_name="Qo'shildi")
+    ozgardi = models.IntegerField(default=0, verbose_name="O'zgardi")
+    ozgarmadi = models.IntegerField(default=0, verbose_name="O'zgarmadi")
+    olib_tashlandi = models.IntegerField(default=0, verbose_name="Olib tashlandi")
+    summa_xatolari = models.IntegerField(default=0, verbose_name="O'qilmagan summalar")
+    # Farq bo'yicha: faylda kadastr kaliti takrorlangan (birinchisidan keyingi, yozilmagan) qatorlar
+    takroriy_kalitlar = models.IntegerField(default=0, verbose_name="Takroriy kalitlar")
+    tezlik = models.FloatField(default=0, verbose_name="Tezlik (qator/s)")
+    # [{'varaq': nomi, 'qatorlar': soni, 'soniya': o'qish vaqti, 'holat': 'ok'|'bosh'|'sarlavhasiz'}]
+    varaqlar = models.JSONField(default=list, blank=True, verbose_name="Varaqlar")
+    xato_matni = models.TextField(blank=True, verbose_name="Xato matni")
+    yaratilgan = models.DateTimeField(auto_now_add=True, verbose_name="Yaratilgan")
+    boshlangan = models.DateTimeField(null=True, blank=True, verbose_name="Boshlangan")
+    # Vazifani band qilgan ishchi jarayon: 'host:pid'
+    ishchi = models.CharField(max_length=100, blank=True, verbose_name="Ishchi")
+    tugagan = models.DateTimeField(null=True, blank=True, verbose_name="Tugagan")
+
+    class Meta:
+        verbose_name = "Import vazifasi"
+        verbose_name_plural = "Import vazifalari"
+        ordering = ['-yaratilgan']
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_tur_display()} — {self.get_holat_display()}"
+
+    @property
+    def upload(self):
+        return self.excel_fayl if self.tur == self.TUR_TOLOV else self.obyekt_fayl
+
+    @property
+    def faol(self):
+        return self.holat in (self.KUTMOQDA, self.BAJARILMOQDA)
+
+
+class TumanXulosa(models.Model):
+    """Viloyat/tuman bo'yicha oldindan hisoblangan to'lov xulosasi (har importdan keyin yangilanadi)"""
+    viloyat = models.CharField(max_length=200, verbose_name="Viloyat")
+    tuman = models.CharField(max_length=200, verbose_name="Tuman")
+    jami = models.IntegerField(default=0, verbose_name="Jami obyektlar")
+    tolanmagan = models.IntegerField(default=0, verbose_name="To'lanmagan")
+    tolangan = models.IntegerField(default=0, verbose_name="To'langan")
+    tolanmagan_summa = models.DecimalField(
+        max_digits=20, decimal_places=2, default=0, verbose_name="To'lanmagan summa"
+    )
+    tolangan_summa = models.DecimalField(
+        max_digits=20, decimal_places=2, default=0, verbose_name="To'langan summa"
+    )
+    yangilangan = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
+
+    class Meta:
+        verbose_name = "Tuman xulosasi"
+        verbose_name_plural = "Tumanlar xulosasi"
+        ordering = ['viloyat', 'tuman']
+        constraints = [
+            models.UniqueConstraint(fields=['viloyat', 'tuman'], name='tuman_xulosa_yagona'),
+        ]
+
+    def __str__(self):
+        return f"{self.viloyat} / {self.tuman}"
+
+
+class ObyektHolatXulosa(models.Model):
+    """Faol obyektlarning holat kodlari bo'yicha taqsimoti (har obyekt importidan keyin yangilanadi)"""
+    holat_kodi = models.PositiveSmallIntegerField(choices=ObyektHolati.choices, unique=True, verbose_name="Holati")
+    soni = models.IntegerField(default=0, verbose_name="Soni")
+    yangilangan = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
+
+    class Meta:
+        verbose_name = "Obyekt holati xulosasi"
+        verbose_name_plural = "Obyekt holatlari xulosasi"
+        ordering = ['-soni', 'holat_kodi']
+
+    def __str__(self):
+        return f"{self.get_holat_kodi_display()}: {self.soni}"
+
+
+class KunlikStatistika(models.Model):
+    """Kunlik bot faolligi (bot statistikasi bazaga yozilganda to'ldiriladi)"""
+    sana = models.DateField(unique=True, verbose_name="Sana")
+    sorovlar = models.IntegerField(default=0, verbose_name="So'rovlar")
+    faol_foydalanuvchilar = models.IntegerField(default=0, verbose_name="Faol foydalanuvchilar")
+    yangi_foydalanuvchilar = models.IntegerField(default=0, verbose_name="Yangi foydalanuvchilar")
+    yangilangan = models.DateTimeField(auto_now=True, verbose_name="Yangilangan")
+
+    class Meta:
+        verbose_name = "Kunlik statistika"
+        verbose_name_plural = "Kunlik statistika"
+        ordering = ['-sana']
+
+    def __str__(self):
+        return f"{self.sana}: {self.sorovlar} ta so'rov"
@@ -0,0 +1,36 @@
+"""
+Viloyat, tuman, MFY va ko'cha nomlari lug'ati.
+
+Ma'lumot jadvallarida nom takrorlanuvchi matn emas, kichik lug'at
+jadvaliga (Viloyat, Tuman, Mfy, Kocha) butun son tashqi kalit sifatida
+saqlanadi. Import paytida nomlar NomKeshi orqali paket-paket hal qilinadi:
+kesh bir marta o'qiladi, yangi nomlar bitta bulk_create bilan qo'shiladi.
+"""
+
+_PAKET_HAJMI = 500
+
+
+class NomKeshi:
+    """Bitta lug'at modeli uchun nom -> obyekt keshi (bitta import davomida)"""
+
+    def __init__(self, model):
+        self.model = model
+        self._obyektlar = {o.nomi: o for o in model.objects.all()}
+
+    def hal_qilish(self, nomlar):
+        """Keshda yo'q nomlarni bazaga qo'shadi va keshga oladi"""
+        yangilar = sorted({n for n in nomlar if n not in self._obyektlar})
+        for i in range(0, len(yangilar), _PAKET_HAJMI):
+            paket = yangilar[i:i + _PAKET_HAJMI]
+            # Parallel import qo'shgan nomlar takrorlanmaydi (nomi — unique)
+            self.model.objects.bulk_create([self.model(nomi=n) for n in paket], ignore_conflicts=True)
+            for obyekt in self.model.objects.filter(nomi__in=paket):
+                self._obyektlar[obyekt.nomi] = obyekt
+
+    def __getitem__(self, nomi):
+        return self._obyektlar[nomi]
+
+
+def keshlar(*modellar):
+    """{maydon nomi: NomKeshi} — masalan keshlar(Viloyat, Tuman)"""
+    return {m._meta.model_name: NomKeshi(m) for m in modellar}
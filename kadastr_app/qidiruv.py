@@ -0,0 +1,53 @@
+"""
+SQLite FTS5 (trigram) qism-satr qidiruvi.
+
+Har bir ma'lumot jadvali yonida `<jadval>_fts` virtual jadvali turadi
+(rowid = asosiy jadvaldagi id). Trigram tokenizatori LIKE '%...%' ni
+to'liq skanersiz bajaradi. Jadvalni 0019 migratsiyasidagi SQLite
+triggerlari asosiy jadval (va mfy/kocha lug'ati) bilan sinxron saqlaydi —
+import, admin, bulk_update, CASCADE yoki qo'lda yozilgan SQL farqsiz.
+
+KADASTR_FTS_QIDIRUV = False bo'lsa yoki FTS5 mavjud bo'lmasa, qidiruv
+avvalgidek icontains bilan bajariladi (natijalarni solishtirish uchun).
+"""
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# Trigram qidiruv kamida 3 ta belgidan iborat matn bilan ishlaydi
+TRIGRAM_MIN = 3
+
+_mavjud = {}
+
+
+def fts_jadvali(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def fts_yoqilgan(model, using='default'):
+    """Sozlama yoqilgan va FTS jadvali bazada mavjud bo'lsa True"""
+    if not getattr(settings, 'KADASTR_FTS_QIDIRUV', True):
+        return False
+    ulanish = connections[using]
+    if ulanish.vendor != 'sqlite':
+        return False
+    kalit = (ulanish.settings_dict['NAME'], fts_jadvali(model))
+    if kalit not in _mavjud:
+        with ulanish.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [kalit[1]])
+            _mavjud[kalit] = cursor.fetchone() is not None
+        if not _mavjud[kalit]:
+            logger.warning("%s jadvali topilmadi — qidiruv icontains bilan bajariladi", kalit[1])
+    return _mavjud[kalit]
+
+
+def fts_sorovi(model, matn, maydonlar):
+    """`matn` berilgan ustunlardan birida uchraydigan rowid'lar uchun subquery"""
+    ibora = '"' + matn.replace('"', '""') + '"'
+    ifoda = '{%s} : %s' % (' '.join(maydonlar), ibora)
+    jadval = fts_jadvali(model)
+    return RawSQL(f'SELECT rowid FROM {jadval} WHERE {jadval} MATCH %s', [ifoda])
@@ -0,0 +1,34 @@
+import contextvars
+
+from django.conf import settings
+
+# True bo'lgan kontekstda (bot o'qish pool'i) o'qish so'rovlari 'oqish' ulanishiga yo'naltiriladi
+faqat_oqish = contextvars.ContextVar('faqat_oqish', default=False)
+
+OQISH_ALIAS = 'oqish'
+
+
+class OqishRouter:
+    """
+    Bot o'qish so'rovlarini faqat o'qiladigan SQLite ulanishiga yo'naltiradi.
+
+    Admin va import ishchisi odatdagidek 'default' orqali ishlaydi (o'z
+    yozganini darhol ko'radi); faqat faqat_oqish o'rnatilgan kontekstdagi
+    o'qishlar 'oqish' ga tushadi. Yozuvlar doim 'default' da.
+    """
+
+    def db_for_read(self, model, **hints):
+        if faqat_oqish.get() and OQISH_ALIAS in settings.DATABASES:
+            return OQISH_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == OQISH_ALIAS:
+            return False
+        return None
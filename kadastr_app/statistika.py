@@ -0,0 +1,134 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BotFoydalanuvchi, KunlikStatistika
+
+logger = logging.getLogger(__name__)
+
+# Bitta IN (...) so'rovidagi telegram_id'lar soni (SQLite o'zgaruvchilar chegarasi uchun)
+_PAKET_HAJMI = 500
+
+
+class StatistikaYigguvchi:
+    """
+    Foydalanuvchi so'rovlari statistikasini jarayon xotirasida yig'adi.
+
+    Har bir xabarda bazaga yozish o'rniga so'rovlar soni va oxirgi murojaat
+    vaqti xotirada to'planadi, yozish() esa ularni bitta tranzaksiyada
+    bazaga tushiradi: yangi foydalanuvchilar bulk upsert bilan qo'shiladi,
+    hisoblagichlar F() orqali oshiriladi (parallel yozuvlarda ham yo'qolmaydi).
+
+    Yangi foydalanuvchining birinchi /start'i so'rov hisoblanmaydi (avvalgidek
+    0 bilan yaratiladi), mavjud foydalanuvchining /start'i — bitta so'rov.
+    """
+
+    def __init__(self):
+        self._qulf = threading.Lock()
+        self._kutilayotgan = {}
+
+    def qayd_qilish(self, telegram_id, ism, username, start=False):
+        """So'rovni xotirada qayd qiladi (bazaga murojaat qilmaydi)"""
+        with self._qulf:
+            yozuv = self._kutilayotgan.get(telegram_id)
+            if yozuv is None:
+                # start — bu navbatdagi birinchi murojaat /start bo'lgan
+                yozuv = self._kutilayotgan[telegram_id] = {'soni': 0, 'start': start}
+            yozuv['soni'] += 1
+            yozuv['ism'] = ism
+            yozuv['username'] = username
+            yozuv['oxirgi'] = timezone.now()
+
+    def kutilayotganlar_soni(self):
+        with self._qulf:
+            return len(self._kutilayotgan)
+
+    def yozish(self):
+        """To'plangan statistikani bazaga yozadi; yozilgan foydalanuvchilar sonini qaytaradi"""
+        with self._qulf:
+            olingan, self._kutilayotgan = self._kutilayotgan, {}
+        if not olingan:
+            return 0
+
+        try:
+            with transaction.atomic():
+                mavjud = _oxirgi_murojaatlar(olingan)
+                sonlar = {tid: y['soni'] - (y['start'] and tid not in mavjud) for tid, y in olingan.items()}
+                _kunlik_statistika(sonlar, mavjud)
+                # Yangi foydalanuvchilar qo'shiladi, mavjudlarining ismi va oxirgi murojaati yangilanadi
+                BotFoydalanuvchi.objects.bulk_create(
+                    [
+                        BotFoydalanuvchi(
+                            telegram_id=tid, ism=y['ism'], username=y['username'], so_rovlar_soni=0,
+                            oxirgi_murojaat=y['oxirgi'],
+                        )
+                        for tid, y in olingan.items()
+                    ],
+                    batch_size=_PAKET_HAJMI,
+                    update_conflicts=True,
+                    unique_fields=['telegram_id'],
+                    update_fields=['ism', 'username', 'oxirgi_murojaat'],
+                )
+                # So'rovlar soni bir xil bo'lgan foydalanuvchilar bitta UPDATE bilan oshiriladi
+                guruhlar = defaultdict(list)
+                for tid, soni in sonlar.items():
+                    if soni:
+                        guruhlar[soni].append(tid)
+                for soni, idlar in guruhlar.items():
+                    for i in range(0, len(idlar), _PAKET_HAJMI):
+                        BotFoydalanuvchi.objects.filter(telegram_id__in=idlar[i:i + _PAKET_HAJMI]).update(
+                            so_rovlar_soni=F('so_rovlar_soni') + soni,
+                        )
+        except Exception:
+            # Yozilmagan hisoblagichlar yo'qolmasligi uchun navbatga qaytariladi
+            with self._qulf:
+                for tid, y in olingan.items():
+                    yozuv = self._kutilayotgan.get(tid)
+                    if yozuv is None:
+                        self._kutilayotgan[tid] = y
+                    else:
+                        # Qaytarilgan yozuv eskiroq: /start belgisi undan olinadi
+                        yozuv['soni'] += y['soni']
+                        yozuv['start'] = y['start']
+            raise
+
+        return len(olingan)
+
+
+def _oxirgi_murojaatlar(olingan):
+    """Bazada bor foydalanuvchilar: {telegram_id: oxirgi_murojaat} (yangilanishidan oldingi)"""
+    idlar = list(olingan)
+    mavjud = {}
+    for i in range(0, len(idlar), _PAKET_HAJMI):
+        mavjud.update(
+            BotFoydalanuvchi.objects.filter(telegram_id__in=idlar[i:i + _PAKET_HAJMI])
+            .values_list('telegram_id', 'oxirgi_murojaat')
+        )
+    return mavjud
+
+
+def _kunlik_statistika(sonlar, mavjud):
+    """
+    Bugungi KunlikStatistika'ga so'rovlar, bugun birinchi marta kelgan (faol)
+    va umuman yangi foydalanuvchilarni qo'shadi. `mavjud` foydalanuvchilar
+    yangilanishidan oldin olinadi — oxirgi murojaat hali oldingisini ko'rsatadi.
+    """
+    bugun = timezone.localdate()
+    kun_boshi = timezone.make_aware(datetime.combine(bugun, time.min))
+    bugun_kelgan = sum(1 for vaqt in mavjud.values() if vaqt >= kun_boshi)
+
+    KunlikStatistika.objects.bulk_create([KunlikStatistika(sana=bugun)], ignore_conflicts=True)
+    KunlikStatistika.objects.filter(sana=bugun).update(
+        sorovlar=F('sorovlar') + sum(sonlar.values()),
+        faol_foydalanuvchilar=F('faol_foydalanuvchilar') + len(sonlar) - bugun_kelgan,
+        yangi_foydalanuvchilar=F('yangi_foydalanuvchilar') + len(sonlar) - len(mavjud),
+        yangilangan=timezone.now(),
+    )
+
+
+statistika = StatistikaYigguvchi()
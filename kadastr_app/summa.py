@@ -0,0 +1,87 @@
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Summa oxiridagi valyuta belgisi: "so'm", "сўм", "сум", "UZS"
+_VALYUTA = re.compile(r"(so['‘’ʻ`]?m|сўм|сум|uzs)\.?$", re.IGNORECASE)
+_RAQAMLAR = re.compile(r'[0-9.,]+')
+_TIYIN = Decimal('0.01')
+
+
+def _ming_guruhlari(qism, ajratuvchi):
+    """'1.250.000' — birinchi guruh 1-3 raqamli, keyingilari aynan 3 raqamli"""
+    guruhlar = qism.split(ajratuvchi)
+    return (
+        1 <= len(guruhlar[0]) <= 3
+        and all(g.isdigit() for g in guruhlar)
+        and all(len(g) == 3 for g in guruhlar[1:])
+    )
+
+
+def tiyinga(qiymat):
+    """
+    Excel'dagi summani butun tiyinga aylantiradi; bo'sh yoki o'qib bo'lmasa None.
+
+    Bo'shliq (jumladan NBSP), apostrof va nuqta/vergul ming ajratuvchisi
+    bo'lishi mumkin: '1 250 000,00', '1.250.000,50', '1,250,000.50',
+    "1'250'000", '1250000 so'm'. Bitta ajratuvchidan keyin aynan 3 raqam
+    bo'lsa va oldida 1-3 raqam tursa ('1.250') — bu ming ajratuvchisi, aks
+    holda kasr qismi ('1250000.005').
+    """
+    if qiymat is None or isinstance(qiymat, bool):
+        return None
+    if isinstance(qiymat, (int, float, Decimal)):
+        # Excel'dagi son katak — ajratuvchilarni taxmin qilish shart emas
+        return _tiyin(Decimal(str(qiymat)))
+
+    matn = ''.join(str(qiymat).split())
+    matn = _VALYUTA.sub('', matn).replace("'", '').replace('’', '')
+    if not matn:
+        return None
+
+    ishora = 1
+    if matn[0] in '+-':
+        ishora = -1 if matn[0] == '-' else 1
+        matn = matn[1:]
+    if not _RAQAMLAR.fullmatch(matn) or not any(c.isdigit() for c in matn):
+        return None
+
+    nuqta, vergul = matn.rfind('.'), matn.rfind(',')
+    if nuqta >= 0 and vergul >= 0:
+        kasr, ming = ('.', ',') if nuqta > vergul else (',', '.')
+        butun, _, qoldiq = matn.rpartition(kasr)
+        if not _ming_guruhlari(butun, ming) or not qoldiq.isdigit():
+            return None
+        matn = butun.replace(ming, '') + '.' + qoldiq
+    elif nuqta >= 0 or vergul >= 0:
+        ajratuvchi = '.' if nuqta >= 0 else ','
+        qismlar = matn.split(ajratuvchi)
+        if len(qismlar) > 2:
+            if not _ming_guruhlari(matn, ajratuvchi):
+                return None
+            matn = matn.replace(ajratuvchi, '')
+        elif len(qismlar[1]) == 3 and qismlar[0] not in ('', '0') and _ming_guruhlari(matn, ajratuvchi):
+            matn = matn.replace(ajratuvchi, '')
+        else:
+            # '1250000.005' — birinchi guruh uzun, demak kasr qismi
+            matn = '.'.join(qismlar)
+
+    try:
+        return ishora * _tiyin(Decimal(matn))
+    except InvalidOperation:
+        return None
+
+
+def _tiyin(summa):
+    if not summa.is_finite():
+        return None
+    return int(summa.quantize(_TIYIN, rounding=ROUND_HALF_UP) * 100)
+
+
+def somga(tiyin):
+    """Tiyindan so'mga (Decimal); None -> 0"""
+    return Decimal(tiyin or 0) / 100
+
+
+def summa_matni(qiymat):
+    """1234567.8 -> '1 234 568'"""
+    return f'{qiymat:,.0f}'.replace(',', ' ')
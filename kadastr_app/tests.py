@@ -1,3 +1,1035 @@
-from django.test import TestCase
+import asyncio
+import io
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from openpyxl import Workbook
+
+from . import qidiruv
+from .models import (
+    IMPORT_FARQ, BotFoydalanuvchi, ExcelUpload, ImportJob, KadastrMalumat, KunlikStatistika, Kocha, Mfy, ObyektExcelUpload, ObyektHolatXulosa,
+    ObyektMalumat, Tuman, TumanXulosa, Viloyat,
+)
+from .routers import faqat_oqish
+from .holat import ObyektHolati, TolovHolati, obyekt_kodi, tolov_kodi
+from .kalit import kadastr_kalit
+from .indeks import KadastrIndeks, tolov_indeks
+from .kesh import JavobKeshi
+from .nomlar import NomKeshi
+from .statistika import StatistikaYigguvchi
+from .summa import tiyinga
+from . import vazifalar, views
+from .vazifalar import navbatni_bajarish, osilib_qolganlarni_tiklash, vazifani_bajarish
+from .xulosa import toshkent_tumanlari
+
+
+def _tolov_qatori(kadastr, summa='1 250 000', fio='Aliyev Vali'):
+    return [1, 'Toshkent viloyati', 'Zangiota tumani', 'Navro\'z', 'Bog\' ko\'chasi',
+            kadastr, 'INV', summa, fio, "To'lanmagan"]
+
+
+def _xlsx(qatorlar):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(['№', 'Viloyat', 'Tuman', 'MFY', "Ko'cha", 'Kadastr raqami', 'Invoys raqami',
+               'Summa miqdori', "To'lovchi F.I.O", "To'lov holati"])
+    for qator in qatorlar:
+        ws.append(qator)
+    fayl = tempfile.SpooledTemporaryFile()
+    wb.save(fayl)
+    fayl.seek(0)
+    return fayl.read()
+
+
+def _excel_fayl(qatorlar_soni):
+    return _xlsx(_tolov_qatori(f'11:13:42:02:{i // 10000:02d}:{i % 10000:04d}') for i in range(qatorlar_soni))
+
+
+class _MediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        media_sozlama = override_settings(MEDIA_ROOT=self.media)
+        media_sozlama.enable()
+        self.addCleanup(media_sozlama.disable)
+
+
+@override_settings(KADASTR_XOTIRA_INDEKSI=False, IMPORT_PAKET_HAJMI=250, IMPORT_ISHCHI='command')
+class SqliteParallelIshlashTest(_MediaMixin, TransactionTestCase):
+    """Import yozayotgan paytda bot qidiruvi (faqat o'qiladigan ulanish) to'xtamasligi kerak"""
+
+    databases = {'default', 'oqish'}
+    QATORLAR = 3000
+
+    def setUp(self):
+        super().setUp()
+        self.upload = ExcelUpload.objects.create()
+        self.upload.fayl.save('sinov.xlsx', ContentFile(_excel_fayl(self.QATORLAR)))
+
+    def _import_qilish(self):
+        job = ImportJob.objects.create(
+            tur=ImportJob.TUR_TOLOV, excel_fayl=self.upload, holat=ImportJob.BAJARILMOQDA
+        )
+        self.upload.refresh_from_db()
+        try:
+            return vazifani_bajarish(job)
+        finally:
+            connections.close_all()
+
+    def test_import_paytida_qidiruv_ishlaydi(self):
+        from bot import bot
+
+        self.assertTrue(self._import_qilish())
+        xatolar = []
+        natijalar = []
+        tugadi = threading.Event()
+
+        def qidiruvchi(n):
+            faqat_oqish.set(True)
+            try:
+                while not tugadi.is_set():
+                    raqam = f'11:13:42:02:00:{(n * 997 + len(natijalar)) % self.QATORLAR:04d}'
+                    try:
+                        jami, qatorlar = bot._qidirish(raqam)
+                    except Exception as e:
+                        xatolar.append(e)
+                    else:
+                        natijalar.append((jami, len(qatorlar)))
+            finally:
+                connections.close_all()
+
+        oqimlar = [threading.Thread(target=qidiruvchi, args=(n,)) for n in range(4)]
+        for t in oqimlar:
+            t.start()
+        boshlanish = time.monotonic()
+        try:
+            self.assertTrue(self._import_qilish())
+        finally:
+            tugadi.set()
+            for t in oqimlar:
+                t.join()
+        davomiylik = time.monotonic() - boshlanish
+
+        self.assertEqual(xatolar, [])
+        self.assertGreater(len(natijalar), 0)
+        # Versiya bitta UPDATE bilan almashadi — har bir qidiruv aniq bitta yozuvni ko'radi
+        self.assertEqual(set(natijalar), {(1, 1)})
+        self.assertEqual(KadastrMalumat.objects.faol().count(), self.QATORLAR)
+        # Import davomida qidiruvlar navbat kutmasdan bajarilgan bo'lishi kerak
+        self.assertGreater(len(natijalar) / davomiylik, 10)
+
+    def test_fts_import_bilan_sinxron(self):
+        self.assertTrue(self._import_qilish())
+        self.assertTrue(self._import_qilish())
+
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {qidiruv.fts_jadvali(KadastrMalumat)}')
+            self.assertEqual(cursor.fetchone()[0], KadastrMalumat.objects.count())
+
+        faol = KadastrMalumat.objects.faol()
+        for matn in ('02:00:012', '4202000123', 'aliyev'):
+            with self.settings(KADASTR_FTS_QIDIRUV=True):
+                fts = set(faol.matn_boyicha(matn).values_list('id', flat=True))
+            with self.settings(KADASTR_FTS_QIDIRUV=False):
+                icontains = set(faol.matn_boyicha(matn).values_list('id', flat=True))
+            self.assertTrue(fts)
+            self.assertEqual(fts, icontains)
+
+    def test_oqish_ulanishi_yozmaydi(self):
+        with self.assertRaises(OperationalError):
+            with connections['oqish'].cursor() as cursor:
+                cursor.execute("UPDATE kadastr_app_kadastrmalumat SET tolovchi_fio = 'x'")
+
+
+class FtsTriggerTest(TestCase):
+    """FTS jadvali import'dan tashqari yozuvlarda ham asosiy jadval bilan sinxron"""
+
+    def _fts(self, pk):
+        with connections['default'].cursor() as cursor:
+            cursor.execute(
+                f'SELECT tolovchi_fio, mfy, kocha FROM {qidiruv.fts_jadvali(KadastrMalumat)} WHERE rowid = %s', [pk]
+            )
+            return cursor.fetchone()
+
+    def test_saqlash_yangilash_ochirish(self):
+        mfy = Mfy.objects.create(nomi="Navro'z")
+        yozuv = KadastrMalumat.objects.create(
+            excel_fayl=ExcelUpload.objects.create(), kadastr_raqami='11:01', tolovchi_fio='Aliyev Vali',
+            viloyat=Viloyat.objects.create(nomi='Toshkent'), tuman=Tuman.objects.create(nomi='Zangiota'),
+            mfy=mfy, kocha=Kocha.objects.create(nomi="Bog'"),
+        )
+        self.assertEqual(self._fts(yozuv.pk), ('Aliyev Vali', "Navro'z", "Bog'"))
+
+        KadastrMalumat.objects.filter(pk=yozuv.pk).update(tolovchi_fio='Karimov Ali')
+        self.assertEqual(self._fts(yozuv.pk)[0], 'Karimov Ali')
+        self.assertEqual(list(KadastrMalumat.objects.matn_boyicha('karimov').values_list('pk', flat=True)), [yozuv.pk])
+
+        Mfy.objects.filter(pk=mfy.pk).update(nomi='Yangi hayot')
+        self.assertEqual(self._fts(yozuv.pk)[1], 'Yangi hayot')
+
+        yozuv.excel_fayl.delete()
+        self.assertIsNone(self._fts(yozuv.pk))
+
+
+@override_settings(KADASTR_XOTIRA_INDEKSI=False, IMPORT_ISHCHI='command', IMPORT_JARAYONLAR=1)
+class FarqImportTest(_MediaMixin, TestCase):
+    """Farq bo'yicha import faqat o'z upload'ining faol versiyasi bilan solishtiriladi"""
+
+    def _import(self, upload, qatorlar):
+        upload.fayl.save('farq.xlsx', ContentFile(_xlsx(qatorlar)))
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=ImportJob.BAJARILMOQDA)
+        upload.refresh_from_db()
+        self.assertTrue(vazifani_bajarish(job))
+        job.refresh_from_db()
+        return job
+
+    def _faol(self, upload):
+        return dict(KadastrMalumat.objects.faol().filter(excel_fayl=upload).values_list('kadastr_raqami', 'summa_miqdori'))
+
+    def test_hisoblar(self):
+        upload = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ)
+        self._import(upload, [_tolov_qatori('11:01'), _tolov_qatori('11:02'), _tolov_qatori('11:03')])
+
+        job = self._import(upload, [
+            _tolov_qatori('11:01'), _tolov_qatori('11 02', summa='500'), _tolov_qatori('11:04'),
+        ])
+        self.assertEqual((job.qoshildi, job.ozgardi, job.ozgarmadi, job.olib_tashlandi), (1, 1, 1, 1))
+        self.assertEqual(self._faol(upload), {'11:01': '1 250 000', '11 02': '500', '11:04': '1 250 000'})
+
+    def test_boshqa_upload_qatorlariga_tegmaydi(self):
+        birinchi = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ)
+        self._import(birinchi, [_tolov_qatori('11:01'), _tolov_qatori('11:02')])
+        ikkinchi = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ)
+
+        job = self._import(ikkinchi, [_tolov_qatori('11:02', summa='500'), _tolov_qatori('22:01')])
+        self.assertEqual((job.qoshildi, job.ozgardi, job.olib_tashlandi), (2, 0, 0))
+        self.assertEqual(self._faol(birinchi), {'11:01': '1 250 000', '11:02': '1 250 000'})
+        self.assertEqual(self._faol(ikkinchi), {'11:02': '500', '22:01': '1 250 000'})
+
+        self._import(ikkinchi, [_tolov_qatori('22:01')])
+        self.assertEqual(self._faol(birinchi), {'11:01': '1 250 000', '11:02': '1 250 000'})
+        self.assertEqual(self._faol(ikkinchi), {'22:01': '1 250 000'})
+
+    def test_yangi_fayl_eskisini_almashtiradi(self):
+        eski = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ)
+        self._import(eski, [_tolov_qatori('11:01'), _tolov_qatori('11:02'), _tolov_qatori('11:03')])
+        yangi = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ, almashtiriladi=eski)
+
+        job = self._import(yangi, [
+            _tolov_qatori('11:01'), _tolov_qatori('11:02', summa='500'), _tolov_qatori('11:04'),
+        ])
+        self.assertEqual((job.qoshildi, job.ozgardi, job.ozgarmadi, job.olib_tashlandi), (1, 1, 1, 1))
+        # Qidiruvda takror yo'q: barcha faol qatorlar yangi faylga ko'chgan
+        self.assertEqual(KadastrMalumat.objects.faol().filter(kadastr_kalit='1101').count(), 1)
+        self.assertEqual(self._faol(yangi), {'11:01': '1 250 000', '11:02': '500', '11:04': '1 250 000'})
+        self.assertEqual(KadastrMalumat.objects.filter(excel_fayl=eski).count(), 0)
+        eski.refresh_from_db()
+        self.assertIsNone(eski.faol_versiya)
+
+    def test_takroriy_kalitlar_hisoblanadi(self):
+        upload = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ)
+        with self.assertLogs('kadastr_app.excel_utils', 'WARNING') as loglar:
+            job = self._import(upload, [_tolov_qatori('11:01'), _tolov_qatori('11-01', fio='B'), _tolov_qatori('11:02')])
+        self.assertEqual((job.qoshildi, job.takroriy_kalitlar), (2, 1))
+        self.assertIn('11-01', loglar.output[0])
+
+    def test_bosh_kalitli_qatorlar_birlashmaydi(self):
+        upload = ExcelUpload.objects.create(import_rejimi=IMPORT_FARQ)
+        self._import(upload, [_tolov_qatori('—', fio='A'), _tolov_qatori('-', fio='B'), _tolov_qatori('11:01')])
+        self.assertEqual(KadastrMalumat.objects.faol().filter(kadastr_kalit='').count(), 2)
+
+        self._import(upload, [_tolov_qatori('—', fio='A'), _tolov_qatori('-', fio='B'), _tolov_qatori('11:01')])
+        self.assertEqual(
+            sorted(KadastrMalumat.objects.faol().filter(kadastr_kalit='').values_list('tolovchi_fio', flat=True)),
+            ['A', 'B'],
+        )
+
+
+@override_settings(KADASTR_XOTIRA_INDEKSI=False, IMPORT_ISHCHI='command', IMPORT_JARAYONLAR=2)
+class VazifaXatolariTest(_MediaMixin, TestCase):
+    """Import xatosi vazifalarni BAJARILMOQDA holatida qoldirmasligi kerak"""
+
+    def _job(self, holat=ImportJob.KUTMOQDA, rejim='toliq'):
+        upload = ExcelUpload.objects.create(import_rejimi=rejim)
+        upload.fayl.save('x.xlsx', ContentFile(_xlsx([_tolov_qatori('11:01')])))
+        return ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=holat)
+
+    def test_faollashtirishdagi_xato(self):
+        job = self._job(ImportJob.BAJARILMOQDA, rejim=IMPORT_FARQ)
+        with mock.patch.object(vazifalar, 'farqni_qollash', side_effect=RuntimeError('qulf')):
+            self.assertFalse(vazifani_bajarish(job))
+        job.refresh_from_db()
+        self.assertEqual((job.holat, job.xato_matni), (ImportJob.XATO, 'qulf'))
+        self.assertIsNone(job.upload.faol_versiya)
+        self.assertFalse(KadastrMalumat.objects.filter(versiya=job.pk).exists())
+
+    def test_tozalashdagi_xato_vazifani_buzmaydi(self):
+        job = self._job(ImportJob.BAJARILMOQDA)
+        with mock.patch.object(vazifalar, 'eski_versiyalarni_tozalash', side_effect=RuntimeError), \
+                self.assertLogs('kadastr_app.vazifalar', 'ERROR'):
+            self.assertTrue(vazifani_bajarish(job))
+        job.refresh_from_db()
+        self.assertEqual(job.holat, ImportJob.TUGADI)
+
+    def test_xulosa_faollashtirish_bilan_yangilanadi(self):
+        job = self._job(ImportJob.BAJARILMOQDA)
+        self.assertTrue(vazifani_bajarish(job))
+        upload = job.upload
+        upload.fayl.save('y.xlsx', ContentFile(_xlsx([_tolov_qatori(f'11:0{i}') for i in range(3)])))
+        ikkinchi = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=ImportJob.BAJARILMOQDA)
+        tolov_indeks.tayyorlash()
+        self.assertEqual(toshkent_tumanlari()[0]['tolanmagan'], 1)
+
+        # Eski qatorlar hali o'chirilmagan bo'lsa ham xulosa yangi versiyani ko'rsatadi
+        with mock.patch.object(vazifalar, 'eski_versiyalarni_tozalash', side_effect=RuntimeError), \
+                self.assertLogs('kadastr_app.vazifalar', 'ERROR'):
+            self.assertTrue(vazifani_bajarish(ikkinchi))
+        xulosa = TumanXulosa.objects.get()
+        faol = KadastrMalumat.objects.faol()
+        self.assertEqual((xulosa.jami, xulosa.tolanmagan), (faol.count(), 3))
+        # Bot ro'yxati kesh muddatini kutmaydi: belgi o'zgargan
+        tolov_indeks.tayyorlash()
+        self.assertEqual(toshkent_tumanlari()[0]['tolanmagan'], 3)
+
+    def test_boshqa_ishchi_versiyasi_tozalanmaydi(self):
+        job = self._job(ImportJob.BAJARILMOQDA)
+        upload = job.upload
+        # Shu upload uchun boshqa jarayonda yozilayotgan keyingi versiya
+        boshqa = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=ImportJob.BAJARILMOQDA)
+        qator = KadastrMalumat.objects.create(
+            excel_fayl=upload, versiya=boshqa.pk, viloyat=Viloyat.objects.create(nomi='V'),
+            tuman=Tuman.objects.create(nomi='T'), mfy=Mfy.objects.create(nomi='M'),
+            kocha=Kocha.objects.create(nomi='K'), kadastr_raqami='11:99',
+        )
+        self.assertTrue(vazifani_bajarish(job))
+        self.assertTrue(KadastrMalumat.objects.filter(pk=qator.pk).exists())
+
+    def test_osilib_qolgan_vazifalar_tiklanadi(self):
+        olgan, boshqa_server, eski = (self._job(ImportJob.BAJARILMOQDA) for _ in range(3))
+        hozir = timezone.now()
+        ImportJob.objects.filter(pk=olgan.pk).update(ishchi=f'{socket.gethostname()}:999999999', boshlangan=hozir)
+        ImportJob.objects.filter(pk=boshqa_server.pk).update(ishchi='boshqa-server:1', boshlangan=hozir)
+        ImportJob.objects.filter(pk=eski.pk).update(ishchi='boshqa-server:1', boshlangan=hozir - timedelta(days=1))
+        KadastrMalumat.objects.create(
+            excel_fayl=olgan.upload, versiya=olgan.pk, viloyat=Viloyat.objects.create(nomi='V'),
+            tuman=Tuman.objects.create(nomi='T'), mfy=Mfy.objects.create(nomi='M'),
+            kocha=Kocha.objects.create(nomi='K'), kadastr_raqami='11:99',
+        )
+
+        self.assertEqual(osilib_qolganlarni_tiklash(), 2)
+        holatlar = dict(ImportJob.objects.values_list('pk', 'holat'))
+        self.assertEqual(
+            [holatlar[j.pk] for j in (olgan, boshqa_server, eski)],
+            [ImportJob.XATO, ImportJob.BAJARILMOQDA, ImportJob.XATO],
+        )
+        self.assertFalse(KadastrMalumat.objects.filter(versiya=olgan.pk).exists())
+
+    def test_band_qilingan_vazifalar_navbatga_qaytadi(self):
+        birinchi, ikkinchi = self._job(), self._job()
+        # TestCase tranzaksiyasi ichida ulanish yopilmasligi kerak
+        with mock.patch.object(vazifalar, 'close_old_connections'), \
+                mock.patch.object(vazifalar, 'vazifani_bajarish', side_effect=RuntimeError('qulf')):
+            with self.assertRaises(RuntimeError):
+                navbatni_bajarish()
+        birinchi.refresh_from_db()
+        ikkinchi.refresh_from_db()
+        self.assertEqual(birinchi.holat, ImportJob.XATO)
+        self.assertEqual((ikkinchi.holat, ikkinchi.boshlangan), (ImportJob.KUTMOQDA, None))
+
+
+@override_settings(KADASTR_XOTIRA_INDEKSI=False, IMPORT_ISHCHI='command', IMPORT_JARAYONLAR=1)
+class TumanSahifalashTest(_MediaMixin, TestCase):
+    """Keyset sahifalar OFFSET sahifalari bilan bir xil bo'lishi kerak"""
+
+    TUMAN = 'Zangiota tumani'
+
+    def _import(self, upload, fio):
+        upload.fayl.save('tuman.xlsx', ContentFile(_xlsx(
+            _tolov_qatori(f'11:13:{i:04d}', fio=fio(i)) for i in range(40)
+        )))
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=ImportJob.BAJARILMOQDA)
+        upload.refresh_from_db()
+        self.assertTrue(vazifani_bajarish(job))
+
+    def _offset_sahifasi(self, sahifa):
+        from bot import bot
+
+        bot._tuman_kursorlari.clear()
+        return [q['id'] for q in bot._tuman_fuqarolari(self.TUMAN, sahifa)[2]]
+
+    def test_keyset_va_offset_sahifalari(self):
+        from bot import bot
+
+        upload = ExcelUpload.objects.create()
+        self._import(upload, lambda i: f'F{i % 7}')
+        offset = [self._offset_sahifasi(s) for s in range(3)]
+        bot._tuman_kursorlari.clear()
+        keyset = [[q['id'] for q in bot._tuman_fuqarolari(self.TUMAN, s)[2]] for s in range(3)]
+        self.assertEqual(keyset, offset)
+        self.assertEqual(sum(len(s) for s in keyset), 40)
+
+        # Eski versiyaning 0-sahifa kursori saqlangan — yangi versiyada ishlatilmasligi kerak
+        self._import(upload, lambda i: f'A{(i * 3) % 11}')
+        ikkinchi = [q['id'] for q in bot._tuman_fuqarolari(self.TUMAN, 1)[2]]
+        self.assertEqual(ikkinchi, self._offset_sahifasi(1))
+
+
+class TiyingaTest(SimpleTestCase):
+    def test_matn_formatlari(self):
+        for matn, tiyin in [
+            ('1 250 000,00', 125000000),
+            ('1\xa0250\xa0000', 125000000),
+            ('1.250.000,50', 125000050),
+            ('1,250,000.50', 125000050),
+            ("1'250'000", 125000000),
+            ("1250000 so'm", 125000000),
+            ('1 250 000 сўм', 125000000),
+            ('1.250', 125000),
+            ('0.250', 25),
+            ('12,5', 1250),
+            ('-1.250', -125000),
+            # Birinchi guruh 3 raqamdan uzun — ming ajratuvchisi emas, kasr qismi
+            ('1250000.005', 125000001),
+            ('1250000,500', 125000050),
+        ]:
+            with self.subTest(matn=matn):
+                self.assertEqual(tiyinga(matn), tiyin)
+
+    def test_son_kataklar(self):
+        self.assertEqual(tiyinga(1250000), 125000000)
+        self.assertEqual(tiyinga(1250.005), 125001)
+        self.assertEqual(tiyinga(Decimal('0.5')), 50)
+
+    def test_oqilmaydiganlar(self):
+        for qiymat in (None, True, '', '  ', '-', 'abc', '1.250.00', '1250.000,50', '1.2.3', 'Infinity'):
+            with self.subTest(qiymat=qiymat):
+                self.assertIsNone(tiyinga(qiymat))
+
+
+class HolatTasnifiTest(SimpleTestCase):
+    def test_tolov_holati(self):
+        for matn, kod in [
+            ("To'lanmagan", TolovHolati.TOLANMAGAN),
+            ('TO‘LANMAGAN', TolovHolati.TOLANMAGAN),
+            ('toʻlanmagan', TolovHolati.TOLANMAGAN),
+            ('to’langan', TolovHolati.TOLANGAN),
+            ('To`langan (qisman)', TolovHolati.TOLANGAN),
+            ('', TolovHolati.NOMALUM),
+            (None, TolovHolati.NOMALUM),
+            ('Kutilmoqda', TolovHolati.NOMALUM),
+        ]:
+            with self.subTest(matn=matn):
+                self.assertEqual(tolov_kodi(matn), kod)
+
+    def test_obyekt_holati(self):
+        for matn, kod in [
+            ('Muhokamada', ObyektHolati.MUHOKAMADA),
+            ('Rad etildi', ObyektHolati.RAD_ETILGAN),
+            ('Bekor qilingan', ObyektHolati.RAD_ETILGAN),
+            ('Qabul qilindi', ObyektHolati.TASDIQLANGAN),
+            ('TASDIQLANGAN', ObyektHolati.TASDIQLANGAN),
+            ("Ko'rib chiqilmoqda", ObyektHolati.BOSHQA),
+        ]:
+            with self.subTest(matn=matn):
+                self.assertEqual(obyekt_kodi(matn), kod)
+
+    def test_sozlama_qoidalari(self):
+        with self.settings(HOLAT_QOIDALARI={'tolov': [('TOLANMAGAN', ['qarzdor'])]}):
+            self.assertEqual(tolov_kodi('Qarzdor'), TolovHolati.TOLANMAGAN)
+            self.assertEqual(tolov_kodi("To'lanmagan"), TolovHolati.NOMALUM)
+        self.assertEqual(tolov_kodi('Qarzdor'), TolovHolati.NOMALUM)
+
+
+class HolatlarniTasniflashTest(TestCase):
+    def test_ikkala_xulosa_yangilanadi(self):
+        upload = ObyektExcelUpload.objects.create(faol_versiya=1)
+        nomlar = dict(viloyat=Viloyat.objects.create(nomi='Toshkent viloyati'),
+                      tuman=Tuman.objects.create(nomi='T'), mfy=Mfy.objects.create(nomi='M'))
+        for i, holati in enumerate(['Muhokamada', 'Kutilmoqda', 'Kutilmoqda']):
+            ObyektMalumat.objects.create(excel_fayl=upload, versiya=1, kadastr_raqami=f'11:{i}', holati=holati, **nomlar)
+        tolov = ExcelUpload.objects.create(faol_versiya=2)
+        KadastrMalumat.objects.create(
+            excel_fayl=tolov, versiya=2, kocha=Kocha.objects.create(nomi='K'), kadastr_raqami='11:0',
+            summa_miqdori='100', tolov_holati='Qarzdor', **nomlar,
+        )
+
+        qoidalar = {'obyekt': [('MUHOKAMADA', ['kutil'])], 'tolov': [('TOLANMAGAN', ['qarzdor'])]}
+        with self.settings(HOLAT_QOIDALARI=qoidalar):
+            call_command('holatlarni_tasniflash', stdout=io.StringIO())
+        self.assertEqual(
+            dict(ObyektHolatXulosa.objects.values_list('holat_kodi', 'soni')),
+            {ObyektHolati.MUHOKAMADA: 2, ObyektHolati.BOSHQA: 1},
+        )
+        self.assertEqual(TumanXulosa.objects.get().tolanmagan, 1)
+
+
+class TokenChelakTest(SimpleTestCase):
+    def setUp(self):
+        from bot.cheklov import TokenChelak
+
+        self.vaqt = 1000.0
+        soat = mock.patch('bot.cheklov.time.monotonic', side_effect=lambda: self.vaqt)
+        soat.start()
+        self.addCleanup(soat.stop)
+        self.chelak = TokenChelak(sigim=3, tezlik=0.5)
+
+    def test_sigim_va_tiklanish(self):
+        self.assertEqual([self.chelak.tekshirish(1) for _ in range(3)], [(0.0, False)] * 3)
+        self.assertEqual(self.chelak.tekshirish(1), (2.0, True))
+        # Ketma-ket rad etishlarda ogohlantirish faqat birinchisida
+        self.assertEqual(self.chelak.tekshirish(1), (2.0, False))
+        # Boshqa chat cheklovga tushmaydi
+        self.assertEqual(self.chelak.tekshirish(2), (0.0, False))
+
+        self.vaqt += 2
+        self.assertEqual(self.chelak.tekshirish(1), (0.0, False))
+        self.vaqt += 60
+        # Tokenlar sig'imdan oshmaydi
+        self.assertEqual([self.chelak.tekshirish(1)[0] for _ in range(4)], [0.0, 0.0, 0.0, 2.0])
+        self.assertEqual(self.chelak.hisobot(), {'foydalanuvchilar': 2, 'ruxsat_berildi': 8, 'rad_etildi': 3})
+
+    def test_hajm_chegarasi(self):
+        self.chelak.hajm = 2
+        for kalit in (1, 2, 3):
+            self.chelak.tekshirish(kalit)
+        self.assertEqual(self.chelak.hisobot()['foydalanuvchilar'], 2)
+
+
+class StatistikaTest(TestCase):
+    def setUp(self):
+        self.statistika = StatistikaYigguvchi()
+
+    def _foydalanuvchi(self, tid):
+        return BotFoydalanuvchi.objects.get(telegram_id=tid)
+
+    def test_start_hisobi(self):
+        # Yangi foydalanuvchining /start'i hisoblanmaydi, mavjudniki — bitta so'rov
+        self.statistika.qayd_qilish(1, 'Vali', 'vali', start=True)
+        self.statistika.qayd_qilish(2, 'Ali', '')
+        self.statistika.qayd_qilish(2, 'Ali', '', start=True)
+        self.assertEqual(self.statistika.yozish(), 2)
+        self.assertEqual(self._foydalanuvchi(1).so_rovlar_soni, 0)
+        self.assertEqual(self._foydalanuvchi(2).so_rovlar_soni, 2)
+
+        self.statistika.qayd_qilish(1, 'Vali', 'vali', start=True)
+        self.statistika.qayd_qilish(1, 'Vali', 'vali')
+        self.statistika.yozish()
+        self.assertEqual(self._foydalanuvchi(1).so_rovlar_soni, 2)
+
+        kun = KunlikStatistika.objects.get()
+        self.assertEqual((kun.sorovlar, kun.yangi_foydalanuvchilar, kun.faol_foydalanuvchilar), (4, 2, 2))
+
+    def test_oxirgi_murojaat_haqiqiy_vaqt(self):
+        murojaat = timezone.now() - timedelta(minutes=3)
+        with mock.patch('kadastr_app.statistika.timezone.now', return_value=murojaat):
+            self.statistika.qayd_qilish(1, 'Vali', 'vali')
+        self.statistika.yozish()
+        self.assertEqual(self._foydalanuvchi(1).oxirgi_murojaat, murojaat)
+
+        keyingi = murojaat + timedelta(minutes=1)
+        with mock.patch('kadastr_app.statistika.timezone.now', return_value=keyingi):
+            self.statistika.qayd_qilish(1, 'Vali', 'vali')
+        self.statistika.yozish()
+        self.assertEqual(self._foydalanuvchi(1).oxirgi_murojaat, keyingi)
+
+    def test_xatoda_navbatga_qaytadi(self):
+        self.statistika.qayd_qilish(1, 'Vali', 'vali', start=True)
+        with mock.patch('kadastr_app.statistika._kunlik_statistika', side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                self.statistika.yozish()
+        self.statistika.qayd_qilish(1, 'Vali', 'vali')
+        self.statistika.yozish()
+        self.assertEqual(self._foydalanuvchi(1).so_rovlar_soni, 1)
+
+
+class JavobKeshiTest(SimpleTestCase):
+    def setUp(self):
+        self.vaqt = 1000.0
+        soat = mock.patch('kadastr_app.kesh.time.monotonic', side_effect=lambda: self.vaqt)
+        soat.start()
+        self.addCleanup(soat.stop)
+        self.kesh = JavobKeshi(hajm=2, muddat=60)
+
+    def test_belgi_ozgarsa_eskiradi(self):
+        self.kesh.qoy('a', ((1, 5),), 'javob')
+        self.assertEqual(self.kesh.ol('a', ((1, 5),)), 'javob')
+        self.assertIsNone(self.kesh.ol('a', ((1, 6),)))
+        # Eskirgan yozuv o'chiriladi — eski belgi bilan ham qaytmaydi
+        self.assertIsNone(self.kesh.ol('a', ((1, 5),)))
+
+    def test_muddat(self):
+        self.kesh.qoy('a', 1, 'javob')
+        self.vaqt += 59
+        self.assertEqual(self.kesh.ol('a', 1), 'javob')
+        self.vaqt += 1
+        self.assertIsNone(self.kesh.ol('a', 1))
+
+    def test_lru_hajm_va_tozalash(self):
+        self.kesh.qoy('a', 1, 'A')
+        self.kesh.qoy('b', 1, 'B')
+        self.kesh.ol('a', 1)
+        self.kesh.qoy('c', 1, 'C')
+        self.assertIsNone(self.kesh.ol('b', 1))
+        self.assertEqual((self.kesh.ol('a', 1), self.kesh.ol('c', 1)), ('A', 'C'))
+        self.assertEqual(self.kesh.hisobot(), {'hajm': 2, 'topildi': 3, 'topilmadi': 1, 'ulush': 0.75})
+
+        self.kesh.tozalash()
+        self.assertIsNone(self.kesh.ol('a', 1))
+        self.assertEqual(self.kesh.hisobot()['hajm'], 0)
+
+
+class KadastrKalitTest(SimpleTestCase):
+    def test_normallashtirish(self):
+        for qiymat, kutilgan in [
+            ('11:13:42:02:01:0406', '11134202010406'),
+            (' 11 13-42/02.01_0406 ', '11134202010406'),
+            ('ab-12:c', 'AB12C'),
+            ('ау:12', 'АУ12'),
+            (11134202, '11134202'),
+            (None, ''),
+            (' :-— ', ''),
+        ]:
+            with self.subTest(qiymat=qiymat):
+                self.assertEqual(kadastr_kalit(qiymat), kutilgan)
+
+
+class KalitBoyichaTest(TestCase):
+    def setUp(self):
+        nomlar = dict(
+            viloyat=Viloyat.objects.create(nomi='V'), tuman=Tuman.objects.create(nomi='T'),
+            mfy=Mfy.objects.create(nomi='M'), kocha=Kocha.objects.create(nomi='K'),
+        )
+        upload = ExcelUpload.objects.create()
+        for raqam in ('11:13:04', '11:13:0406', '11:13:0407', '11:14'):
+            KadastrMalumat.objects.create(excel_fayl=upload, kadastr_raqami=raqam, **nomlar)
+
+    def _raqamlar(self, matn):
+        return sorted(KadastrMalumat.objects.kalit_boyicha(matn).values_list('kadastr_raqami', flat=True))
+
+    def test_avval_aniq_keyin_prefiks(self):
+        self.assertEqual(self._raqamlar('11-13-04'), ['11:13:04'])
+        self.assertEqual(self._raqamlar('11 13 040'), ['11:13:0406', '11:13:0407'])
+        self.assertEqual(self._raqamlar('1113'), ['11:13:04', '11:13:0406', '11:13:0407'])
+        self.assertEqual(self._raqamlar('12'), [])
+        self.assertEqual(self._raqamlar('::'), [])
+
+
+class _MigratsiyaTest(TransactionTestCase):
+    """`oldin` holatidagi sxemada ma'lumot yaratib, `keyin` migratsiyasini tekshiradi"""
+    oldin = keyin = None
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(self._migratsiya, None)
+        self.apps = self._migratsiya(self.oldin)
+
+    def _migratsiya(self, nomi):
+        executor = MigrationExecutor(connection)
+        maqsad = [('kadastr_app', nomi)] if nomi else executor.loader.graph.leaf_nodes('kadastr_app')
+        executor.migrate(maqsad)
+        return executor.loader.project_state(maqsad).apps
+
+    def migratsiya_qilish(self):
+        self.apps = self._migratsiya(self.keyin)
+        return self.apps
+
+
+class KalitMigratsiyasiTest(_MigratsiyaTest):
+    oldin = '0003_obyektexcelupload_alter_excelupload_options_and_more'
+    keyin = '0004_kadastr_kalit'
+
+    def test_kalitlar_toldiriladi(self):
+        Upload = self.apps.get_model('kadastr_app', 'ExcelUpload')
+        Malumat = self.apps.get_model('kadastr_app', 'KadastrMalumat')
+        upload = Upload.objects.create(fayl='x.xlsx')
+        for raqam in ('11:13:42-04', 'ab 12', ''):
+            Malumat.objects.create(excel_fayl=upload, kadastr_raqami=raqam)
+
+        Malumat = self.migratsiya_qilish().get_model('kadastr_app', 'KadastrMalumat')
+        self.assertEqual(
+            sorted(Malumat.objects.values_list('kadastr_raqami', 'kadastr_kalit')),
+            [('', ''), ('11:13:42-04', '11134204'), ('ab 12', 'AB12')],
+        )
+
+
+class NomKeshiTest(_MediaMixin, TestCase):
+    def test_nomlar_bir_marta_saqlanadi(self):
+        mavjud = Tuman.objects.create(nomi='Zangiota tumani')
+        kesh = NomKeshi(Tuman)
+        # Kesh yaratilgandan keyin boshqa import qo'shgan nom ham takrorlanmaydi
+        parallel = Tuman.objects.create(nomi='Qibray tumani')
+        with self.assertNumQueries(2):
+            kesh.hal_qilish(['Zangiota tumani', 'Qibray tumani', 'Chirchiq', 'Chirchiq'])
+        self.assertEqual(Tuman.objects.count(), 3)
+        self.assertEqual((kesh['Zangiota tumani'], kesh['Qibray tumani']), (mavjud, parallel))
+        with self.assertNumQueries(0):
+            kesh.hal_qilish(['Chirchiq', 'Zangiota tumani'])
+        self.assertEqual(kesh['Chirchiq'].nomi, 'Chirchiq')
+
+    def test_import_nomlarni_lugatga_yozadi(self):
+        upload = ExcelUpload.objects.create()
+        upload.fayl.save('nomlar.xlsx', ContentFile(_xlsx([_tolov_qatori(f'11:0{i}') for i in range(3)])))
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=ImportJob.BAJARILMOQDA)
+        upload.refresh_from_db()
+        self.assertTrue(vazifani_bajarish(job))
+
+        self.assertEqual([m.objects.count() for m in (Viloyat, Tuman, Mfy)], [1, 1, 1])
+        self.assertEqual(
+            set(KadastrMalumat.objects.faol().values_list('viloyat__nomi', 'tuman__nomi', 'mfy__nomi')),
+            {('Toshkent viloyati', 'Zangiota tumani', "Navro'z")},
+        )
+
+        # Lug'atdagi nom o'zgarsa FTS ham (trigger orqali) yangilanadi
+        Mfy.objects.update(nomi='Yangi hayot')
+        self.assertEqual(KadastrMalumat.objects.matn_boyicha('yangi hay').count(), 3)
+        self.assertEqual(KadastrMalumat.objects.matn_boyicha("navro'z").count(), 0)
+
+    def test_kocha_nomi_ftsda_yangilanadi(self):
+        kocha = Kocha.objects.create(nomi="Bog' ko'chasi")
+        KadastrMalumat.objects.create(
+            excel_fayl=ExcelUpload.objects.create(), kadastr_raqami='11:01', kocha=kocha,
+            viloyat=Viloyat.objects.create(nomi='V'), tuman=Tuman.objects.create(nomi='T'),
+            mfy=Mfy.objects.create(nomi='M'),
+        )
+        self.assertEqual(KadastrMalumat.objects.matn_boyicha("bog' ko", ['kocha']).count(), 1)
+        Kocha.objects.filter(pk=kocha.pk).update(nomi='Amir Temur')
+        self.assertEqual(KadastrMalumat.objects.matn_boyicha("bog' ko", ['kocha']).count(), 0)
+        self.assertEqual(KadastrMalumat.objects.matn_boyicha('amir tem', ['kocha']).count(), 1)
+
+
+class NomlarMigratsiyasiTest(_MigratsiyaTest):
+    oldin = '0013_holat_kodi'
+    keyin = '0014_hudud_nomlari'
+
+    def test_matnlar_lugatga_kochadi(self):
+        Upload = self.apps.get_model('kadastr_app', 'ExcelUpload')
+        Malumat = self.apps.get_model('kadastr_app', 'KadastrMalumat')
+        ObyektUpload = self.apps.get_model('kadastr_app', 'ObyektExcelUpload')
+        Obyekt = self.apps.get_model('kadastr_app', 'ObyektMalumat')
+        upload = Upload.objects.create(fayl='x.xlsx')
+        for raqam, mfy in (('11:01', "Navro'z"), ('11:02', "Navro'z"), ('11:03', 'Bahor')):
+            Malumat.objects.create(
+                excel_fayl=upload, kadastr_raqami=raqam, viloyat='Toshkent', tuman='Zangiota', mfy=mfy, kocha="Bog'",
+            )
+        Obyekt.objects.create(
+            excel_fayl=ObyektUpload.objects.create(fayl='y.xlsx'), kadastr_raqami='11:01',
+            viloyat='Toshkent', tuman='Qibray', mfy='Bahor',
+        )
+
+        apps = self.migratsiya_qilish()
+        self.assertEqual(
+            {m: sorted(apps.get_model('kadastr_app', m).objects.values_list('nomi', flat=True))
+             for m in ('Viloyat', 'Tuman', 'Mfy', 'Kocha')},
+            {'Viloyat': ['Toshkent'], 'Tuman': ['Qibray', 'Zangiota'], 'Mfy': ['Bahor', "Navro'z"], 'Kocha': ["Bog'"]},
+        )
+        self.assertEqual(
+            sorted(apps.get_model('kadastr_app', 'KadastrMalumat').objects.values_list('kadastr_raqami', 'mfy__nomi')),
+            [('11:01', "Navro'z"), ('11:02', "Navro'z"), ('11:03', 'Bahor')],
+        )
+        self.assertEqual(
+            list(apps.get_model('kadastr_app', 'ObyektMalumat').objects.values_list('tuman__nomi', 'mfy__nomi')),
+            [('Qibray', 'Bahor')],
+        )
+
+
+class KadastrIndeksTest(_MediaMixin, TestCase):
+    """Xotiradagi indeks va bazadagi (KADASTR_XOTIRA_INDEKSI=False) qidiruv bir xil natija beradi"""
+
+    RAQAMLAR = ['11:13:42:02:01:0406', '11:13:42:02:01:0407', '11:13:42:02:01:04', '22:01:05']
+
+    def setUp(self):
+        super().setUp()
+        self.upload = ExcelUpload.objects.create()
+        self._import([_tolov_qatori(r) for r in self.RAQAMLAR])
+
+    def _import(self, qatorlar):
+        self.upload.fayl.save('indeks.xlsx', ContentFile(_xlsx(qatorlar)))
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=self.upload, holat=ImportJob.BAJARILMOQDA)
+        self.upload.refresh_from_db()
+        self.assertTrue(vazifani_bajarish(job))
+
+    def _qidirish(self, matn, chegara=None):
+        """Ikkala rejimda qidirib, natijani kadastr raqamlari bilan qaytaradi"""
+        natijalar = []
+        for xotira in (True, False):
+            with self.settings(KADASTR_XOTIRA_INDEKSI=xotira):
+                jami, idlar = KadastrIndeks(KadastrMalumat).qidirish(matn, chegara)
+            raqamlar = dict(KadastrMalumat.objects.filter(pk__in=idlar).values_list('pk', 'kadastr_raqami'))
+            natijalar.append((jami, [raqamlar[pk] for pk in idlar]))
+        self.assertEqual(natijalar[0], natijalar[1])
+        return natijalar[0]
+
+    def test_aniq_moslik_prefiksdan_ustun(self):
+        self.assertEqual(self._qidirish('11-13-42-02-01-04'), (1, ['11:13:42:02:01:04']))
+
+    def test_prefiks(self):
+        self.assertEqual(
+            self._qidirish('11 13 42 02 01 040'), (2, ['11:13:42:02:01:0406', '11:13:42:02:01:0407'])
+        )
+
+    def test_chegara(self):
+        jami, raqamlar = self._qidirish('1113', chegara=2)
+        self.assertEqual(jami, 3)
+        self.assertEqual(raqamlar, ['11:13:42:02:01:04', '11:13:42:02:01:0406'])
+
+    def test_qism_satr_fts_orqali(self):
+        self.assertEqual(self._qidirish('42020104 07'), (1, ['11:13:42:02:01:0407']))
+        # Trigramdan qisqa qism-satr qidirilmaydi
+        self.assertEqual(self._qidirish('05'), (0, []))
+
+    def test_topilmadi_va_bosh_matn(self):
+        self.assertEqual(self._qidirish('99:99'), (0, []))
+        self.assertEqual(self._qidirish(' - '), (0, []))
+
+    def test_faqat_faol_versiya(self):
+        self._import([_tolov_qatori('22:01:05'), _tolov_qatori('33:01')])
+        self.assertEqual(self._qidirish('2201'), (1, ['22:01:05']))
+        self.assertEqual(self._qidirish('1113'), (0, []))
+        self.assertEqual(self._qidirish('33 01'), (1, ['33:01']))
+
+
+@override_settings(KADASTR_XOTIRA_INDEKSI=False, KADASTR_INDEKS_TEKSHIRISH=3600)
+class IndeksBelgisiTest(_MediaMixin, TestCase):
+    """Yangi versiya faollashgach javob keshi tekshirish oralig'ini kutmasdan eskiradi"""
+
+    def _import(self, upload):
+        upload.fayl.save('belgi.xlsx', ContentFile(_xlsx([_tolov_qatori('11:01')])))
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, holat=ImportJob.BAJARILMOQDA)
+        upload.refresh_from_db()
+        self.assertTrue(vazifani_bajarish(job))
+        return job
+
+    def test_faollashtirish_belgini_darhol_eskirtiradi(self):
+        upload = ExcelUpload.objects.create()
+        eski = self._import(upload)
+        indeks = KadastrIndeks(KadastrMalumat)
+        indeks.qidirish('11:01')
+        self.assertEqual(indeks.belgi, ((upload.pk, eski.pk),))
+
+        kesh = JavobKeshi()
+        kesh.qoy('11:01', indeks.belgi, 'eski javob')
+        yangi = self._import(upload)
+
+        self.assertIsNone(indeks.belgi)
+        self.assertIsNone(kesh.ol('11:01', indeks.belgi))
+        self.assertEqual(indeks.qidirish('11:01')[0], 1)
+        self.assertEqual(indeks.belgi, ((upload.pk, yangi.pk),))
+        self.assertIsNone(kesh.ol('11:01', indeks.belgi))
+
+    def test_qidiruv_paytida_faollashtirish(self):
+        upload = ExcelUpload.objects.create()
+        self._import(upload)
+        indeks = KadastrIndeks(KadastrMalumat)
+        indeks.qidirish('11:01')
+        kesh = JavobKeshi()
+
+        # Belgi qidiruvdan oldin olinadi, yangi versiya javob saqlanishidan oldin faollashadi
+        belgi = indeks.belgi
+        self._import(upload)
+        kesh.qoy('11:01', belgi, 'eski javob')
+        self.assertIsNone(kesh.ol('11:01', indeks.belgi))
+        indeks.qidirish('11:01')
+        self.assertIsNone(kesh.ol('11:01', indeks.belgi))
+
+        # Eskirgan (None) belgi ostida hech narsa saqlanmaydi va topilmaydi
+        self._import(upload)
+        kesh.qoy('11:02', indeks.belgi, 'eski javob')
+        self.assertIsNone(kesh.ol('11:02', None))
+        self.assertEqual(kesh.hisobot()['hajm'], 0)
+
+
+class BoshSahifaTest(TestCase):
+    """Boshqaruv paneli ETag bo'yicha keshlanadi va 304 qaytaradi"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_etag_va_kesh(self):
+        BotFoydalanuvchi.objects.create(telegram_id=1)
+        ExcelUpload.objects.create()
+        ObyektExcelUpload.objects.create()
+
+        with mock.patch('kadastr_app.views.render_to_string', wraps=views.render_to_string) as chizish:
+            javob = self.client.get('/')
+            self.assertEqual(javob.status_code, 200)
+            self.assertEqual(chizish.call_count, 1)
+            kontekst = chizish.call_args.args[1]
+            self.assertEqual((kontekst['jami_foydalanuvchilar'], kontekst['jami_fayllar']), (1, 1))
+            etag = javob['ETag']
+
+            self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            # ETag'siz so'rov ham qayta chizilmaydi — HTML keshdan
+            self.assertEqual(self.client.get('/').content, javob.content)
+            self.assertEqual(chizish.call_count, 1)
+
+            # Foydalanuvchi o'chirilishi ham panelni eskirtiradi
+            BotFoydalanuvchi.objects.all().delete()
+            yangi = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(yangi.status_code, 200)
+            self.assertNotEqual(yangi['ETag'], etag)
+            self.assertEqual(chizish.call_args.args[1]['jami_foydalanuvchilar'], 0)
+
+
+class ImportHolatiAdminTest(TestCase):
+    """Import davomida forma qayta yuklanmaydi — faqat holat maydoni so'rab turiladi"""
+
+    def test_holat_qismi(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'a@a.uz', 'parol'))
+        upload = ExcelUpload.objects.create()
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload)
+        manzil = f'/admin/kadastr_app/excelupload/{upload.pk}/import-holati/'
+
+        sahifa = self.client.get(f'/admin/kadastr_app/excelupload/{upload.pk}/change/')
+        self.assertEqual(sahifa.status_code, 200)
+        self.assertNotContains(sahifa, 'http-equiv="refresh"')
+        self.assertContains(sahifa, manzil)
+
+        holat = self.client.get(manzil).json()
+        self.assertTrue(holat['faol'])
+        self.assertIn('Navbatda', holat['html'])
+
+        ImportJob.objects.filter(pk=job.pk).update(holat=ImportJob.TUGADI)
+        self.assertFalse(self.client.get(manzil).json()['faol'])
+        self.assertNotContains(self.client.get(f'/admin/kadastr_app/excelupload/{upload.pk}/change/'), manzil)
+        self.assertEqual(self.client.get('/admin/kadastr_app/excelupload/999999/import-holati/').status_code, 404)
+
+
+@override_settings(METRIKA_TOKEN='')
+class MetrikaRuxsatiTest(SimpleTestCase):
+    """Token bo'lmasa /metrics faqat loopback'dan ochiladi"""
+
+    def test_tokensiz_faqat_mahalliy(self):
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='127.0.0.1').status_code, 200)
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='::1').status_code, 200)
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='10.0.0.5').status_code, 403)
+
+    @override_settings(METRIKA_TOKEN='maxfiy')
+    def test_token_bilan(self):
+        self.assertEqual(self.client.get('/metrics/', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        javob = self.client.get('/metrics/', REMOTE_ADDR='10.0.0.5', HTTP_AUTHORIZATION='Bearer maxfiy')
+        self.assertEqual(javob.status_code, 200)
+
+    def test_bot_serveri_tokensiz_tashqi_manzilda_ochilmaydi(self):
+        from bot.metrikalar import server_ishga_tushirish
+
+        with self.assertRaises(ImproperlyConfigured):
+            server_ishga_tushirish(0, '0.0.0.0')
+
+        server = server_ishga_tushirish(0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.assertEqual(server.server_address[0], '127.0.0.1')
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/metrics', timeout=5) as javob:
+            self.assertEqual(javob.status, 200)
+
+
+class YagonaSorovTest(SimpleTestCase):
+    def test_bir_xil_sorovlar_birlashadi(self):
+        from bot.cheklov import YagonaSorov
+
+        yagona = YagonaSorov()
+        chaqiruvlar = []
+
+        async def qidirish(raqam):
+            chaqiruvlar.append(raqam)
+            await asyncio.sleep(0.01)
+            return raqam.upper()
+
+        async def ish():
+            natijalar = await asyncio.gather(*(yagona.bajarish(r, qidirish, r) for r in ['a', 'a', 'b', 'a']))
+            # Tugagandan keyin kalit yana bajariladi (natija keshlanmaydi)
+            natijalar.append(await yagona.bajarish('a', qidirish, 'a'))
+            return natijalar
+
+        self.assertEqual(asyncio.run(ish()), ['A', 'A', 'B', 'A', 'A'])
+        self.assertEqual(chaqiruvlar, ['a', 'b', 'a'])
+        self.assertEqual(yagona.hisobot(), {'jarayonda': 0, 'bajarildi': 3, 'birlashtirildi': 2})
+
+    def test_xato_va_bekor_qilish(self):
+        from bot.cheklov import YagonaSorov
+
+        yagona = YagonaSorov()
+
+        async def xato():
+            await asyncio.sleep(0.01)
+            raise ValueError('baza')
+
+        async def sekin():
+            await asyncio.sleep(0.05)
+            return 'ok'
+
+        async def ish():
+            natijalar = await asyncio.gather(
+                yagona.bajarish('x', xato), yagona.bajarish('x', xato), return_exceptions=True
+            )
+            self.assertEqual([type(n) for n in natijalar], [ValueError, ValueError])
+
+            # Bitta kutuvchi bekor qilinsa, qolganlari natijani oladi
+            birinchi = asyncio.ensure_future(yagona.bajarish('y', sekin))
+            ikkinchi = asyncio.ensure_future(yagona.bajarish('y', sekin))
+            await asyncio.sleep(0)
+            birinchi.cancel()
+            self.assertEqual(await ikkinchi, 'ok')
+
+        asyncio.run(ish())
+
+
+class OmmaviyRaqamlarTest(SimpleTestCase):
+    def test_matn_takrorlari(self):
+        from bot.ommaviy import matndan_raqamlar
+
+        matn = '11:13:42:02:01:0406\n\n  11 13 42 02 01 0406 \n11-13-42-02-01-0407\n---\n11:13:42:02:01:0406'
+        self.assertEqual(matndan_raqamlar(matn), ['11:13:42:02:01:0406', '11-13-42-02-01-0407'])
+
+    def test_csv_dialekti_va_sarlavha(self):
+        from bot.ommaviy import fayldan_raqamlar
+
+        for nomi, matn, kodlash in [
+            ('a.csv', '№;Kadastr raqami;FIO\n1;11:01:0001;Ali\n2;11:01:0002;Vali\n3;11 01 0001;Ali\n', 'utf-8-sig'),
+            ('b.CSV', 'Kadastr\tIzoh\n11:01:0001\tx\n11:01:0002\ty\n', 'utf-8'),
+            ('c.csv', 'Кадастр,Kadastr raqami\nТошкент,11:01:0001\nТошкент,11:01:0002\n', 'cp1251'),
+        ]:
+            with self.subTest(nomi=nomi):
+                self.assertEqual(fayldan_raqamlar(nomi, matn.encode(kodlash)), ['11:01:0001', '11:01:0002'])
+
+    def test_sarlavhasiz_fayllar(self):
+        from bot.ommaviy import fayldan_raqamlar
+
+        self.assertEqual(fayldan_raqamlar('a.csv', b'11:01:0001\n11:01:0002\n'), ['11:01:0001', '11:01:0002'])
+
+        wb = Workbook()
+        wb.active.append([110010001, 'izoh'])
+        wb.active.append([None, None])
+        wb.active.append(['11:00:10002', 'izoh'])
+        fayl = io.BytesIO()
+        wb.save(fayl)
+        self.assertEqual(fayldan_raqamlar('a.xlsx', fayl.getvalue()), ['110010001', '11:00:10002'])
+
+    def test_xlsx_sarlavhasi(self):
+        from bot.ommaviy import fayldan_raqamlar
+
+        wb = Workbook()
+        wb.active.append(['№', 'KADASTR RAQAMI'])
+        wb.active.append([1, '11:01:0001'])
+        wb.active.append([2, '11:01:0001'])
+        fayl = io.BytesIO()
+        wb.save(fayl)
+        self.assertEqual(fayldan_raqamlar('a.xlsx', fayl.getvalue()), ['11:01:0001'])
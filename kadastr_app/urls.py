@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.bosh_sahifa, name='bosh_sahifa'),
+    path('metrics/', views.metrikalar_sahifasi, name='metrikalar'),
 ]
@@ -0,0 +1,272 @@
+"""
+Fon rejimidagi Excel import vazifalari.
+
+Admin faylni saqlaganda import darhol bajarilmaydi — ImportJob navbatga
+qo'yiladi va HTTP so'rov shu zahoti qaytadi. Vazifalarni ishchi bajaradi:
+  - IMPORT_ISHCHI = 'thread' — web jarayon ichidagi fon oqimi (standart);
+  - IMPORT_ISHCHI = 'command' — alohida jarayon: python manage.py import_ishchi
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from . import metrikalar
+from .excel_utils import USTUNLAR, excel_faylni_o_qi, farq_asosi, farqni_qollash, obyekt_excel_o_qi, varaq_oqimi
+from .indeks import versiya_ozgardi
+from .models import ExcelUpload, ImportJob, KadastrMalumat, ObyektMalumat, IMPORT_FARQ
+from .xulosa import obyekt_xulosasini_yangilash, tuman_xulosasini_yangilash
+
+logger = logging.getLogger(__name__)
+
+_ishchi_qulf = threading.Lock()
+
+
+def import_navbatga_qoyish(upload, qayta_import=False):
+    """Yuklangan fayl uchun import vazifasini yaratadi va ishchini uyg'otadi"""
+    if isinstance(upload, ExcelUpload):
+        job = ImportJob.objects.create(tur=ImportJob.TUR_TOLOV, excel_fayl=upload, qayta_import=qayta_import)
+    else:
+        job = ImportJob.objects.create(tur=ImportJob.TUR_OBYEKT, obyekt_fayl=upload, qayta_import=qayta_import)
+
+    if getattr(settings, 'IMPORT_ISHCHI', 'thread') == 'thread':
+        # Admin so'rovi tranzaksiyasi yopilgandan keyin — aks holda ishchi vazifani ko'rmaydi
+        transaction.on_commit(_oqim_ishga_tushirish)
+    return job
+
+
+def _oqim_ishga_tushirish():
+    threading.Thread(target=_oqim_ishchisi, name='import-ishchi', daemon=True).start()
+
+
+def _oqim_ishchisi():
+    try:
+        with _ishchi_qulf:
+            osilib_qolganlarni_tiklash()
+            navbatni_bajarish()
+    finally:
+        connection.close()
+
+
+def vazifani_olish():
+    """Navbatdagi eng eski vazifani band qiladi (bir nechta ishchi bo'lsa ham faqat bittasi oladi)"""
+    joblar = vazifalarni_olish(1)
+    return joblar[0] if joblar else None
+
+
+def vazifalarni_olish(soni):
+    """Navbatdagi eng eski `soni` tagacha vazifani band qiladi"""
+    joblar = []
+    for job in ImportJob.objects.filter(holat=ImportJob.KUTMOQDA).order_by('yaratilgan', 'id')[:soni + 10]:
+        band_qilindi = ImportJob.objects.filter(pk=job.pk, holat=ImportJob.KUTMOQDA).update(
+            holat=ImportJob.BAJARILMOQDA, boshlangan=timezone.now(), ishchi=_ishchi_belgisi()
+        )
+        if band_qilindi:
+            job.refresh_from_db()
+            joblar.append(job)
+            if len(joblar) == soni:
+                break
+    return joblar
+
+
+def _ishchi_belgisi():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _ishchi_tirik(belgi):
+    """Vazifani band qilgan jarayon hali ishlayaptimi (boshqa serverdagisi — noma'lum, True)"""
+    host, _, pid = belgi.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    if int(pid) == os.getpid():
+        # Chaqiruvchi shu jarayonning yagona ishchisi — bu vazifa o'lgan oqimdan qolgan
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def osilib_qolganlarni_tiklash():
+    """
+    Ishchisi o'lgan yoki IMPORT_VAZIFA_MUDDATI dan uzoq bajarilayotgan
+    vazifalarni XATO qiladi va yarim yozilgan versiyasini o'chiradi.
+    Ishchi ishga tushganda, vazifa olishdan oldin chaqiriladi.
+    """
+    chegara = timezone.now() - timedelta(seconds=getattr(settings, 'IMPORT_VAZIFA_MUDDATI', 6 * 3600))
+    soni = 0
+    for job in ImportJob.objects.filter(holat=ImportJob.BAJARILMOQDA):
+        eskirgan = job.boshlangan is None or job.boshlangan < chegara
+        if not eskirgan and _ishchi_tirik(job.ishchi):
+            continue
+        logger.warning("Vazifa #%s osilib qolgan (ishchi: %s) — XATO deb belgilanadi", job.pk, job.ishchi or '?')
+        _xato_bilan_yakunlash(job, "Ishchi jarayon to'xtab qoldi — faylni qayta saqlang")
+        soni += 1
+    return soni
+
+
+def _import_modeli(job):
+    if job.tur == ImportJob.TUR_TOLOV:
+        return KadastrMalumat, excel_faylni_o_qi
+    return ObyektMalumat, obyekt_excel_o_qi
+
+
+def eski_versiyalarni_tozalash(model, upload, paket_hajmi=5000):
+    """
+    Upload'ning faol versiyadan eski versiyalaridagi qatorlarni kichik paketlar
+    bilan o'chiradi — uzoq yozish qulfi o'qiyotganlarni to'xtatib qo'ymasligi
+    uchun. Boshqa ishchi hali yozayotgan versiyalarga tegilmaydi. Faol
+    versiyasi yo'q (almashtirilgan) upload'ning barcha qatorlari o'chiriladi.
+    """
+    bajarilmoqda = ImportJob.objects.filter(holat=ImportJob.BAJARILMOQDA).values('pk')
+    qs = model.objects.filter(excel_fayl=upload).exclude(versiya__in=bajarilmoqda)
+    if upload.faol_versiya is not None:
+        qs = qs.filter(versiya__lt=upload.faol_versiya)
+    ochirildi = 0
+    while True:
+        idlar = list(qs.values_list('id', flat=True)[:paket_hajmi])
+        if not idlar:
+            return ochirildi
+        model.objects.filter(pk__in=idlar).delete()
+        ochirildi += len(idlar)
+
+
+def vazifani_bajarish(job, oqim=None):
+    """
+    Bitta import vazifasini bajaradi; natija yoki xato ImportJob'ga yoziladi.
+
+    Qatorlar versiya = job.pk bilan yoziladi (bot uchun ko'rinmas). Import
+    muvaffaqiyatli tugasa upload.faol_versiya bitta UPDATE bilan yangi
+    versiyaga o'tkaziladi, eski versiya esa keyin tozalanadi. Xato bo'lsa
+    faqat yangi (yarim yozilgan) qatorlar o'chiriladi — eski ma'lumot faolligicha qoladi.
+
+    Farq bo'yicha rejimda o'zgargan va olib tashlangan qatorlar ham shu
+    faollashtirish tranzaksiyasi ichida yoziladi. Fayl varaqlari `oqim`
+    (VaraqOqimi) jarayonlarida o'qiladi, bazaga faqat shu jarayon yozadi.
+    """
+    upload = job.upload
+    upload_model = type(upload)
+    farq = upload.import_rejimi == IMPORT_FARQ
+    model, import_funksiya = _import_modeli(job)
+
+    def progress(natija):
+        ImportJob.objects.filter(pk=job.pk).update(qatorlar_soni=natija.soni, tezlik=natija.tezlik)
+
+    boshlanish = time.monotonic()
+    try:
+        natija = import_funksiya(upload, job.pk, progress=progress, farq=farq, oqim=oqim)
+        with transaction.atomic():
+            if farq:
+                farqni_qollash(model, natija)
+                # Qolgan asos qatorlari (almashtirilgan fayldagilari ham) shu upload'ning yangi versiyasiga o'tadi
+                farq_asosi(model, upload).update(excel_fayl=upload, versiya=job.pk)
+                if upload.almashtiriladi_id:
+                    upload_model.objects.filter(pk=upload.almashtiriladi_id).update(faol_versiya=None, yozuvlar_soni=0)
+            upload_model.objects.filter(pk=upload.pk).update(faol_versiya=job.pk, yozuvlar_soni=natija.soni)
+            # Xulosa faqat faol qatorlarni o'qiydi: eski versiya tozalanishini kutmaydi
+            # va yangi qatorlar bilan bir vaqtda ko'rinadi
+            if model is KadastrMalumat:
+                tuman_xulosasini_yangilash()
+            else:
+                obyekt_xulosasini_yangilash()
+            ImportJob.objects.filter(pk=job.pk).update(
+                holat=ImportJob.TUGADI, qatorlar_soni=natija.soni, tezlik=natija.tezlik,
+                qoshildi=natija.qoshildi, ozgardi=natija.ozgardi,
+                ozgarmadi=natija.ozgarmadi, olib_tashlandi=natija.olib_tashlandi,
+                summa_xatolari=natija.summa_xatolari, takroriy_kalitlar=natija.takroriy_kalitlar,
+                varaqlar=natija.varaqlar, tugagan=timezone.now()
+            )
+    except Exception as e:
+        logger.exception("Import vazifasi #%s xato bilan tugadi", job.pk)
+        metrikalar.import_vaqti.kuzatish(time.monotonic() - boshlanish, tur=job.tur, holat=ImportJob.XATO)
+        _xato_bilan_yakunlash(job, e)
+        return False
+
+    for varaq in natija.varaqlar:
+        logger.info("Vazifa #%s: %s — %d ta qator (%.2f s)", job.pk, varaq['varaq'], varaq['qatorlar'], varaq['soniya'])
+    logger.info(
+        "Vazifa #%s: %d ta varaq, %d ta qator, %.0f qator/s",
+        job.pk, len(natija.varaqlar), natija.soni, natija.tezlik
+    )
+
+    # Bot jarayonlaridagi javob keshi 30 s kutmasdan eskiradi
+    versiya_ozgardi()
+
+    # Versiya allaqachon faol: bu yerdagi xato vazifani XATO qilmaydi, qolgan
+    # eski qatorlar keyingi importda tozalanadi
+    try:
+        upload.faol_versiya = job.pk
+        ochirildi = eski_versiyalarni_tozalash(model, upload)
+        if farq and upload.almashtiriladi_id:
+            upload.almashtiriladi.faol_versiya = None
+            ochirildi += eski_versiyalarni_tozalash(model, upload.almashtiriladi)
+        logger.info("Vazifa #%s: versiya faollashtirildi, %d ta eski qator tozalandi", job.pk, ochirildi)
+    except Exception:
+        logger.exception("Vazifa #%s: faollashtirishdan keyingi tozalash bajarilmadi", job.pk)
+
+    metrikalar.import_vaqti.kuzatish(time.monotonic() - boshlanish, tur=job.tur, holat=ImportJob.TUGADI)
+    metrikalar.import_qatorlari.qosh(natija.soni, tur=job.tur)
+    metrikalar.import_tezligi.kuzatish(natija.tezlik, tur=job.tur)
+    return True
+
+
+def _xato_bilan_yakunlash(job, xato):
+    """Vazifaning yarim yozilgan versiyasini o'chiradi va uni XATO holatiga o'tkazadi"""
+    model, _ = _import_modeli(job)
+    model.objects.filter(excel_fayl=job.upload, versiya=job.pk).delete()
+    ImportJob.objects.filter(pk=job.pk).update(
+        holat=ImportJob.XATO, xato_matni=str(xato), tugagan=timezone.now()
+    )
+
+
+def _navbatga_qaytarish(joblar):
+    """Band qilingan, lekin boshlanmagan vazifalarni navbatga qaytaradi"""
+    if joblar:
+        ImportJob.objects.filter(pk__in=[j.pk for j in joblar], holat=ImportJob.BAJARILMOQDA).update(
+            holat=ImportJob.KUTMOQDA, boshlangan=None
+        )
+
+
+def navbatni_bajarish():
+    """
+    Navbat bo'shaguncha vazifalarni bajaradi; bajarilganlar sonini qaytaradi.
+
+    Bir vaqtda bir nechta fayl yuklangan bo'lsa, ularning varaqlari bitta
+    jarayonlar pulida birga o'qila boshlaydi; bazaga esa vazifalar navbat
+    tartibida, ketma-ket yoziladi.
+    """
+    soni = 0
+    with varaq_oqimi() as oqim:
+        while True:
+            close_old_connections()
+            joblar = vazifalarni_olish(oqim.jarayonlar)
+            if not joblar:
+                return soni
+            for job in joblar:
+                model, _ = _import_modeli(job)
+                try:
+                    oqim.qoshish(job.upload.fayl.path, *USTUNLAR[model])
+                except Exception:
+                    # Fayl o'qilmasa xato vazifaning o'zida qayd qilinadi
+                    logger.warning("Vazifa #%s fayli oldindan navbatga qo'yilmadi", job.pk, exc_info=True)
+            for i, job in enumerate(joblar):
+                try:
+                    vazifani_bajarish(job, oqim)
+                except Exception as e:
+                    # Xatoni yozishning o'zi ham muvaffaqiyatsiz bo'lgan (masalan, baza qulflangan)
+                    logger.exception("Vazifa #%s yakunlanmadi", job.pk)
+                    try:
+                        _xato_bilan_yakunlash(job, e)
+                    finally:
+                        _navbatga_qaytarish(joblar[i + 1:])
+                    raise
+                soni += 1
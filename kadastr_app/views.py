@@ -1,11 +1,57 @@
-from django.shortcuts import render
-from .models import KadastrMalumat, BotFoydalanuvchi, ExcelUpload
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.loader import render_to_string
+from django.views.decorators.http import condition, require_GET
 
+from . import metrikalar, xulosa
+from .summa import summa_matni
 
+# Belgi o'zgarmasa ham eski sahifalar keshda cheksiz qolib ketmasin
+PANEL_KESH_MUDDATI = 24 * 60 * 60
+
+
+def _foiz(qism, jami):
+    return round(qism * 100 / jami, 1) if jami else 0
+
+
+def _panel_konteksti():
+    panel = xulosa.boshqaruv_paneli()
+    for tuman in panel['tumanlar']:
+        tuman['tolangan_summa_matn'] = summa_matni(tuman['tolangan_summa'])
+        tuman['tolanmagan_summa_matn'] = summa_matni(tuman['tolanmagan_summa'])
+    jami_obyekt = sum(h['soni'] for h in panel['obyekt_holatlari'])
+    for holat in panel['obyekt_holatlari']:
+        holat['foiz'] = _foiz(holat['soni'], jami_obyekt)
+    for kun in panel['kunlik']:
+        kun['foiz'] = _foiz(kun['sorovlar'], panel['kunlik_eng_kop'])
+    panel['jami_obyektlar'] = jami_obyekt
+    panel['jami_tolangan_summa_matn'] = summa_matni(panel['jami_tolangan_summa'])
+    panel['jami_tolanmagan_summa_matn'] = summa_matni(panel['jami_tolanmagan_summa'])
+    return panel
+
+
+def _panel_etagi(request):
+    request.panel_belgisi = xulosa.panel_belgisi()
+    return request.panel_belgisi
+
+
+@condition(etag_func=_panel_etagi)
 def bosh_sahifa(request):
-    context = {
-        'jami_yozuvlar': KadastrMalumat.objects.count(),
-        'jami_foydalanuvchilar': BotFoydalanuvchi.objects.count(),
-        'jami_fayllar': ExcelUpload.objects.count(),
-    }
-    return render(request, 'kadastr_app/bosh_sahifa.html', context)
+    """
+    Boshqaruv paneli. Ma'lumot faqat xulosa jadvallaridan olinadi; tayyor HTML
+    panel belgisi (ETag) bo'yicha keshlanadi, o'zgarmagan bo'lsa brauzerga 304.
+    """
+    kalit = f'bosh_sahifa:{request.panel_belgisi}'
+    html = cache.get(kalit)
+    if html is None:
+        html = render_to_string('kadastr_app/bosh_sahifa.html', _panel_konteksti())
+        cache.set(kalit, html, PANEL_KESH_MUDDATI)
+    return HttpResponse(html)
+
+
+@require_GET
+def metrikalar_sahifasi(request):
+    """Prometheus uchun metrikalar (webhook rejimidagi bot ham shu jarayonda)"""
+    if not metrikalar.ruxsat_bor(request.headers.get('Authorization', ''), request.META.get('REMOTE_ADDR', '')):
+        return HttpResponseForbidden()
+    return HttpResponse(metrikalar.matn(), content_type=metrikalar.MATN_TURI)
@@ -0,0 +1,156 @@
+import hashlib
+import logging
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from .holat import ObyektHolati, TolovHolati
+from .indeks import tolov_indeks
+from .models import (
+    BotFoydalanuvchi, ExcelUpload, KadastrMalumat, KunlikStatistika, ObyektExcelUpload, ObyektHolatXulosa,
+    ObyektMalumat, Tuman, TumanXulosa, Viloyat,
+)
+from .summa import somga
+
+logger = logging.getLogger(__name__)
+
+TOLANMAGAN_Q = Q(holat_kodi=TolovHolati.TOLANMAGAN)
+TOLANGAN_Q = Q(holat_kodi=TolovHolati.TOLANGAN)
+
+# Botdagi tumanlar ro'yxati xotirada ko'pi bilan shuncha soniya saqlanadi
+KESH_MUDDATI = 30
+
+
+def tuman_xulosasini_yangilash():
+    """TumanXulosa jadvalini faol to'lov ma'lumotlaridan qayta hisoblaydi"""
+    boshlanish = time.monotonic()
+    faol = KadastrMalumat.objects.faol()
+    qatorlar = (
+        faol.order_by()
+        .values('viloyat_id', 'tuman_id')
+        .annotate(
+            jami=Count('id'),
+            tolanmagan=Count('id', filter=TOLANMAGAN_Q),
+            tolangan=Count('id', filter=TOLANGAN_Q),
+            tolanmagan_tiyin=Sum('summa_tiyin', filter=TOLANMAGAN_Q),
+            tolangan_tiyin=Sum('summa_tiyin', filter=TOLANGAN_Q),
+        )
+    )
+    qatorlar = list(qatorlar)
+    # Guruhlash butun son kalitlar bo'yicha, nomlar lug'atdan bir marta olinadi
+    viloyatlar = Viloyat.objects.in_bulk({q['viloyat_id'] for q in qatorlar})
+    tumanlar = Tuman.objects.in_bulk({q['tuman_id'] for q in qatorlar})
+    xulosalar = [
+        TumanXulosa(
+            viloyat=viloyatlar[q['viloyat_id']].nomi, tuman=tumanlar[q['tuman_id']].nomi, jami=q['jami'],
+            tolanmagan=q['tolanmagan'], tolangan=q['tolangan'],
+            tolanmagan_summa=somga(q['tolanmagan_tiyin']), tolangan_summa=somga(q['tolangan_tiyin']),
+        )
+        for q in qatorlar
+    ]
+    with transaction.atomic():
+        TumanXulosa.objects.all().delete()
+        TumanXulosa.objects.bulk_create(xulosalar)
+    # Faollashtirish tranzaksiyasi ichida chaqirilsa — u commit bo'lgach
+    transaction.on_commit(_kesh.clear)
+    logger.info("Tuman xulosasi yangilandi: %d ta tuman, %.2f s", len(xulosalar), time.monotonic() - boshlanish)
+    return len(xulosalar)
+
+
+def obyekt_xulosasini_yangilash():
+    """ObyektHolatXulosa jadvalini faol obyekt ma'lumotlaridan (holat_kodi bo'yicha) qayta hisoblaydi"""
+    qatorlar = ObyektMalumat.objects.faol().order_by().values('holat_kodi').annotate(soni=Count('id'))
+    xulosalar = [ObyektHolatXulosa(holat_kodi=q['holat_kodi'], soni=q['soni']) for q in qatorlar]
+    with transaction.atomic():
+        ObyektHolatXulosa.objects.all().delete()
+        ObyektHolatXulosa.objects.bulk_create(xulosalar)
+    return len(xulosalar)
+
+
+_kesh = {}
+_kesh_qulf = threading.Lock()
+
+
+def toshkent_tumanlari():
+    """
+    Toshkent viloyati tumanlari ro'yxati (nomi, jami, to'lanmagan soni va summasi).
+    Katta jadvalga murojaat qilinmaydi — TumanXulosa'dan olinib, xotirada
+    saqlanadi. Kesh to'lov indeksi belgisiga bog'langan: boshqa jarayonda
+    yangi versiya faollashsa, ro'yxat muddat tugashini kutmasdan yangilanadi.
+    """
+    belgi = tolov_indeks.belgi
+    with _kesh_qulf:
+        saqlangan = _kesh.get('toshkent')
+        if (
+            saqlangan and belgi is not None and saqlangan[1] == belgi
+            and time.monotonic() - saqlangan[0] < KESH_MUDDATI
+        ):
+            return saqlangan[2]
+
+    tumanlar = {}
+    for x in TumanXulosa.objects.filter(viloyat__icontains='toshkent'):
+        t = tumanlar.setdefault(x.tuman, {'tuman': x.tuman, 'jami': 0, 'tolanmagan': 0, 'tolanmagan_summa': Decimal(0)})
+        t['jami'] += x.jami
+        t['tolanmagan'] += x.tolanmagan
+        t['tolanmagan_summa'] += x.tolanmagan_summa
+    natija = sorted(tumanlar.values(), key=lambda t: t['tuman'])
+
+    with _kesh_qulf:
+        _kesh['toshkent'] = (time.monotonic(), belgi, natija)
+    return natija
+
+
+# ─── Boshqaruv paneli ─────────────────────────────────────────────────────────
+
+def panel_belgisi():
+    """
+    Panel ma'lumotlari versiyasi (ETag uchun). Faqat kichik xulosa jadvallari
+    va upload'lar o'qiladi — katta jadvallar hajmiga bog'liq emas.
+    """
+    qismlar = [
+        TumanXulosa.objects.aggregate(v=Max('yangilangan'), n=Count('id')),
+        ObyektHolatXulosa.objects.aggregate(v=Max('yangilangan'), n=Count('id')),
+        KunlikStatistika.objects.aggregate(v=Max('yangilangan')),
+        ExcelUpload.objects.aggregate(n=Count('id'), v=Max('faol_versiya')),
+        # Foydalanuvchi o'chirilsa KunlikStatistika o'zgarmaydi
+        BotFoydalanuvchi.objects.count(),
+        ObyektExcelUpload.objects.aggregate(n=Count('id'), v=Max('faol_versiya')),
+        timezone.localdate(),
+    ]
+    return hashlib.md5(repr(qismlar).encode()).hexdigest()
+
+
+def boshqaruv_paneli(kunlar=30):
+    """Bosh sahifa uchun oldindan hisoblangan xulosalar (katta jadvallarga murojaat qilinmaydi)"""
+    tumanlar = list(TumanXulosa.objects.values(
+        'viloyat', 'tuman', 'jami', 'tolangan', 'tolanmagan', 'tolangan_summa', 'tolanmagan_summa'
+    ))
+    jami = TumanXulosa.objects.aggregate(
+        yozuvlar=Sum('jami'), tolangan=Sum('tolangan'), tolanmagan=Sum('tolanmagan'),
+        tolangan_summa=Sum('tolangan_summa'), tolanmagan_summa=Sum('tolanmagan_summa'),
+    )
+    bugun = timezone.localdate()
+    kunlik = list(
+        KunlikStatistika.objects.filter(sana__gt=bugun - timedelta(days=kunlar))
+        .order_by('sana').values('sana', 'sorovlar', 'faol_foydalanuvchilar', 'yangi_foydalanuvchilar')
+    )
+    return {
+        'jami_yozuvlar': jami['yozuvlar'] or 0,
+        'jami_tolangan': jami['tolangan'] or 0,
+        'jami_tolanmagan': jami['tolanmagan'] or 0,
+        'jami_tolangan_summa': jami['tolangan_summa'] or Decimal(0),
+        'jami_tolanmagan_summa': jami['tolanmagan_summa'] or Decimal(0),
+        'jami_foydalanuvchilar': BotFoydalanuvchi.objects.count(),
+        'jami_fayllar': ExcelUpload.objects.count(),
+        'tumanlar': tumanlar,
+        'obyekt_holatlari': [
+            {'holati': ObyektHolati(x.holat_kodi).label, 'soni': x.soni} for x in ObyektHolatXulosa.objects.all()
+        ],
+        'kunlik': kunlik,
+        'kunlik_eng_kop': max((k['sorovlar'] for k in kunlik), default=0),
+    }
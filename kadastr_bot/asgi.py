@@ -13,4 +13,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kadastr_bot.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from bot import webhook  # noqa: E402  (Django sozlangandan keyin)
+
+
+async def application(scope, receive, send):
+    # Lifespan: server to'xtaganda webhook Application'i to'xtatiladi (statistika yoziladi)
+    if scope['type'] == 'lifespan':
+        return await webhook.lifespan(scope, receive, send)
+    return await django_application(scope, receive, send)
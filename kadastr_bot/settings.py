@@ -78,13 +78,44 @@ WSGI_APPLICATION = 'kadastr_bot.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# SQLite ishlab chiqarish profili. WAL rejimida o'quvchilar yozuvchini kutmaydi
+# (import paytida ham bot qidiruvi ishlaydi); qulf band bo'lsa ulanish
+# "database is locked" xatosi o'rniga `timeout` soniyagacha kutadi.
+SQLITE_FAYL = BASE_DIR / 'db.sqlite3'
+SQLITE_KUTISH = 30
+SQLITE_KESH_PRAGMALARI = (
+    'PRAGMA cache_size=-65536;'     # 64 MB sahifa keshi
+    'PRAGMA mmap_size=268435456;'   # 256 MB mmap
+    'PRAGMA temp_store=MEMORY;'
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'NAME': SQLITE_FAYL,
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;' + SQLITE_KESH_PRAGMALARI,
+            'timeout': SQLITE_KUTISH,
+            # Yozuvchi qulfni tranzaksiya boshida oladi — keyin qulfni
+            # kuchaytirishda kutib o'tirmasdan SQLITE_BUSY olmaslik uchun
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    },
+    # Bot o'qish pool'i uchun faqat o'qiladigan ulanish (kadastr_app.routers)
+    'oqish': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': SQLITE_FAYL.as_uri() + '?mode=ro',
+        'OPTIONS': {
+            'init_command': 'PRAGMA query_only=1;' + SQLITE_KESH_PRAGMALARI,
+            'timeout': SQLITE_KUTISH,
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['kadastr_app.routers.OqishRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -122,3 +153,85 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TELEGRAM_BOT_TOKEN = ''
+
+# Bot xotirasidagi kadastr indeksi ma'lumot o'zgarganini tekshirish oralig'i (soniya)
+KADASTR_INDEKS_TEKSHIRISH = 30
+
+# Import yangi versiyani faollashtirganda qayta yoziladigan fayl: bir serverdagi
+# bot jarayonlari javob keshini shu oraliqni kutmasdan eskirtiradi.
+# None — MEDIA_ROOT / '.faol_versiya'
+KADASTR_VERSIYA_FAYLI = None
+
+# False bo'lsa bot qidiruvi xotiradagi indeks o'rniga to'g'ridan-to'g'ri
+# kadastr_kalit ustuni (B-tree indeks) bo'yicha bazada bajariladi
+KADASTR_XOTIRA_INDEKSI = True
+
+# Excel importda bitta bulk_create paketidagi qatorlar soni
+IMPORT_PAKET_HAJMI = 2000
+
+# Ko'p varaqli / bir nechta fayl importida varaqlarni o'qiydigan jarayonlar
+# soni (0 — protsessor yadrolari soni, 1 — pulsiz, ketma-ket) va har bir
+# varaqning yozuvchini kutib turgan paketlari chegarasi
+IMPORT_JARAYONLAR = int(os.getenv('IMPORT_JARAYONLAR', '0'))
+IMPORT_NAVBAT_HAJMI = 8
+
+# Holat matnini kodga (holat_kodi) ajratish qoidalari; standart —
+# kadastr_app.holat.STANDART_QOIDALAR. Masalan:
+#   HOLAT_QOIDALARI = {'tolov': [('TOLANMAGAN', ["to'lanmagan", 'qarzdor']), ('TOLANGAN', ["to'langan"])]}
+# O'zgartirilgandan keyin: python manage.py holatlarni_tasniflash
+
+# Excel import ishchisi: 'thread' — web jarayon ichidagi fon oqimi,
+# 'command' — alohida jarayon (python manage.py import_ishchi)
+IMPORT_ISHCHI = os.getenv('IMPORT_ISHCHI', 'thread')
+
+# Shu muddatdan (soniya) uzoq BAJARILMOQDA turgan vazifa osilib qolgan
+# hisoblanadi va ishchi ishga tushganda XATO qilinadi
+IMPORT_VAZIFA_MUDDATI = 6 * 3600
+
+# Bot foydalanuvchilari statistikasini bazaga yozish oralig'i (soniya)
+STATISTIKA_YOZISH_ORALIGI = 5
+
+# Bot javoblari keshi: yozuvlar soni va yashash muddati (soniya)
+JAVOB_KESHI_HAJMI = 10000
+JAVOB_KESHI_MUDDATI = 300
+
+# Botdagi o'qish so'rovlari uchun parallel oqimlar soni (har biri o'z DB ulanishi bilan);
+# 0 — barcha so'rovlar bitta oqimda navbat bilan (sync_to_async)
+BOT_OQISH_OQIMLARI = 8
+
+# Bir vaqtda qayta ishlanadigan update'lar soni (1 — ketma-ket)
+BOT_PARALLEL_UPDATELAR = 64
+
+# Foydalanuvchi bo'yicha so'rovlar chegarasi (token-bucket): ketma-ket
+# BOT_SOROV_SIGIMI ta so'rov, keyin soniyasiga BOT_SOROV_TEZLIGI ta
+BOT_SOROV_SIGIMI = 5
+BOT_SOROV_TEZLIGI = 0.5
+
+# Ommaviy qidiruv: bir martada qidiriladigan raqamlar soni va fayl hajmi chegarasi
+BOT_OMMAVIY_CHEGARASI = 5000
+BOT_OMMAVIY_FAYL_HAJMI = 5 * 1024 * 1024
+
+# Webhook rejimi (bot/webhook.py; faqat ASGI: uvicorn kadastr_bot.asgi:application):
+# Telegram'ga beriladigan ochiq manzil va X-Telegram-Bot-Api-Secret-Token
+# sarlavhasida keladigan maxfiy token
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL', '')
+TELEGRAM_WEBHOOK_SECRET = os.getenv('TELEGRAM_WEBHOOK_SECRET', '')
+
+# True bo'lsa bot Telegram serveriga ulanmaydi (bot/soxta_api.py) — lokal sinov uchun
+TELEGRAM_SOXTA_API = os.getenv('TELEGRAM_SOXTA_API', '') == '1'
+# Soxta API javoblaridan oldingi kutish (soniya) — yuklama sinovida tarmoq kechikishi o'rniga
+TELEGRAM_SOXTA_KECHIKISH = float(os.getenv('TELEGRAM_SOXTA_KECHIKISH', '0'))
+
+# Qism-satr qidiruvi (bot va admin) SQLite FTS5 trigram jadvali orqali;
+# False — avvalgidek icontains (natijalarni solishtirish uchun)
+KADASTR_FTS_QIDIRUV = True
+
+# Metrikalar (Prometheus): Django'da /metrics/, polling rejimidagi botda shu
+# portdagi ichki HTTP server (0 — o'chiq). METRIKA_TOKEN o'rnatilsa
+# "Authorization: Bearer <token>" talab qilinadi; o'rnatilmasa ikkalasi ham
+# faqat loopback (127.0.0.1) so'rovlariga javob beradi va bot serveri tashqi
+# BOT_METRIKA_MANZIL bilan ishga tushmaydi. Teskari proksi ortida REMOTE_ADDR
+# doim loopback bo'ladi — u holda METRIKA_TOKEN majburiy
+BOT_METRIKA_PORTI = int(os.getenv('BOT_METRIKA_PORTI', '0'))
+BOT_METRIKA_MANZIL = os.getenv('BOT_METRIKA_MANZIL', '127.0.0.1')
+METRIKA_TOKEN = os.getenv('METRIKA_TOKEN', '')
@@ -3,7 +3,10 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from bot.webhook import telegram_webhook
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('telegram/webhook/', telegram_webhook, name='telegram_webhook'),
     path('', include('kadastr_app.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)